@@ -18,6 +18,15 @@ use work.sim_input_pkg.all;
 ------------
 
 entity dds_cordic_tb is
+    -- Simulation inputs (defaults of sim_input_pkg, overridden per run with vsim -g)
+    generic(
+        SIM_PHASE_TERM                      : natural   := to_integer(unsigned(SIM_INPUT_PHASE_TERM)); -- Raw ufixed(4 downto -27)
+        SIM_INIT_PHASE                      : natural   := to_integer(unsigned(SIM_INPUT_INIT_PHASE));
+        SIM_NB_POINTS                       : natural   := SIM_INPUT_NBPOINTS;
+        SIM_NB_REPETITIONS                  : natural   := SIM_INPUT_NBREPET;
+        SIM_MODE_TIME                       : std_logic := SIM_INPUT_MODE_TIME;
+        SIM_BINARY_CAPTURE                  : boolean   := false -- sim_write2file BINARY_MODE
+    );
 end dds_cordic_tb;
 
 ------------------
@@ -145,11 +154,11 @@ begin
         restart_cycles  <= '0';
 
         -- Inputs --
-        phase_term      <=  to_ufixed(         SIM_INPUT_PHASE_TERM            , phase_term        ); 
-        nb_points       <=  std_logic_vector(  to_unsigned( SIM_INPUT_NBPOINTS , NB_POINTS_WIDTH ) ); 
-        nb_repetitions  <=  std_logic_vector(  to_unsigned( SIM_INPUT_NBREPET  , NB_REPT_WIDTH   ) ); 
-        initial_phase   <=  to_ufixed(         SIM_INPUT_INIT_PHASE            , initial_phase     );
-        mode_time       <= SIM_INPUT_MODE_TIME;
+        phase_term      <=  to_ufixed(         std_logic_vector(to_unsigned(SIM_PHASE_TERM, phase_term'length)), phase_term ); 
+        nb_points       <=  std_logic_vector(  to_unsigned( SIM_NB_POINTS      , NB_POINTS_WIDTH ) ); 
+        nb_repetitions  <=  std_logic_vector(  to_unsigned( SIM_NB_REPETITIONS , NB_REPT_WIDTH   ) ); 
+        initial_phase   <=  to_ufixed(         std_logic_vector(to_unsigned(SIM_INIT_PHASE, initial_phase'length)), initial_phase );
+        mode_time       <= SIM_MODE_TIME;
         -- Inputs --
         
         wait for CLK_PERIOD;
@@ -172,7 +181,10 @@ begin
     write2file : entity work.sim_write2file
         generic map (
             FILE_NAME    => "./output_dds_cordic_sine.txt", 
-            INPUT_WIDTH  => CORDIC_OUTPUT_WIDTH
+            INPUT_WIDTH  => CORDIC_OUTPUT_WIDTH,
+            BINARY_MODE  => SIM_BINARY_CAPTURE,
+            FRAC_BITS    => -CORDIC_FRAC_PART,
+            SAMPLE_RATE  => 1 sec / CLK_PERIOD
         )
         port map (
             clock           => clk,
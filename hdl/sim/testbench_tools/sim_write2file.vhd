@@ -17,7 +17,13 @@ use work.utils_pkg.all;
 entity sim_write2file is
     generic(
         FILE_NAME   : string   := "input.txt"; 
-        INPUT_WIDTH : positive := 8
+        INPUT_WIDTH : positive := 8;
+        -- Binary capture (see scripts/pylib/sim_capture.py, load_bin()):
+        -- 16-byte header then one little-endian word of WORD_BYTES per sample
+        BINARY_MODE : boolean  := false;
+        SIGNED_DATA : boolean  := true;         -- words sign-extended (zero-extended otherwise)
+        FRAC_BITS   : integer  := 0;            -- header only
+        SAMPLE_RATE : natural  := 100_000_000   -- header only (Hz)
     );
     port(
         clock           : in std_logic;
@@ -30,12 +36,38 @@ end sim_write2file;
 
 architecture simulation_entity of sim_write2file is
 
-    ----------
-    -- File --
-    ----------
+    -----------
+    -- Types --
+    -----------
 
-    file        F                   : TEXT open WRITE_MODE is FILE_NAME;
+    type        char_file           is file of character; -- one byte per character
 
+    ---------------
+    -- Functions --
+    ---------------
+
+    -- Bytes of the binary words (numpy integer sizes)
+    function word_bytes(width : positive) return positive is
+    begin
+        if (width <= 8) then
+            return 1;
+        elsif (width <= 16) then
+            return 2;
+        elsif (width <= 32) then
+            return 4;
+        end if;
+
+        return 8;
+    end function;
+
+    -- <nb_bytes> LSBs of the two's complement of <value>, little-endian
+    procedure write_le(file f : char_file; value : integer; nb_bytes : positive) is
+        variable word : signed(31 downto 0) := to_signed(value, 32);
+    begin
+        for i in 0 to (nb_bytes - 1) loop
+            write(f, character'val(to_integer(unsigned(word((8*i + 7) downto 8*i)))));
+        end loop;
+    end procedure;
 
     ---------------
     -- Constants --
@@ -43,30 +75,98 @@ architecture simulation_entity of sim_write2file is
         
     -- Behavioral 
     constant    WORD_SIZE           : positive  := ( ( INPUT_WIDTH / 4 ) + 1 ); -- Number of 4-bit words in <data_in>
+    constant    WORD_BYTES          : positive  := word_bytes(INPUT_WIDTH);
 
-
-    --------------
-    -- Signals  --
-    --------------
-
-    signal      data_string         : string (1 to WORD_SIZE);
+    -- Binary header
+    constant    HEADER_MAGIC        : string    := "SW2F";
+    constant    HEADER_VERSION      : natural   := 1;
 
 begin
 
-    data_string <= to_hexstring(data_in);
     ---------------------------------------------------------------------------
     ---------------------------------------------------------------------------
-    write2file: process(clock)
-        variable line_out     : line;
+    text_gen: if (not BINARY_MODE) generate
+
+        ----------
+        -- File --
+        ----------
+
+        file        F                   : TEXT open WRITE_MODE is FILE_NAME;
+
+        --------------
+        -- Signals  --
+        --------------
+
+        signal      data_string         : string (1 to WORD_SIZE);
+
     begin
-        if ( rising_edge(clock) ) then
 
-            if (data_valid = '1' and hold = '0') then
+        data_string <= to_hexstring(data_in);
+
+        write2file: process(clock)
+            variable line_out     : line;
+        begin
+            if ( rising_edge(clock) ) then
+
+                if (data_valid = '1' and hold = '0') then
 
-                write(line_out, data_string);
-                writeline(F,line_out);
+                    write(line_out, data_string);
+                    writeline(F,line_out);
+                end if;
+            end if;              
+        end process;
+
+    end generate text_gen;
+
+    ---------------------------------------------------------------------------
+    ---------------------------------------------------------------------------
+    binary_gen: if (BINARY_MODE) generate
+
+        ----------
+        -- File --
+        ----------
+
+        file        B                   : char_file open WRITE_MODE is FILE_NAME;
+
+    begin
+
+        -- The header is written by the first (initialization) run of the process
+        write2file: process(clock)
+            variable header_done  : boolean := false;
+            variable word         : signed((8*WORD_BYTES - 1) downto 0);
+        begin
+            if (not header_done) then
+                for i in HEADER_MAGIC'range loop
+                    write(B, HEADER_MAGIC(i));
+                end loop;
+
+                write_le(B, HEADER_VERSION, 1);
+                write_le(B, boolean'pos(SIGNED_DATA), 1); -- flags
+                write_le(B, INPUT_WIDTH, 2);
+                write_le(B, FRAC_BITS, 2);
+                write_le(B, WORD_BYTES, 2);
+                write_le(B, SAMPLE_RATE, 4);
+
+                header_done := true;
             end if;
-        end if;              
-    end process;
+
+            if ( rising_edge(clock) ) then
+
+                if (data_valid = '1' and hold = '0') then
+
+                    if (SIGNED_DATA) then
+                        word := resize(signed(data_in), 8*WORD_BYTES);
+                    else
+                        word := signed(resize(unsigned(data_in), 8*WORD_BYTES));
+                    end if;
+
+                    for i in 0 to (WORD_BYTES - 1) loop
+                        write(B, character'val(to_integer(unsigned(word((8*i + 7) downto 8*i)))));
+                    end loop;
+                end if;
+            end if;              
+        end process;
+
+    end generate binary_gen;
 
 end architecture simulation_entity;
\ No newline at end of file
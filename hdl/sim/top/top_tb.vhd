@@ -24,7 +24,14 @@ entity top_tb is
 generic
 (
   C_S_AXI_DATA_WIDTH             : integer              := 32;
-  C_S_AXI_ADDR_WIDTH             : integer              := 32
+  C_S_AXI_ADDR_WIDTH             : integer              := 32;
+
+  -- DDS shot (gen_dds), overridden per run with vsim -g
+  SIM_NB_PERIODS                 : positive             := 4;
+  SIM_NB_REPETITIONS             : positive             := 4;
+  SIM_FREQ                       : positive             := 500e3;
+  SIM_INIT_PHASE                 : real                 := 0.0;
+  SIM_MODE_TIME                  : std_logic            := '0'
 );
 
 end top_tb;
@@ -434,7 +441,7 @@ begin
         s_axi_aresetn   <='1';
 
         -- gen_dds(nb_periods,nb_repetitions,freq,init_phase,mode_time)
-        data := gen_dds(4,4,500e3,0.0,'0');   
+        data := gen_dds(SIM_NB_PERIODS,SIM_NB_REPETITIONS,SIM_FREQ,SIM_INIT_PHASE,SIM_MODE_TIME);   
         delay <= to_integer(unsigned(data(8)));
 
         wait for (CLOCK_PERIOD);
@@ -21,6 +21,17 @@ use std.env.finish; -- VHDL 2008
 ------------
 
 entity double_driver_tb is
+    -- Simulation inputs (defaults of sim_input_pkg, overridden per run with vsim -g)
+    generic(
+        SIM_PHASE_TERM                      : natural   := to_integer(unsigned(SIM_INPUT_PHASE_TERM)); -- Raw ufixed(4 downto -27)
+        SIM_INIT_PHASE                      : natural   := to_integer(unsigned(SIM_INPUT_INIT_PHASE));
+        SIM_NB_POINTS                       : natural   := SIM_INPUT_NBPOINTS;
+        SIM_NB_REPETITIONS                  : natural   := SIM_INPUT_NBREPET;
+        SIM_TX_TIME                         : positive  := SIM_INPUT_TX_TIME;
+        SIM_TX_OFF_TIME                     : positive  := SIM_INPUT_TX_OFF_TIME;
+        SIM_RX_TIME                         : positive  := SIM_INPUT_RX_TIME;
+        SIM_OFF_TIME                        : positive  := SIM_INPUT_OFF_TIME
+    );
 end double_driver_tb;
 
 ------------------
@@ -165,15 +176,15 @@ begin
         valid_i <= '1';
 
         -- Inputs --
-        phase_term      <=  to_ufixed(         SIM_INPUT_PHASE_TERM            , phase_term        ); 
-        nb_points       <=  std_logic_vector(  to_unsigned( SIM_INPUT_NBPOINTS , NB_POINTS_WIDTH ) ); 
-        nb_repetitions  <=  std_logic_vector(  to_unsigned( SIM_INPUT_NBREPET  , NB_POINTS_WIDTH ) ); 
-        initial_phase   <=  to_ufixed(         SIM_INPUT_INIT_PHASE            , initial_phase     );
-
-        tx_time         <=  std_logic_vector(to_unsigned( SIM_INPUT_TX_TIME , tx_time'length));
-        tx_off_time     <=  std_logic_vector(to_unsigned( SIM_INPUT_TX_OFF_TIME , tx_off_time'length ));
-        rx_time         <=  std_logic_vector(to_unsigned( SIM_INPUT_RX_TIME , rx_time'length )); 
-        off_time        <=  std_logic_vector(to_unsigned( SIM_INPUT_OFF_TIME , off_time'length )); 
+        phase_term      <=  to_ufixed(         std_logic_vector(to_unsigned(SIM_PHASE_TERM, phase_term'length)), phase_term ); 
+        nb_points       <=  std_logic_vector(  to_unsigned( SIM_NB_POINTS      , NB_POINTS_WIDTH ) ); 
+        nb_repetitions  <=  std_logic_vector(  to_unsigned( SIM_NB_REPETITIONS , NB_POINTS_WIDTH ) ); 
+        initial_phase   <=  to_ufixed(         std_logic_vector(to_unsigned(SIM_INIT_PHASE, initial_phase'length)), initial_phase );
+
+        tx_time         <=  std_logic_vector(to_unsigned( SIM_TX_TIME , tx_time'length));
+        tx_off_time     <=  std_logic_vector(to_unsigned( SIM_TX_OFF_TIME , tx_off_time'length ));
+        rx_time         <=  std_logic_vector(to_unsigned( SIM_RX_TIME , rx_time'length )); 
+        off_time        <=  std_logic_vector(to_unsigned( SIM_OFF_TIME , off_time'length )); 
 
         -- Inputs --
         
@@ -83,6 +83,15 @@ SPFPM is provided as-is, with no warranty of any form.
 
 SPFPM_VERSION = '1.5.1'
 
+import collections
+import json
+import os
+
+try:
+    import numpy as _np
+except ImportError:
+    _np = None      # FXarray is unavailable without NumPy
+
 
 class FXfamily(object):
     """Descriptor of the accuracy of a set of fixed-point numbers.
@@ -94,9 +103,28 @@ class FXfamily(object):
     Multiple FXfamily objects can exist within the same application so that,
     for example, sets of 12-bit, 32-bit & 200-bit quantities
     can be manipulated concurrently.
+
+    Families are interned, so that FXfamily(n_bits, n_intbits) always
+    returns the same object for the same resolution, together with
+    any mathematical constants that it has already computed.
     """
 
+    _registry = {}
+
+    def __new__(cls, n_bits=64, n_intbits=None):
+        key = (cls, n_bits, n_intbits)
+        family = FXfamily._registry.get(key)
+        if family is None:
+            # Only interned once initialized, so a failed __init__ leaves
+            # nothing behind:
+            family = object.__new__(cls)
+            family.__init__(n_bits, n_intbits)
+            FXfamily._registry[key] = family
+        return family
+
     def __init__(self, n_bits=64, n_intbits=None):
+        if hasattr(self, 'scale'):
+            return                          # Already initialized (interned)
         self.fraction_bits = n_bits         # Bits to right of binary point
         self.integer_bits = n_intbits       # Bits to left of binary point (including sign)
         self.scale = 1 << n_bits
@@ -114,78 +142,100 @@ class FXfamily(object):
         # Cached values of various mathematical constants:
         self._exp1, self._log2, self._pi, self._sqrt2 = (None,) * 4
 
+        # Memoized results of transcendental functions, keyed by scaledval,
+        # least-recently used first (see _memoized()):
+        self._memo = {}
+
     @property
     def resolution(self):
         """The number of fractional binary digits"""
         return self.fraction_bits
 
+    def _constant(self, name, calc):
+        """Look up constant in memory, then in on-disk cache, else compute it"""
+        attr = '_' + name
+        value = getattr(self, attr)
+        if value is None:
+            scaledval = _constantCache.lookup(self.fraction_bits, name)
+            if scaledval is None:
+                value = calc()
+                _constantCache.store(self.fraction_bits, name, value.scaledval)
+            else:
+                value = FXnum(family=self, scaled_value=scaledval)
+            setattr(self, attr, value)
+        return value
+
     @property
     def exp1(self):
         """Inverse natural logarithm of unity."""
-        if self._exp1 is None:
-            # Brute-force calculation of exp(1) using augmented accuracy:
-            augfamily = self.augment()
-            exp0_25 = (1 / FXnum(4, augfamily))._rawexp()
-            exp0_5 = exp0_25 * exp0_25
-            exp1 = exp0_5 * exp0_5
-            self._exp1 = FXnum(exp1, self)
-        return self._exp1
+        return self._constant('exp1', self._calcExp1)
+
+    def _calcExp1(self):
+        # Brute-force calculation of exp(1) using augmented accuracy:
+        augfamily = self.augment()
+        exp0_25 = (1 / FXnum(4, augfamily))._rawexp()
+        exp0_5 = exp0_25 * exp0_25
+        exp1 = exp0_5 * exp0_5
+        return FXnum(exp1, self)
 
     @property
     def log2(self):
         """Natural logarithm of two."""
-        if self._log2 is None:
-            # Brute-force calculation of log(2) using augmented accuracy
-            #   via log(2) = 5log(3^12 / 2^19) - 12log(3^5 / 2^8)
-            augfamily = self.augment()
-
-            q0 = FXnum((3 ** 12) - (1 << 19), augfamily) >> 19
-            q1 = FXnum((3 ** 5) - (1 << 8), augfamily) >> 8
-            auglog2 = (5 * q0._rawlog(isDelta=True)
-                        - 12 * q1._rawlog(isDelta=True))
-            self._log2 = FXnum(auglog2, self)
-        return self._log2
+        return self._constant('log2', self._calcLog2)
+
+    def _calcLog2(self):
+        # Brute-force calculation of log(2) using augmented accuracy
+        #   via log(2) = 5log(3^12 / 2^19) - 12log(3^5 / 2^8)
+        augfamily = self.augment()
+
+        q0 = FXnum((3 ** 12) - (1 << 19), augfamily) >> 19
+        q1 = FXnum((3 ** 5) - (1 << 8), augfamily) >> 8
+        auglog2 = (5 * q0._rawlog(isDelta=True)
+                    - 12 * q1._rawlog(isDelta=True))
+        return FXnum(auglog2, self)
 
     @property
     def pi(self):
         """Ratio of circle's perimeter to its diameter."""
-        if self._pi is None:
-            # Use Bailey-Borwein-Plouffe representation of Pi,
-            # involving powers of 1/16 and simple rational terms:
-            augfamily = self.augment()
+        return self._constant('pi', self._calcPi)
 
-            augpi = augfamily(0)
-            k4 = 0
-            while True:
-                k8 = k4 * 2
-                term = (4 / augfamily(k8 + 1)
-                        - 2 / augfamily(k8 + 4)
-                        - 1 / augfamily(k8 + 5)
-                        - 1 / augfamily(k8 + 6)) >> k4
+    def _calcPi(self):
+        # Use Bailey-Borwein-Plouffe representation of Pi,
+        # involving powers of 1/16 and simple rational terms:
+        augfamily = self.augment()
 
-                if term.scaledval == 0: break
+        augpi = augfamily(0)
+        k4 = 0
+        while True:
+            k8 = k4 * 2
+            term = (4 / augfamily(k8 + 1)
+                    - 2 / augfamily(k8 + 4)
+                    - 1 / augfamily(k8 + 5)
+                    - 1 / augfamily(k8 + 6)) >> k4
+
+            if term.scaledval == 0: break
 
-                augpi += term
-                k4 += 4
+            augpi += term
+            k4 += 4
 
-            self._pi = FXnum(augpi, self)
-        return self._pi
+        return FXnum(augpi, self)
 
     @property
     def sqrt2(self):
         """Square-root of two."""
-        if self._sqrt2 is None:
-            augfamily = self.augment()
-            # Use initial, very crude, approximation of sqrt(2)~=1.5
-            x = FXnum(3, augfamily) >> 1
-            while True:
-                # Apply Newton-Raphson iteration to f(x)=2/(x*x)-1:
-                delta = (x * (2 - x * x)) >> 2
-                x += delta
-                if abs(delta.scaledval) <= 1:
-                    break
-            self._sqrt2 = FXnum(x, self)
-        return self._sqrt2
+        return self._constant('sqrt2', self._calcSqrt2)
+
+    def _calcSqrt2(self):
+        augfamily = self.augment()
+        # Use initial, very crude, approximation of sqrt(2)~=1.5
+        x = FXnum(3, augfamily) >> 1
+        while True:
+            # Apply Newton-Raphson iteration to f(x)=2/(x*x)-1:
+            delta = (x * (2 - x * x)) >> 2
+            x += delta
+            if abs(delta.scaledval) <= 1:
+                break
+        return FXnum(x, self)
 
     @property
     def unity(self):
@@ -200,6 +250,10 @@ class FXfamily(object):
     def __hash__(self):
         return hash(self.fraction_bits)
 
+    def __reduce__(self):
+        # Unpickle through the constructor, so that the registry is honoured
+        return (self.__class__, (self.fraction_bits, self.integer_bits))
+
     def __repr__(self):
         return 'FXfamily(n_bits={}, n_intbits={})'.format(self.fraction_bits,
                                                           self.integer_bits)
@@ -257,6 +311,73 @@ class FXfamily(object):
         return FXfamily(self.fraction_bits + augbits)
 # ^^^ class FXfamily ^^^
 
+
+class _FXconstantCache(object):
+    """On-disk store of family constants, keyed by fractional resolution.
+
+    Each resolution has its own JSON file mapping constant names onto
+    scaled values, which is rewritten atomically so that concurrent
+    processes (e.g. the workers of a parallel sweep) can share it.
+    Failures to read or write the cache are silently ignored.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._tables = {}
+
+    def _path(self, n_bits):
+        return os.path.join(self.directory,
+                            'spfpm-{}-constants-{}.json'.format(SPFPM_VERSION,
+                                                                n_bits))
+
+    def _load(self, n_bits):
+        table = self._tables.get(n_bits)
+        if table is None:
+            try:
+                with open(self._path(n_bits)) as fp:
+                    table = { k: int(v) for k, v in json.load(fp).items() }
+            except (OSError, ValueError, AttributeError):
+                table = {}
+            self._tables[n_bits] = table
+        return table
+
+    def lookup(self, n_bits, name):
+        if not self.directory:
+            return None
+        return self._load(n_bits).get(name)
+
+    def store(self, n_bits, name, scaledval):
+        if not self.directory:
+            return
+        self._tables[n_bits] = None
+        table = self._load(n_bits)              # Merge with other processes
+        table[name] = scaledval
+        path = self._path(n_bits)
+        tmppath = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmppath, 'w') as fp:
+                json.dump({ k: str(v) for k, v in table.items() }, fp)
+            os.replace(tmppath, path)
+        except OSError:
+            pass
+# ^^^ class _FXconstantCache ^^^
+
+
+def setConstantCacheDir(directory):
+    """Select directory used to share family constants between processes.
+
+    By default this is taken from the SPFPM_CACHE_DIR environment variable,
+    or ~/.cache/spfpm otherwise. A value of None (or an empty string)
+    disables the on-disk cache.
+    """
+    _constantCache.directory = directory
+    _constantCache._tables.clear()
+
+
+_constantCache = _FXconstantCache(os.environ.get('SPFPM_CACHE_DIR',
+                        os.path.join(os.path.expanduser('~'), '.cache', 'spfpm')))
+
 _defaultFamily = FXfamily()
 
 
@@ -281,6 +402,65 @@ class FXbrokenError(FXexception):
 
 
 
+####
+# Fast paths for narrow families
+#
+
+_fastMathWidth = 16
+_memoSize = 1 << 16     # Results remembered per function & family
+
+def setFastMathWidth(n_bits):
+    """Set widest family whose transcendental functions are memoized.
+
+    For FXnum objects having at most this number of fractional bits,
+    sin(), cos(), atan(), exp() & log() remember their results per
+    scaled-value, so that repeated evaluation (e.g. when tabulating
+    CORDIC angles or window coefficients) avoids re-running the series.
+    """
+    global _fastMathWidth
+    if not isinstance(n_bits, int) or n_bits < 0:
+        raise ValueError('Invalid fast-math width {!r}'.format(n_bits))
+    _fastMathWidth = n_bits
+
+def setMemoSize(n_entries):
+    """Set number of results remembered per memoized function & family.
+
+    The least-recently used results are discarded beyond this limit,
+    bounding the memory held by long-lived (interned) families.
+    """
+    global _memoSize
+    if not isinstance(n_entries, int) or n_entries < 1:
+        raise ValueError('Invalid memo size {!r}'.format(n_entries))
+    _memoSize = n_entries
+    for family in FXfamily._registry.values():
+        for table in family._memo.values():
+            while len(table) > _memoSize:
+                table.popitem(last=False)
+
+def _memoized(func):
+    """Wrap unary FXnum function with a per-family cache of its results"""
+    name = func.__name__
+    def wrapper(self):
+        family = self.family
+        if family.fraction_bits > _fastMathWidth:
+            return func(self)
+        table = family._memo.get(name)
+        if table is None:
+            table = family._memo[name] = collections.OrderedDict()
+        sv = table.get(self.scaledval)
+        if sv is None:
+            sv = func(self).scaledval
+            table[self.scaledval] = sv
+            if len(table) > _memoSize:
+                table.popitem(last=False)
+        else:
+            table.move_to_end(self.scaledval)
+        return FXnum._rawbuild(family, sv)
+    wrapper.__name__ = name
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+
 class FXnum(object):
     """Representation of a binary fixed-point real number."""
 
@@ -618,6 +798,7 @@ class FXnum(object):
             rt.scaledval <<= 1
         return rt
 
+    @_memoized
     def exp(self):
         """Compute exponential of given number"""
         pwr = int(self)
@@ -635,6 +816,7 @@ class FXnum(object):
             if term.scaledval == 0: break
         return ex
 
+    @_memoized
     def log(self):
         """Compute (natural) logarithm of given number"""
         if self.scaledval <= 0:
@@ -670,6 +852,7 @@ class FXnum(object):
             if term.scaledval == 0: break
         return lg
 
+    @_memoized
     def sin(self):
         """Compute sine of given number (as angle in radians)"""
         (ang, idx, reflect) = self._angnorm()
@@ -721,6 +904,7 @@ class FXnum(object):
             nCn = (nCn * 2 * (2 * idx - 1)) // idx
         return self * asn
 
+    @_memoized
     def cos(self):
         """Compute cosine of given number (as angle in radians)"""
         (ang, idx, reflect) = self._angnorm()
@@ -800,6 +984,7 @@ class FXnum(object):
         (sn, cs) = self.sincos()
         return sn / cs
 
+    @_memoized
     def atan(self):
         """Compute inverse-tangent of given number (as angle in radians)"""
         reflect = False
@@ -844,6 +1029,679 @@ class FXnum(object):
 # ^^^ class FXnum ^^^
 
 
+class FXarray(object):
+    """Vector of binary fixed-point real numbers sharing one FXfamily.
+
+    The scaled values are held in a contiguous NumPy int64 array,
+    so that arithmetic is applied elementwise at NumPy speed rather than
+    through one FXnum object per sample. Rounding of products follows
+    FXnum, and conversion between families follows FXfamily.convert(),
+    so FXarray(x, fam)[i] == FXnum(x[i], fam) for every element.
+
+    The underlying buffer is exposed via np.asarray(), memoryview()
+    (Python 3.12+) and pickle protocol 5, without copying the samples.
+
+    >>> fam = FXfamily(8, 2)
+    >>> a = FXarray([0.5, -0.25, 1.0], fam)
+    >>> a.scaledval.tolist()
+    [128, -64, 256]
+    >>> (a * a).toFloat().tolist()
+    [0.25, 0.0625, 1.0]
+    >>> a.resize(2, 2, overflow='saturate', rounding='truncate').toFloat().tolist()
+    [0.5, -0.25, 1.0]
+    >>> print(a[1])
+    -0.25
+    """
+
+    __slots__ = ('family', 'scaledval', '__weakref__')
+
+    def __init__(self, val=(), family=_defaultFamily, **kwargs):
+        if _np is None:
+            raise ImportError('FXarray requires NumPy')
+        self.family = family
+        scaled = kwargs.get('scaled_value', None)
+        if scaled is not None:
+            self.scaledval = _np.ascontiguousarray(scaled, dtype=_np.int64)
+        elif hasattr(val, 'family'):
+            # Cast from FXarray or FXnum of (possibly) another family:
+            self.scaledval = FXarray._convert(family, val.family,
+                                    _np.asarray(val.scaledval, dtype=_np.int64))
+        else:
+            fval = _np.asarray(val, dtype=_np.float64) * family.scale
+            if fval.size and _np.abs(fval).max() >= 2.0 ** 63:
+                raise FXoverflowError
+            self.scaledval = _np.rint(fval).astype(_np.int64)
+        FXarray._validate(family, self.scaledval)
+
+    @classmethod
+    def _rawbuild(cls, fam, sv):
+        """Shortcut for creating new FXarray instance, for internal use only."""
+        arr = object.__new__(cls)
+        FXarray._validate(fam, sv)
+        arr.family = fam
+        arr.scaledval = sv
+        return arr
+
+    @classmethod
+    def frombuffer(cls, buf, family=_defaultFamily):
+        """Wrap a buffer of native int64 scaled values without copying."""
+        return cls._rawbuild(family, _np.frombuffer(buf, dtype=_np.int64))
+
+    @staticmethod
+    def _bounds(fam):
+        """Range [lo, hi] of scaled values permitted within family."""
+        if fam.integer_bits is None:
+            return None
+        thresh = 1 << (fam.fraction_bits + fam.integer_bits - 1)
+        return (-thresh, thresh - 1)
+
+    @staticmethod
+    def _validate(fam, sv):
+        bounds = FXarray._bounds(fam)
+        if bounds is None or sv.size == 0:
+            return
+        if sv.min() < bounds[0] or sv.max() > bounds[1]:
+            raise FXoverflowError
+
+    @staticmethod
+    def _convert(fam, other, sv):
+        """Vectorized equivalent of FXfamily.convert()"""
+        bit_inc = fam.fraction_bits - other.fraction_bits
+        if bit_inc == 0:
+            return sv.copy()
+        elif bit_inc > 0:
+            if sv.size and (_np.abs(sv).max() >> (62 - bit_inc)) > 0:
+                raise FXoverflowError
+            new_val = sv << bit_inc
+            return new_val | _np.where(sv > 0, 1 << (bit_inc - 1),
+                                       (1 << (bit_inc - 1)) - 1)
+        else:
+            return sv >> -bit_inc
+
+    # Container protocol:
+    def __len__(self):
+        return len(self.scaledval)
+
+    def __getitem__(self, idx):
+        sv = self.scaledval[idx]
+        if isinstance(sv, _np.ndarray):
+            return FXarray._rawbuild(self.family, sv)
+        return FXnum(family=self.family, scaled_value=int(sv))
+
+    def __iter__(self):
+        for sv in self.scaledval.tolist():
+            yield FXnum(family=self.family, scaled_value=sv)
+
+    @property
+    def shape(self):
+        return self.scaledval.shape
+
+    def __repr__(self):
+        return 'FXarray(family={}, scaled_value={!r})'.format(self.family,
+                                                        self.scaledval.tolist())
+
+    # Buffer/NumPy interoperability:
+    def __array__(self, dtype=None, copy=None):
+        """Expose scaled values to NumPy (no copy unless dtype differs)"""
+        if dtype is None or _np.dtype(dtype) == self.scaledval.dtype:
+            return self.scaledval
+        return self.scaledval.astype(dtype)
+
+    def __buffer__(self, flags):
+        return memoryview(self.scaledval)
+
+    def __reduce_ex__(self, protocol):
+        if protocol >= 5:
+            import pickle
+            buf = pickle.PickleBuffer(self.scaledval)
+            return (_fxarray_rebuild,
+                    (self.family.fraction_bits, self.family.integer_bits,
+                     buf, self.scaledval.shape))
+        return (_fxarray_rebuild,
+                (self.family.fraction_bits, self.family.integer_bits,
+                 self.scaledval.tobytes(), self.scaledval.shape))
+
+    # Conversion operations:
+    def toFloat(self):
+        """Cast to array of floating-point values"""
+        return self.scaledval / float(self.family.scale)
+
+    def _CastOrFail_(self, other):
+        """Turn operand into scaled values of same family, or fail"""
+        try:
+            # Binary operations must involve members of same family
+            if self.family != other.family:
+                raise FXfamilyError(1)
+            return other.scaledval
+        except AttributeError:
+            # Automatic casting from types other than FXnum/FXarray is allowed:
+            return FXarray(other, self.family).scaledval
+
+    # Unary arithmetic operations:
+    def __abs__(self):
+        return FXarray._rawbuild(self.family, _np.abs(self.scaledval))
+
+    def __neg__(self):
+        return FXarray._rawbuild(self.family, -self.scaledval)
+
+    def __pos__(self):
+        return self
+
+    # Arithmetic comparison tests (elementwise):
+    def __eq__(self, other):
+        return self.scaledval == self._CastOrFail_(other)
+
+    def __ne__(self, other):
+        return self.scaledval != self._CastOrFail_(other)
+
+    def __ge__(self, other):
+        return self.scaledval >= self._CastOrFail_(other)
+
+    def __gt__(self, other):
+        return self.scaledval > self._CastOrFail_(other)
+
+    def __le__(self, other):
+        return self.scaledval <= self._CastOrFail_(other)
+
+    def __lt__(self, other):
+        return self.scaledval < self._CastOrFail_(other)
+
+    __hash__ = None
+
+    # Arithmetic combinations:
+    @staticmethod
+    def _magnitude(sv):
+        """Largest absolute scaled value, as a Python int"""
+        return max(int(sv.max()), -int(sv.min())) if sv.size else 0
+
+    @staticmethod
+    def _exact(result):
+        """Narrow Python-int results back to int64, or fail"""
+        if result.size and (int(result.max()) >= (1 << 63)
+                                or int(result.min()) < -(1 << 63)):
+            raise FXoverflowError
+        return result.astype(_np.int64)
+
+    def _addsub(self, a, b, negate):
+        """a + b (a - b if negate), without wrapping around int64"""
+        a = _np.asarray(a, dtype=_np.int64)
+        b = _np.asarray(b, dtype=_np.int64)
+        if FXarray._magnitude(a) + FXarray._magnitude(b) < (1 << 63):
+            total = a - b if negate else a + b
+        else:
+            # Sum may exceed int64, so fall back to Python ints:
+            a = a.astype(object)
+            total = FXarray._exact(a - b if negate else a + b)
+        return FXarray._rawbuild(self.family, total)
+
+    def __add__(self, other):
+        """Add another number or array"""
+        return self._addsub(self.scaledval, self._CastOrFail_(other), False)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        """Subtract another number or array"""
+        return self._addsub(self.scaledval, self._CastOrFail_(other), True)
+
+    def __rsub__(self, other):
+        return self._addsub(self._CastOrFail_(other), self.scaledval, True)
+
+    def __mul__(self, other):
+        """Multiply by another number or array"""
+        other = self._CastOrFail_(other)
+        fam = self.family
+        a, b = self.scaledval, _np.asarray(other, dtype=_np.int64)
+        amax = int(_np.abs(a).max()) if a.size else 0
+        bmax = int(_np.abs(b).max()) if b.size else 0
+        if (amax * bmax + fam._roundup) < (1 << 63):
+            prod = (a * b + fam._roundup) >> fam.fraction_bits
+        else:
+            # Intermediate product exceeds int64, so fall back to Python ints:
+            prod = ((a.astype(object) * b + fam._roundup)
+                        >> fam.fraction_bits)
+            if prod.size and int(_np.abs(prod).max()) >= (1 << 63):
+                raise FXoverflowError
+            prod = prod.astype(_np.int64)
+        return FXarray._rawbuild(fam, prod)
+
+    __rmul__ = __mul__
+
+    def __lshift__(self, shift):
+        sv = self.scaledval
+        if (FXarray._magnitude(sv) << shift) >= (1 << 63):
+            # Shifted values exceed int64:
+            sv = FXarray._exact(sv.astype(object) << shift)
+        else:
+            sv = sv << shift
+        return FXarray._rawbuild(self.family, sv)
+
+    def __rshift__(self, shift):
+        return FXarray._rawbuild(self.family, self.scaledval >> shift)
+
+    # Printing/conversion routines:
+    def __str__(self):
+        return '[' + ', '.join(self.toDecimalStrings()) + ']'
+
+    def toDecimalStrings(self, precision=None, round10=False, sep=None):
+        """Convert all numbers (as decimal) into strings
+
+        This gives the same result as FXnum.toDecimalString() for each element,
+        as a list of strings, or as a single string joined by 'sep'.
+        """
+        famScale = self.family.scale
+        if precision is None or not isinstance(precision, int):
+            precision = int((3 + self.family.fraction_bits) / 3.32)
+
+        sv = self.scaledval.ravel()
+        negative = sv < 0
+        val = _np.abs(sv)
+        if round10:
+            decimalScale = 10 ** precision
+            val = ((val.astype(object) * decimalScale + famScale // 2)
+                        // decimalScale).astype(_np.int64)
+
+        whole = val >> self.family.fraction_bits
+        frac = val - (whole << self.family.fraction_bits)
+
+        # Generate fractional digits column by column, recording how many
+        # are printed before the remainder vanishes:
+        if precision > 0 and famScale * 10 >= (1 << 63):
+            frac = frac.astype(object)
+        digits = _np.zeros((sv.size, max(precision, 0)), dtype=_np.uint8)
+        ndigits = _np.zeros(sv.size, dtype=_np.int64)
+        for idx in range(max(precision, 0)):
+            active = frac != 0
+            if not active.any(): break
+            frac = frac * 10
+            q = frac // famScale
+            digits[:, idx] = q
+            frac = frac - q * famScale
+            ndigits += active
+
+        fracstr = (_DIGIT_CHARS[digits]
+                        .view('S{}'.format(max(precision, 1)))
+                        .ravel().astype(str).tolist() if precision > 0
+                   else [''] * sv.size)
+        reps = [('-' if neg else '') + str(w) + ('.' + f[:n] if n else '')
+                    for neg, w, f, n in zip(negative.tolist(), whole.tolist(),
+                                            fracstr, ndigits.tolist())]
+        return reps if sep is None else sep.join(reps)
+
+    def toBinaryStrings(self, logBase=1, twosComp=True, sep=None):
+        """Convert all numbers into strings in base 2/4/8/16
+
+        This gives the same result as FXnum.toBinaryString() for each element,
+        as a list of strings, or as a single string joined by 'sep'.
+        """
+        if not isinstance(logBase, int) or logBase > 4 or logBase < 1:
+            raise ValueError('Cannot convert to base greater than 16')
+
+        fam = self.family
+        sv = self.scaledval.ravel()
+        negative = (sv < 0) & (not twosComp)
+        sv = _np.where(negative, -sv, sv)
+
+        fracDigits = (fam.resolution + logBase - 1) // logBase
+        shift = fracDigits * logBase - fam.resolution
+
+        if fam.integer_bits is not None:
+            intDigits = _np.full(sv.shape,
+                                 (fam.integer_bits + logBase - 1) // logBase)
+        else:
+            intDigits = _np.ones(sv.shape, dtype=_np.int64)
+            intPart = sv >> fam.resolution
+            while True:
+                top = _np.left_shift(1, _np.minimum(intDigits * logBase, 62))
+                short = _np.where(intPart >= 0, intPart >= top,
+                                  (top >> 1) + intPart < 0)
+                if not short.any(): break
+                intDigits += short
+
+        reps = [None] * sv.size
+        for nint in _np.unique(intDigits).tolist():
+            sel = _np.flatnonzero(intDigits == nint)
+            rows = _digitMatrix(sv[sel], nint + fracDigits, logBase, shift)
+            if fracDigits:
+                text = _np.concatenate([rows[:, :nint],
+                                        _np.full((len(sel), 1), ord('.'),
+                                                 dtype=_np.uint8),
+                                        rows[:, nint:]], axis=1)
+            else:
+                text = _np.concatenate([_np.full((len(sel), 1), ord('.'),
+                                                 dtype=_np.uint8),
+                                        rows], axis=1)
+            strs = _rowStrings(text)
+            for i, rep in zip(sel.tolist(), strs):
+                reps[i] = rep
+        reps = [('-' + rep if neg else rep)
+                    for neg, rep in zip(negative.tolist(), reps)]
+        return reps if sep is None else sep.join(reps)
+
+    def toWordStrings(self, logBase=4, n_digits=None, sep=None):
+        """Convert all scaled values into fixed-width twos-complement words
+
+        This renders the raw bit-pattern of each number (i.e. without
+        binary point), as used for hardware constants and memory images.
+        By default the number of digits covers the family's total width.
+        If 'sep' is given, the result is a single string, built without
+        any per-element Python processing.
+        """
+        if not isinstance(logBase, int) or logBase > 4 or logBase < 1:
+            raise ValueError('Cannot convert to base greater than 16')
+        if n_digits is None:
+            if self.family.integer_bits is None:
+                raise ValueError('Word width undefined for unbounded family')
+            width = self.family.fraction_bits + self.family.integer_bits
+            n_digits = (width + logBase - 1) // logBase
+
+        rows = _digitMatrix(self.scaledval.ravel(), n_digits, logBase)
+        if sep is None:
+            return _rowStrings(rows)
+        sepbytes = _np.frombuffer(sep.encode(), dtype=_np.uint8)
+        text = _np.concatenate([rows, _np.broadcast_to(sepbytes,
+                                            (len(rows), len(sepbytes)))],
+                               axis=1).tobytes().decode()
+        return text[:len(text) - len(sep)] if rows.size else ''
+
+    # Mathematical functions:
+    #   These reproduce, operation by operation, the integer arithmetic
+    #   of the corresponding FXnum series, so that results are bit-exact.
+    #   Families wider than _VECTOR_MATH_BITS, arguments which could
+    #   overflow the int64 intermediates, and families with a bounded
+    #   integer part (whose FXnum series raise FXoverflowError when any
+    #   intermediate leaves the range) are delegated to FXnum.
+    def sin(self):
+        """Compute elementwise sine (as angle in radians)"""
+        return self._elementwise('sin', _vsin)
+
+    def cos(self):
+        """Compute elementwise cosine (as angle in radians)"""
+        return self._elementwise('cos', _vcos)
+
+    def sincos(self):
+        """Compute elementwise sine & cosine (as angle in radians)"""
+        return (self.sin(), self.cos())
+
+    def atan(self):
+        """Compute elementwise inverse-tangent (as angle in radians)"""
+        return self._elementwise('atan', _vatan)
+
+    def exp(self):
+        """Compute elementwise exponential"""
+        fam = self.family
+        # Keep exp1^|pwr| * scale^2 within int64:
+        maxpwr = int((62 - 2 * fam.fraction_bits) * 0.69) - 2
+        return self._elementwise('exp', _vexp, max(maxpwr, 0) * fam.scale)
+
+    def log(self):
+        """Compute elementwise (natural) logarithm"""
+        if self.scaledval.size and self.scaledval.min() <= 0:
+            raise FXdomainError
+        return self._elementwise('log', _vlog)
+
+    def _elementwise(self, name, vfunc, bound=None):
+        """Apply vectorized function where safe, else fall back to FXnum"""
+        fam = self.family
+        sv = self.scaledval
+        if (fam.fraction_bits > _VECTOR_MATH_BITS
+                or fam.integer_bits is not None or sv.size == 0):
+            return FXarray._rawbuild(fam, _scalarmap(name, fam, sv))
+
+        limit = 1 << (60 - fam.fraction_bits)
+        if bound is not None:
+            limit = min(limit, bound)
+        safe = _np.abs(sv) < limit
+
+        result = _np.empty_like(sv)
+        result[safe] = vfunc(fam, sv[safe])
+        if not safe.all():
+            result[~safe] = _scalarmap(name, fam, sv[~safe])
+        return FXarray._rawbuild(fam, result)
+
+    # Resizing between families:
+    def resize(self, n_bits, n_intbits, overflow='saturate', rounding='round'):
+        """Requantize into FXfamily(n_bits, n_intbits)
+
+        overflow -      'saturate' to clamp to the representable range,
+                        or 'wrap' for twos-complement wrap-around
+                        (unused when n_intbits is None, whose
+                        range is unbounded).
+        rounding -      'round' to add half an LSB before discarding
+                        fractional bits, or 'truncate' to round
+                        towards minus infinity (as with an arithmetic shift).
+        """
+        if overflow not in ('saturate', 'wrap'):
+            raise ValueError('Unknown overflow mode {!r}'.format(overflow))
+        if rounding not in ('round', 'truncate'):
+            raise ValueError('Unknown rounding mode {!r}'.format(rounding))
+
+        fam = FXfamily(n_bits, n_intbits)
+        sv = self.scaledval
+        bit_inc = n_bits - self.family.fraction_bits
+        if bit_inc >= 0:
+            if sv.size and (_np.abs(sv).max() >> (62 - bit_inc)) > 0:
+                raise FXoverflowError
+            sv = sv << bit_inc
+        else:
+            if rounding == 'round':
+                sv = sv + (1 << (-bit_inc - 1))
+            sv = sv >> -bit_inc
+
+        bounds = FXarray._bounds(fam)
+        if bounds is not None and overflow == 'saturate':
+            sv = _np.clip(sv, *bounds)
+        elif bounds is not None:
+            lo = bounds[0]
+            width = n_bits + n_intbits
+            sv = ((sv - lo) & ((1 << width) - 1)) + lo
+        return FXarray._rawbuild(fam, sv)
+# ^^^ class FXarray ^^^
+
+
+_DIGIT_CHARS = (_np.frombuffer(b'0123456789abcdef', dtype=_np.uint8)
+                    if _np is not None else None)
+
+def _digitMatrix(sv, n_digits, logBase, shift=0):
+    """ASCII digits (most significant first) of twos-complement (sv << shift)"""
+    mask = (1 << logBase) - 1
+    digits = _np.empty((sv.size, n_digits), dtype=_np.uint8)
+    for col in range(n_digits):
+        pos = (n_digits - 1 - col) * logBase - shift
+        if pos >= 0:
+            digits[:, col] = (sv >> min(pos, 63)) & mask
+        else:
+            digits[:, col] = (sv << -pos) & mask
+    return _DIGIT_CHARS[digits]
+
+def _rowStrings(rows):
+    """Convert matrix of ASCII codes into list of strings, one per row"""
+    if rows.shape[1] == 0:
+        return [''] * rows.shape[0]
+    return (_np.ascontiguousarray(rows).view('S{}'.format(rows.shape[1]))
+                .ravel().astype(str).tolist())
+
+_VECTOR_MATH_BITS = 28     # Widest family whose products fit within int64
+
+def _scalarmap(name, fam, sv):
+    """Evaluate FXnum method once per distinct scaled value"""
+    uniq, inverse = _np.unique(sv, return_inverse=True)
+    values = [getattr(FXnum(family=fam, scaled_value=int(u)), name)().scaledval
+                for u in uniq.tolist()]
+    if values and max(abs(v) for v in values) >= (1 << 63):
+        raise FXoverflowError
+    return _np.array(values, dtype=_np.int64)[inverse].reshape(sv.shape)
+
+def _vmul(fam, a, b):
+    return (a * b + fam._roundup) >> fam.fraction_bits
+
+def _vdiv(fam, a, b):
+    return (a * fam.scale + fam._roundup) // b
+
+def _vdivint(fam, a, n):
+    return (a * fam.scale + fam._roundup) // (n * fam.scale)
+
+def _vhalfpi(fam):
+    return (fam.pi.scaledval * fam.scale + fam._roundup) // (2 * fam.scale)
+
+def _vangnorm(fam, sv):
+    """Vectorized FXnum._angnorm()"""
+    reflect = sv < 0
+    ang = _np.where(reflect, -sv, sv)
+    halfpi = _vhalfpi(fam)
+    idx = ((ang * fam.scale + fam._roundup) // halfpi
+                + int(round(0.5 * fam.scale))) // fam.scale
+    return (ang - idx * halfpi, idx, reflect)
+
+def _vQsine(fam, ang, doCos):
+    """Vectorized FXnum._rawQsine() (non-hyperbolic)"""
+    x2 = _vmul(fam, -ang, ang)
+    sn = _np.zeros_like(ang)
+    term = _np.full_like(ang, fam.scale)
+    idx = 1 if doCos else 2
+    active = _np.ones(ang.shape, dtype=bool)
+    while active.any():
+        sn = _np.where(active, sn + term, sn)
+        term = _np.where(active,
+                         _vmul(fam, term, _vdivint(fam, x2, idx * (idx + 1))),
+                         term)
+        idx += 2
+        active &= (term != 0)
+    if doCos: return sn
+    else: return _vmul(fam, ang, sn)
+
+def _vsin(fam, sv):
+    (ang, idx, reflect) = _vangnorm(fam, sv)
+    osn, ocs = _vQsine(fam, ang, False), _vQsine(fam, ang, True)
+    idx = idx % 4
+    sn = _np.select([idx == 0, idx == 1, idx == 2], [osn, ocs, -osn], -ocs)
+    return _np.where(reflect, -sn, sn)
+
+def _vcos(fam, sv):
+    (ang, idx, reflect) = _vangnorm(fam, sv)
+    osn, ocs = _vQsine(fam, ang, False), _vQsine(fam, ang, True)
+    idx = idx % 4
+    return _np.select([idx == 0, idx == 1, idx == 2], [ocs, -osn, -ocs], osn)
+
+def _vsqrt(fam, sv):
+    """Vectorized FXnum.sqrt() for strictly positive arguments"""
+    rt = _np.full_like(sv, 1 << (fam.fraction_bits // 2))
+    val = sv.copy()
+    while True:
+        mask = val > 1
+        if not mask.any(): break
+        val = _np.where(mask, val >> 2, val)
+        rt = _np.where(mask, rt << 1, rt)
+    active = _np.ones(sv.shape, dtype=bool)
+    while active.any():
+        delta = (rt - _vdiv(fam, sv, rt)) >> 1
+        rt = _np.where(active, rt - delta, rt)
+        active &= (delta != 0)
+    return rt
+
+def _vrawarctan(fam, sv):
+    """Vectorized FXnum._rawarctan()"""
+    scale = fam.scale
+    x2 = _vmul(fam, sv, sv)
+    omx2 = scale - x2
+    opx2 = scale + x2
+    x4 = _vmul(fam, x2, x2)
+    atn = _np.full_like(sv, scale)
+    term = x2
+    idx = 1
+    active = _np.ones(sv.shape, dtype=bool)
+    while active.any():
+        delta = _vdivint(fam, _vmul(fam, term, 4 * idx * omx2 + opx2),
+                         16 * idx * idx - 1)
+        atn = _np.where(active, atn - delta, atn)
+        term = _vmul(fam, term, x4)
+        idx += 1
+        active &= (delta != 0)
+    return _vmul(fam, sv, atn)
+
+def _vatan(fam, sv):
+    scale = fam.scale
+    reflect = sv < 0
+    tan = _np.where(reflect, -sv, sv)
+    recip = tan > scale
+    tan = _np.where(recip, _vdiv(fam, scale, _np.where(recip, tan, 1)), tan)
+    double = tan > int(round(0.414 * scale))
+    if double.any():
+        sub = tan[double]
+        rt = _vsqrt(fam, scale + _vmul(fam, sub, sub))
+        tan[double] = _vdiv(fam, rt - scale, sub)
+    ang = _vrawarctan(fam, tan)
+    ang = _np.where(double, 2 * ang, ang)
+    ang = _np.where(recip, _vhalfpi(fam) - ang, ang)
+    return _np.where(reflect, -ang, ang)
+
+def _vexp(fam, sv):
+    scale = fam.scale
+    pwr = _np.where(sv >= 0, sv // scale, (sv + scale - 1) // scale)
+    frac = sv - pwr * scale
+
+    ex = _np.full_like(sv, scale)
+    term = _np.full_like(sv, scale)
+    idx = 1
+    active = _np.ones(sv.shape, dtype=bool)
+    while active.any():
+        term = _np.where(active,
+                         _vmul(fam, term, _vdivint(fam, frac, idx)), term)
+        ex = _np.where(active, ex + term, ex)
+        idx += 1
+        active &= (term != 0)
+
+    # Integer power of exp(1) by repeated squaring:
+    remaining = _np.abs(pwr)
+    result = _np.full_like(sv, scale)
+    term = _np.full_like(sv, fam.exp1.scaledval)
+    while remaining.any():
+        result = _np.where(remaining & 1, _vmul(fam, result, term), result)
+        remaining >>= 1
+        term = _np.where(remaining > 0, _vmul(fam, term, term), term)
+    result = _np.where(pwr < 0, _vdiv(fam, scale, result), result)
+
+    return _vmul(fam, ex, result)
+
+def _vlog(fam, sv):
+    scale = fam.scale
+    uprthresh = int(round(1.6 * scale))
+    lwrthresh = _vdivint(fam, uprthresh, 2)
+    val = sv.copy()
+    count = _np.zeros_like(sv)
+    while True:
+        mask = val > uprthresh
+        if not mask.any(): break
+        val = _np.where(mask, _vdivint(fam, val, 2), val)
+        count += mask
+    while True:
+        mask = val < lwrthresh
+        if not mask.any(): break
+        val = _np.where(mask, 2 * val, val)
+        count -= mask
+
+    z = _vdiv(fam, val - scale, val + scale)
+    z2 = _vmul(fam, z, z)
+    term = 2 * z
+    lg = _np.zeros_like(sv)
+    idx = 1
+    active = _np.ones(sv.shape, dtype=bool)
+    while active.any():
+        lg = _np.where(active, lg + _vdivint(fam, term, idx), lg)
+        term = _np.where(active, _vmul(fam, term, z2), term)
+        idx += 2
+        active &= (term != 0)
+
+    lg += count * fam.log2.scaledval
+    return _np.where(sv == scale, 0, lg)
+
+
+def _fxarray_rebuild(n_bits, n_intbits, buf, shape):
+    """Unpickling helper for FXarray, restoring data without copying"""
+    sv = _np.frombuffer(buf, dtype=_np.int64).reshape(shape)
+    return FXarray._rawbuild(FXfamily(n_bits, n_intbits), sv)
+
+
 if __name__ == "__main__":
     import doctest
     try:
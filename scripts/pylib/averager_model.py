@@ -0,0 +1,171 @@
+#############
+## Imports ##
+#############
+
+import numpy as np
+from   pylib import hdl_fixed
+
+###########
+## Class ##
+###########
+
+class AveragerV2:
+    """
+    Bit-true model of hdl/src/averager/averager_v2.vhd.
+
+    A frame is nb_repetitions shots of nb_points samples (the ring_fifo is
+    configured with config_max_addr = nb_points - 1). The first shot is
+    stored, the next ones are added point by point in the ACC_WORD_INT_PART
+    accumulator, and the averaged frame is shifted out on the AXI-stream
+    with tlast on its last word.
+
+    Samples are the raw integers of sfixed(1 downto WORD_FRAC_PART). The
+    model only depends on the sample values, not on the valid/tready
+    timing, as long as the next frame starts after the previous one was
+    read out (samples received while sending are written in the FIFO).
+    """
+
+    WORD_INT_PART           = 1
+    NB_REPETITIONS_WIDTH    = 6 # config_nb_repetitions_i is 6 bits wide
+
+    def __init__(self, word_frac_part, max_nb_points, nb_repetitions_width = None):
+        """
+        word_frac_part       : WORD_FRAC_PART generic
+        max_nb_points        : MAX_NB_POINTS generic (RAM_DEPTH)
+        nb_repetitions_width : NB_REPETITIONS_WIDTH generic
+        """
+        self.word_frac_part       = word_frac_part
+        self.max_nb_points        = max_nb_points
+        self.nb_repetitions_width = self.NB_REPETITIONS_WIDTH if nb_repetitions_width is None else nb_repetitions_width
+
+        self.nb_points      = max_nb_points
+        self.nb_repetitions = 1
+
+        self.reset()
+
+    @property
+    def max_nb_repetitions(self):
+        return 2**(self.nb_repetitions_width - 1)
+
+    @property
+    def acc_word_int_part(self):
+        """
+        ACC_WORD_INT_PART = ceil_log2(MAX_NB_REPETITIONS + 1)
+        """
+        return self.max_nb_repetitions.bit_length()
+
+    @property
+    def word_width(self):
+        """
+        Width of s_axis_st_tdata_o
+        """
+        return (self.WORD_INT_PART + 1) - self.word_frac_part
+
+    @property
+    def nb_shifts(self):
+        """
+        Right shift applied to the accumulated points: log2(nb_repetitions)
+        for the decoded values 2 .. 32, else 0 (the sum is output as is)
+        """
+        if (self.nb_repetitions in (2, 4, 8, 16, 32)):
+            return self.nb_repetitions.bit_length() - 1
+
+        return 0
+
+    @property
+    def pending_shots(self):
+        """
+        Shots of the current frame received by push()
+        """
+        return self._shots
+
+    def configure(self, nb_points, nb_repetitions):
+        """
+        config_valid_i with config_max_addr_i = nb_points - 1
+        """
+        if (nb_points < 1 or nb_points > self.max_nb_points):
+            raise ValueError("nb_points must be in [1 ; %d], got %d" % (self.max_nb_points, nb_points))
+
+        if (nb_repetitions < 1 or nb_repetitions >= 2**self.nb_repetitions_width):
+            raise ValueError("nb_repetitions must be in [1 ; %d], got %d" % (2**self.nb_repetitions_width - 1, nb_repetitions))
+
+        self.nb_points      = nb_points
+        self.nb_repetitions = nb_repetitions
+
+        self.reset()
+
+    def reset(self):
+        """
+        Drops the shots received for the current frame
+        """
+        self._acc   = None
+        self._shots = 0
+
+    def _accumulate(self, acc, shot):
+        """
+        acc_point = resize(input + fifo_rd_data), saturated to the accumulator
+        """
+        low, high = hdl_fixed.sfixed_bounds(self.acc_word_int_part, self.word_frac_part)
+
+        return np.clip(acc + shot, low, high)
+
+    def _output(self, acc):
+        """
+        s_axis_st_tdata_o of the accumulated points: arithmetic shift, then
+        the data word keeps the LSBs of the RAM word
+        """
+        data = hdl_fixed.wrap(np.asarray(acc) >> self.nb_shifts, self.word_width)
+        last = np.zeros(data.shape, dtype = bool)
+        last[..., -1] = True
+
+        return (data, last)
+
+    def average(self, shots):
+        """
+        shots : raw samples, shape (..., nb_repetitions, nb_points); leading
+                dimensions are independent frames
+
+        Returns the raw (tdata, tlast) of the averaged frames, shape (..., nb_points).
+        """
+        shots = np.asarray(shots, dtype = np.int64)
+
+        if (shots.ndim < 2 or shots.shape[-2:] != (self.nb_repetitions, self.nb_points)):
+            raise ValueError("Expected shots of shape (..., %d, %d), got %s" % (self.nb_repetitions, self.nb_points, shots.shape))
+
+        ## Partial sums only saturate when the repetitions exceed MAX_NB_REPETITIONS
+        if (self.nb_repetitions <= self.max_nb_repetitions):
+            return self._output(shots.sum(axis = -2))
+
+        low, high = hdl_fixed.sfixed_bounds(self.acc_word_int_part, self.word_frac_part)
+        partial   = np.cumsum(shots, axis = -2)
+        acc       = partial[..., -1, :]
+
+        ## acc_point saturates on every partial sum: replay the shots if any left the accumulator
+        if (partial.min() < low or partial.max() > high):
+            acc = shots[..., 0, :]
+            for shot in range(1, self.nb_repetitions):
+                acc = self._accumulate(acc, shots[..., shot, :])
+
+        return self._output(acc)
+
+    def push(self, shot):
+        """
+        Streams one shot (nb_points raw samples, input_last_word_i on the
+        last one). Returns the raw (tdata, tlast) of the averaged frame once
+        nb_repetitions shots were received, None before.
+        """
+        shot = np.asarray(shot, dtype = np.int64)
+
+        if (shot.shape != (self.nb_points,)):
+            raise ValueError("Expected a shot of %d points, got shape %s" % (self.nb_points, shot.shape))
+
+        self._acc    = shot.copy() if self._acc is None else self._accumulate(self._acc, shot)
+        self._shots += 1
+
+        if (self._shots < self.nb_repetitions):
+            return None
+
+        result = self._output(self._acc)
+        self.reset()
+
+        return result
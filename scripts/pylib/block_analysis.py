@@ -0,0 +1,105 @@
+#############
+## Imports ##
+#############
+
+import numpy as np
+from   pylib.spectral_metrics import get_window, lobe_bins, onesided_scale, metrics_from_power, MAX_HARMONIC
+
+###########
+## Class ##
+###########
+
+class SpectrumAccumulator:
+    """
+    Magnitude spectrum of a capture fed block by block: the power of the
+    FFTs of consecutive <nfft>-sample segments is averaged (Bartlett, or
+    Welch with a <window> and overlapping segments), the partial segment
+    being carried to the next block. Memory is one segment whatever the
+    capture length.
+    """
+
+    def __init__(self, nfft, window = "NONE", overlap = 0.0):
+        """
+        window  : name in spectral_metrics.WINDOWS
+        overlap : fraction of a segment shared with the next one
+        """
+        self.nfft     = nfft
+        self.window   = get_window(window, nfft)
+        self.lobe     = lobe_bins(window, nfft, nfft)
+        self.hop      = max(1, int(nfft * (1.0 - overlap)))
+        self.power    = np.zeros(nfft)
+        self.segments = 0
+        self._pending = np.zeros(0)
+
+    def update(self, values):
+        values = np.concatenate((self._pending, values))
+
+        if (len(values) >= self.nfft):
+            segments        = np.lib.stride_tricks.sliding_window_view(values, self.nfft)[::self.hop]
+            self.power     += np.sum(np.abs(np.fft.fft(segments * self.window, axis = 1)) ** 2, axis = 0)
+            self.segments  += len(segments)
+            values          = values[len(segments) * self.hop:]
+
+        self._pending = values
+
+    def _average(self):
+        """
+        Averaged |X|**2, a capture shorter than nfft being zero-padded
+        """
+        if (self.segments == 0):
+            padded = np.concatenate((self._pending, np.zeros(self.nfft - len(self._pending))))
+            return np.abs(np.fft.fft(padded * self.window)) ** 2
+
+        return self.power / self.segments
+
+    def result(self, sample_spacing = 1.0):
+        """
+        [magnitude, freqs] as SimDDS.do_fft() normalizes them (|X| / nfft
+        without window)
+        """
+        return [np.sqrt(self._average()) / np.sum(self.window), np.fft.fftfreq(self.nfft, sample_spacing)]
+
+    def metrics(self, sample_rate = 1.0, max_harmonic = MAX_HARMONIC, fundamental = None):
+        """
+        METRICS_DTYPE record of the averaged spectrum, see
+        spectral_metrics.metrics_from_power()
+        """
+        power = self._average()[:self.nfft // 2 + 1] * onesided_scale(self.window, self.nfft)
+
+        return metrics_from_power(power, self.nfft, sample_rate, self.lobe, max_harmonic, fundamental)[0]
+
+class MinMaxDecimator:
+    """
+    Envelope of a capture of <nb_samples> fed block by block, for plots:
+    the min and max of <nb_bins> equal index ranges
+    """
+
+    def __init__(self, nb_samples, nb_bins):
+        self.nb_samples = nb_samples
+        self.nb_bins    = max(1, min(nb_bins, nb_samples))
+        self.low        = np.full(self.nb_bins, np.inf)
+        self.high       = np.full(self.nb_bins, -np.inf)
+
+    def update(self, start, values):
+        """
+        values : samples [start, start + len(values)) of the capture
+        """
+        if (len(values) == 0):
+            return
+
+        bins   = (np.arange(start, start + len(values)) * self.nb_bins) // self.nb_samples
+        bins   = np.minimum(bins, self.nb_bins - 1)
+        edges  = np.flatnonzero(np.diff(bins)) + 1
+        starts = np.concatenate(([0], edges))
+        used   = bins[starts]
+
+        self.low[used]  = np.minimum(self.low[used], np.minimum.reduceat(values, starts))
+        self.high[used] = np.maximum(self.high[used], np.maximum.reduceat(values, starts))
+
+    def result(self):
+        """
+        [index, low, high]: first sample index of every bin and its extrema
+        """
+        index = -(-np.arange(self.nb_bins) * self.nb_samples // self.nb_bins)
+
+        return [index, self.low, self.high]
@@ -0,0 +1,135 @@
+#############
+## Imports ##
+#############
+
+import numpy as np
+from   pylib import hdl_fixed
+
+###########
+## Class ##
+###########
+
+class CordicCore:
+    """
+    Bit-true model of hdl/src/cordic/cordic_core.vhd (rotation mode).
+
+    Samples are the raw two's complement integers of
+    sfixed(CORDIC_INTEGER_PART downto CORDIC_FRAC_PART). Every cordic_slice
+    is evaluated over the whole sample vector at once:
+
+        Z > 0 : X - (Y sra k), Y + (X sra k), Z - atan(2^-k)
+        else  : X + (Y sra k), Y - (X sra k), Z + atan(2^-k)
+
+    each resized (saturated) back to the CORDIC word, as in the VHDL.
+    """
+
+    ## Values of hdl/pkg/defs_pkg.vhd
+    CORDIC_INTEGER_PART   = 1
+    N_CORDIC_ITERATIONS   = 10
+    CORDIC_FRAC_PART      = -(N_CORDIC_ITERATIONS - (CORDIC_INTEGER_PART + 1))
+
+    def __init__(self, cordic_integer_part = None, cordic_frac_part = None, n_cordic_iterations = None):
+        """
+        Generics default to the constants of defs_pkg.vhd
+        """
+        self.cordic_integer_part = self.CORDIC_INTEGER_PART if cordic_integer_part is None else cordic_integer_part
+        self.n_cordic_iterations = self.N_CORDIC_ITERATIONS if n_cordic_iterations is None else n_cordic_iterations
+
+        if (cordic_frac_part is None):
+            self.cordic_frac_part = -(self.n_cordic_iterations - (self.cordic_integer_part + 1))
+        else:
+            self.cordic_frac_part = cordic_frac_part
+
+        self.rotation_angles = hdl_fixed.to_sfixed(np.arctan(2.0 ** -np.arange(self.n_cordic_iterations)),
+                                                   self.cordic_integer_part, self.cordic_frac_part)
+
+    @property
+    def word_width(self):
+        return self.cordic_integer_part - self.cordic_frac_part + 1
+
+    @property
+    def latency(self):
+        """
+        Clock cycles between valid_i and valid_o (one register per slice)
+        """
+        return self.n_cordic_iterations
+
+    @property
+    def gain_compensation(self):
+        """
+        Raw X_i giving unit-amplitude outputs (X_i = 1/An, Y_i = 0)
+        """
+        gain = np.prod(np.sqrt(1.0 + 2.0 ** (-2.0 * np.arange(self.n_cordic_iterations))))
+        return int(hdl_fixed.to_sfixed(1.0 / gain, self.cordic_integer_part, self.cordic_frac_part))
+
+    def to_raw(self, value):
+        """
+        Quantize reals to the CORDIC word (fixed_pkg to_sfixed)
+        """
+        return hdl_fixed.to_sfixed(value, self.cordic_integer_part, self.cordic_frac_part)
+
+    def to_real(self, raw):
+        return hdl_fixed.to_real(raw, self.cordic_frac_part)
+
+    def rotate(self, x, y, z):
+        """
+        x, y, z : raw input vectors (X_i, Y_i, Z_i), any shape
+
+        Returns the raw (X_o, Y_o, Z_o) after N_CORDIC_ITERATIONS slices.
+        """
+        low, high = hdl_fixed.sfixed_bounds(self.cordic_integer_part, self.cordic_frac_part)
+
+        x = np.array(x, dtype = np.int64)
+        y = np.array(y, dtype = np.int64)
+        z = np.array(z, dtype = np.int64)
+        x, y, z = np.broadcast_arrays(x, y, z)
+        x, y, z = x.copy(), y.copy(), z.copy()
+
+        for k, angle in enumerate(self.rotation_angles.tolist()):
+            x_shift = x >> k
+            y_shift = y >> k
+            sign    = np.where(z > 0, -1, 1)
+
+            x = np.clip(x + sign * y_shift, low, high)
+            y = np.clip(y - sign * x_shift, low, high)
+            z = np.clip(z + sign * angle,   low, high)
+
+        return (x, y, z)
+
+    def sin_cos(self, z):
+        """
+        Raw (cos, sin) for raw angles <z> within [-pi/2 ; pi/2]
+        """
+        x, y, _ = self.rotate(self.gain_compensation, 0, z)
+
+        return (x, y)
+
+    def pipeline(self, x, y, z, valid):
+        """
+        Cycle-accurate view of the core: inputs and valid_i are given per clock
+        cycle, the returned (X_o, Y_o, Z_o, valid_o) are the register outputs
+        at the same cycles. The registers only load on valid data, so the
+        outputs hold the last valid result; before the first one they are 0.
+        """
+        valid   = np.asarray(valid, dtype = bool)
+        nb_cycles = len(valid)
+        latency = self.latency
+
+        x_o, y_o, z_o = self.rotate(x, y, z)
+
+        last_valid = np.where(valid, np.arange(nb_cycles), -1)
+        last_valid = np.maximum.accumulate(last_valid)
+        source     = np.full(nb_cycles, -1)
+        source[latency:] = last_valid[:nb_cycles - latency]
+
+        loaded  = source >= 0
+        outputs = []
+
+        for data in (x_o, y_o, z_o):
+            data = np.broadcast_to(data, (nb_cycles,))
+            outputs.append(np.where(loaded, data[np.maximum(source, 0)], 0))
+
+        valid_o = np.zeros(nb_cycles, dtype = bool)
+        valid_o[latency:] = valid[:nb_cycles - latency]
+
+        return (outputs[0], outputs[1], outputs[2], valid_o)
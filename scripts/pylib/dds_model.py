@@ -0,0 +1,223 @@
+#############
+## Imports ##
+#############
+
+import numpy as np
+from   pylib import hdl_fixed
+from   pylib.cordic_model import CordicCore
+
+###########
+## Class ##
+###########
+
+class DdsCordic:
+    """
+    Bit-true model of hdl/src/dds_cordic/dds_cordic.vhd:
+
+        phase_acc_v2 -> preproc -> cordic_core (-> posproc if EN_POSPROC)
+
+    Every block only loads its registers on valid data and phase_acc_v2
+    produces one contiguous burst of valid phases per configuration, so
+    the samples written by the testbenches are obtained by applying each
+    stage to the whole phase vector at once.
+
+    Phases are the raw integers of ufixed(PHASE_INTEGER_PART downto
+    PHASE_FRAC_PART), outputs the raw integers of the CORDIC word.
+    """
+
+    ## Values of hdl/pkg/defs_pkg.vhd
+    PHASE_INTEGER_PART    = 4
+    PHASE_FRAC_PART       = -27
+    NB_POINTS_WIDTH       = 10
+    NB_REPT_WIDTH         = 10
+
+    ## Constant X_i of dds_cordic.vhd
+    CORDIC_FACTOR         = 0.607253
+
+    def __init__(self, cordic = None, phase_integer_part = None, phase_frac_part = None,
+                 nb_points_width = None, nb_repetitions_width = None, en_posproc = True):
+        """
+        cordic     : CordicCore with the CORDIC generics, default is defs_pkg.vhd
+        en_posproc : EN_POSPROC generic (without posproc the cosine keeps its sign)
+        Other generics default to the constants of defs_pkg.vhd
+        """
+        self.cordic               = CordicCore() if cordic is None else cordic
+        self.en_posproc           = en_posproc
+        self.phase_integer_part   = self.PHASE_INTEGER_PART if phase_integer_part is None else phase_integer_part
+        self.phase_frac_part      = self.PHASE_FRAC_PART    if phase_frac_part is None else phase_frac_part
+        self.nb_points_width      = self.NB_POINTS_WIDTH    if nb_points_width is None else nb_points_width
+        self.nb_repetitions_width = self.NB_REPT_WIDTH      if nb_repetitions_width is None else nb_repetitions_width
+
+        ## preproc.vhd constants, from PI of defs_pkg.vhd (ufixed, same range as the phase)
+        s_pi       = int(hdl_fixed.to_ufixed(np.pi, self.phase_integer_part, self.phase_frac_part))
+        self.s_pi  = s_pi
+        self.pi_2  = int(hdl_fixed.round_shift(s_pi, 1))
+        self.pi3_2 = int(hdl_fixed.round_shift(3 * s_pi, 1))
+        self.pi2   = 2 * s_pi
+
+    @property
+    def phase_width(self):
+        return self.phase_integer_part - self.phase_frac_part + 1
+
+    @property
+    def latency(self):
+        """
+        Clock cycles between a phase_acc_v2 valid_o and the matching valid_o
+        (2 for preproc, 2 for posproc, one per CORDIC slice)
+        """
+        return (4 if self.en_posproc else 2) + self.cordic.latency
+
+    @property
+    def first_edge(self):
+        """
+        Clock edge of the first valid_o, counting from the edge that samples valid_i
+        """
+        return 1 + self.latency
+
+    def phase_to_raw(self, phase):
+        """
+        Raw phase word written by SimDDS._format_phase (truncation)
+        """
+        return int(phase * 2**(-self.phase_frac_part))
+
+    def phase_acc(self, phase_term, initial_phase, nb_points, nb_repetitions, mode_time = False, max_samples = None,
+                  first_wave = True):
+        """
+        Model of phase_acc_v2 for one valid_i pulse carrying the parameters.
+
+        phase_term, initial_phase : raw phase words
+        nb_points, nb_repetitions : integers (truncated to the port widths, as to_unsigned)
+        mode_time                 : mode_time_i
+        max_samples               : stop after this many valid phases
+        first_wave                : phase_time_counter at 0 (first wave after areset_i);
+                                    it is not cleared between waves, so the
+                                    next ones (valid_i or restart_cycles_i
+                                    with the same parameters) skip the warm-up
+
+        Returns the raw phase_o of the cycles with valid_o = '1'.
+
+        Edge k = 1 is the first edge after the parameters were registered.
+        The period counter counts the enabled edges: edge 1 and, in
+        mode_time, the edges after the phase_time_counter warm-up. A
+        period ends (and the phase is reloaded) when the counter equals
+        nb_points - 1, and valid_o falls once nb_repetitions periods are done.
+        """
+        phase_max   = (1 << self.phase_width) - 1
+        points_mask = (1 << self.nb_points_width) - 1
+        rept_mask   = (1 << self.nb_repetitions_width) - 1
+
+        period      = ((nb_points - 1) & points_mask) + 1 # counter wraps if nb_points = 0
+        repetitions = nb_repetitions & rept_mask
+
+        if (mode_time and not first_wave):
+            warm_up = 0
+            base    = 0
+        elif (mode_time):
+            ## Edges 2 .. warm_up + 1 keep the phase at 0 and the counters still
+            ## (phase_time_counter_not_done_reg); the threshold is computed
+            ## one bit wider, as the ufixed subtraction of the VHDL.
+            threshold = (initial_phase - phase_term) & ((phase_max << 1) | 1)
+
+            if (threshold > phase_max or (phase_term == 0 and threshold > 0)):
+                warm_up = None
+            else:
+                warm_up = -(-threshold // phase_term) if threshold > 0 else 0
+            base = 0
+        else:
+            warm_up = 0
+            base    = initial_phase
+
+        if (warm_up is None):
+            if (max_samples is None):
+                raise ValueError("phase_time_counter never reaches initial_phase - phase_term, max_samples is needed")
+            nb_edges = max_samples
+        else:
+            nb_edges = warm_up + 3 + period * (repetitions + 1)
+            if (repetitions == 0):
+                nb_edges += period * (rept_mask + 1)
+            if (max_samples is not None):
+                nb_edges = min(nb_edges, max_samples + 1)
+
+        edges = np.arange(1, nb_edges + 1, dtype = np.int64)
+
+        if (warm_up is None):
+            enabled = edges == 1
+            count   = np.where(enabled, 0, 1)
+            warm    = edges > 1
+        else:
+            enabled = (edges == 1) | (edges >= warm_up + 2)
+            count   = np.where(edges == 1, 0, np.maximum(1, edges - 1 - warm_up))
+            warm    = (edges > 1) & (edges <= warm_up + 1)
+
+        full_period_done = (count % period) == (period - 1)
+
+        repetitions_counter     = np.zeros(nb_edges, dtype = np.int64)
+        repetitions_counter[1:] = np.cumsum(enabled & full_period_done)[:-1]
+        full_wave_done          = (repetitions_counter & rept_mask) == repetitions
+
+        done = np.flatnonzero(full_wave_done[1:])
+        nb_valid = int(done[0]) + 1 if done.size else nb_edges
+        if (max_samples is not None):
+            nb_valid = min(nb_valid, max_samples)
+
+        set_phase = (edges == 1) | warm | full_period_done
+        last_set  = np.maximum.accumulate(np.where(set_phase, edges, 0))
+        steps     = edges - last_set
+
+        phase = np.minimum(base + steps * phase_term, phase_max)
+
+        return phase[:nb_valid]
+
+    def preproc(self, phase):
+        """
+        Model of preproc: maps raw phases of [0 ; 2pi] to [-pi/2 ; pi/2].
+
+        Returns (reduced_phase_o, phase_info_o), the reduced phase as raw
+        CORDIC words and the phase info as integers (0 = "00", 1 = "01", 2 = "10").
+        """
+        phase = np.asarray(phase, dtype = np.int64)
+
+        first  = phase <= self.pi_2
+        middle = ~first & (phase <= self.pi3_2)
+
+        reduced = np.where(first, phase, np.where(middle, self.s_pi - phase, phase - self.pi2))
+        reduced = hdl_fixed.resize(reduced, self.phase_frac_part, self.phase_integer_part, self.phase_frac_part)
+        info    = np.where(first, 0, np.where(middle, 1, 2))
+
+        reduced = hdl_fixed.resize(reduced, self.phase_frac_part,
+                                   self.cordic.cordic_integer_part, self.cordic.cordic_frac_part)
+
+        return (reduced, info)
+
+    def posproc(self, sin_phase, cos_phase, phase_info):
+        """
+        Model of posproc: negates the cosine of the phases reduced by pi - phase
+        """
+        low, high = hdl_fixed.sfixed_bounds(self.cordic.cordic_integer_part, self.cordic.cordic_frac_part)
+        cos_phase = np.where(np.asarray(phase_info) == 1, np.clip(-cos_phase, low, high), cos_phase)
+
+        return (sin_phase, cos_phase)
+
+    def sin_cos(self, phase):
+        """
+        Raw (sine_phase_o, cos_phase_o) of dds_cordic for raw phases
+        """
+        reduced, info = self.preproc(phase)
+
+        x_i = self.cordic.to_raw(self.CORDIC_FACTOR)
+        cos_phase, sin_phase, _ = self.cordic.rotate(x_i, 0, reduced)
+
+        if (not self.en_posproc):
+            return (sin_phase, cos_phase)
+
+        return self.posproc(sin_phase, cos_phase, info)
+
+    def run(self, phase_term, initial_phase, nb_points, nb_repetitions, mode_time = False, max_samples = None,
+            first_wave = True):
+        """
+        Samples of dds_cordic (valid_o = '1') for one set of parameters,
+        see phase_acc(). Returns the raw (sine_phase_o, cos_phase_o).
+        """
+        phase = self.phase_acc(phase_term, initial_phase, nb_points, nb_repetitions, mode_time, max_samples, first_wave)
+
+        return self.sin_cos(phase)
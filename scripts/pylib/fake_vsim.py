@@ -0,0 +1,239 @@
+#############
+## Imports ##
+#############
+
+import os
+import re
+import sys
+import numpy as np
+
+if (__name__ == "__main__"):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from   pylib import hdl_fixed
+from   pylib.sim_capture import write_bin
+from   pylib.cordic_model import CordicCore
+from   pylib.dds_model import DdsCordic
+
+###############
+## Constants ##
+###############
+
+## Command line standing in for SimDDS.SIMULATOR
+FAKE_VSIM        = [sys.executable, os.path.abspath(__file__)]
+FAKE_VCOM        = FAKE_VSIM + ["vcom"] # and for vhdl_build.VhdlBuild.compiler
+
+SIM_INPUT_FILE   = "../hdl/sim/sim_input_pkg.vhd" # relative to work/
+CONFIG_FILE      = "../hdl/pkg/defs_pkg.vhd"
+
+TB_START_CYCLES  = 5.5 # dds_cordic_tb applies the parameters on the 6th rising edge
+SAMPLING_FREQ    = 100E6
+TIME_UNITS       = ["s", "ms", "us", "ns"]
+
+VERSION          = "fake_vsim (bit-true models of pylib)"
+
+## SIM_* testbench generics and the sim_input_pkg constants giving their defaults
+GENERICS         = {"SIM_PHASE_TERM"     : "SIM_INPUT_PHASE_TERM",
+                    "SIM_WIN_TERM"       : "SIM_INPUT_WIN_TERM",
+                    "SIM_INIT_PHASE"     : "SIM_INPUT_INIT_PHASE",
+                    "SIM_NB_POINTS"      : "SIM_INPUT_NBPOINTS",
+                    "SIM_NB_REPETITIONS" : "SIM_INPUT_NBREPET",
+                    "SIM_MODE_TIME"      : "SIM_INPUT_MODE_TIME",
+                    "SIM_WIN_MODE"       : "SIM_INPUT_WIN_MODE"}
+
+###############
+## Functions ##
+###############
+
+def read_constants(pkg_file):
+    """
+    {name : value} of the "constant NAME : type := value;" lines of a
+    package, values as integers (x"..", decimal) or strings ("..", '.')
+    """
+    with open(pkg_file, "r") as f:
+        text = f.read()
+
+    constants = {}
+    for match in re.finditer(r"constant\s+(\w+)\s*:[^;]*?:=\s*([^;]+);", text):
+        value = parse_value(match.group(2))
+
+        if (value is not None):
+            constants[match.group(1)] = value
+
+    return constants
+
+def parse_value(value):
+    """
+    Integer (x"..", decimal) or string ("..", '.', bare word) of a VHDL
+    literal or vsim -g value, None otherwise
+    """
+    value = value.strip()
+
+    if (re.fullmatch(r"x\"[0-9a-fA-F]+\"", value)):
+        return int(value[2:-1], 16)
+    elif (re.fullmatch(r"-?\d+", value)):
+        return int(value)
+    elif (re.fullmatch(r"\"[^\"]*\"|'[^']*'", value)):
+        return value[1:-1]
+    elif (re.fullmatch(r"\w+", value)):
+        return value
+
+    return None
+
+def _run_cycles(run_time):
+    """
+    Clock cycles of "run <time> <unit>", None for "run -all"
+    """
+    if (run_time == "-all"):
+        return None
+
+    [time, unit] = run_time.split()
+
+    return float(time) * SAMPLING_FREQ / (1000 ** TIME_UNITS.index(unit))
+
+def write_hex(file_name, raw, width):
+    """
+    Capture in the format of hdl/sim/testbench_tools/sim_write2file.vhd
+    (to_hexstring zero-extends the word to width / 4 + 1 digits)
+    """
+    digits = width // 4 + 1
+    words  = hdl_fixed.wrap(raw, width, signed = False)
+
+    with open(file_name, "w") as f:
+        f.writelines("%0*X\n" % (digits, word) for word in words)
+
+def dds_cordic_tb(run_time, generics):
+    """
+    output_dds_cordic_sine.txt of dds_cordic_tb, from the bit-true model
+    with the generics of the run (defaults from the sim_input_pkg of the
+    workspace) and its defs_pkg
+    """
+    sim_input = read_constants(SIM_INPUT_FILE)
+    config    = read_constants(CONFIG_FILE)
+
+    for name, value in generics.items():
+        if (name in GENERICS):
+            sim_input[GENERICS[name]] = value
+
+    n_iterations = config["N_CORDIC_ITERATIONS"]
+    int_part     = config["CORDIC_INTEGER_PART"]
+    cordic       = CordicCore(cordic_integer_part = int_part,
+                              cordic_frac_part    = -(n_iterations - (int_part + 1)),
+                              n_cordic_iterations = n_iterations)
+    dds          = DdsCordic(cordic)
+
+    cycles      = _run_cycles(run_time)
+    max_samples = None
+    if (cycles is not None):
+        ## The writer registers valid_o one cycle after the DUT
+        max_samples = max(int(np.floor(cycles - TB_START_CYCLES + 1e-6)) - (dds.latency + 1), 0)
+
+    sine = dds.run(sim_input["SIM_INPUT_PHASE_TERM"], sim_input["SIM_INPUT_INIT_PHASE"], sim_input["SIM_INPUT_NBPOINTS"],
+                   sim_input["SIM_INPUT_NBREPET"], (sim_input["SIM_INPUT_MODE_TIME"] in ("1", "True")), max_samples)[0]
+
+    if (str(generics.get("SIM_BINARY_CAPTURE", "false")).lower() == "true"):
+        write_bin("output_dds_cordic_sine.txt", sine, n_iterations, -cordic.cordic_frac_part, int(SAMPLING_FREQ))
+    else:
+        write_hex("output_dds_cordic_sine.txt", sine, n_iterations)
+
+TESTBENCHES = {"dds_cordic_tb" : dds_cordic_tb}
+
+def _error(message):
+    print("# ** Error: %s" % (message))
+    return 1
+
+def run_script(script, state = None):
+    """
+    Runs the commands of a "vsim -batch -do" script: cd, do (the script
+    must exist, nothing is compiled), vlib (creates the directory), vmap,
+    vcom (the source must exist), vsim [-g<name>=<value> ...]
+    work.<entity>, run, restart, echo, quit -sim and quit. Returns the exit
+    code. <state> keeps the loaded design between calls (see interactive()).
+    """
+    state = {"entity" : None, "generics" : {}, "quit" : False} if state is None else state
+
+    for command in script.split(";"):
+        words = command.split()
+
+        if (not words):
+            continue
+
+        if (words[0] == "cd"):
+            os.chdir(words[1])
+        elif (words[0] == "do"):
+            if (not os.path.isfile(words[1])):
+                return _error("script %s not found" % (words[1]))
+        elif (words[0] == "vlib"):
+            os.makedirs(words[1], exist_ok = True)
+        elif (words[0] == "vcom"):
+            if (not os.path.isfile(words[-1])):
+                return _error("source %s not found" % (words[-1]))
+        elif (words[0] == "vsim"):
+            if (state["entity"] is not None):
+                return _error("a design is already loaded, quit -sim first")
+
+            state["entity"]   = words[-1].split(".")[-1]
+            state["generics"] = {}
+
+            for word in words[1:-1]:
+                if (word.startswith("-g") and "=" in word):
+                    [name, value] = word[2:].split("=", 1)
+                    state["generics"][name] = parse_value(value)
+        elif (words[0] == "run"):
+            if (state["entity"] not in TESTBENCHES):
+                return _error("no model of %s, expected one of %s" % (state["entity"], list(TESTBENCHES)))
+
+            TESTBENCHES[state["entity"]](" ".join(words[1:]), state["generics"])
+        elif (words[0] == "restart"):
+            if (state["entity"] is None):
+                return _error("no design loaded")
+        elif (words[0] == "echo"):
+            print("# %s" % (" ".join(words[1:])))
+        elif (words == ["quit", "-sim"]):
+            state["entity"] = None
+        elif (words[0] == "quit"):
+            state["quit"] = True
+            break
+
+    return 0
+
+def interactive(stream):
+    """
+    vsim -c: runs the commands read from <stream> line by line, after a
+    "VSIM <n>> " prompt, until quit or the end of the stream
+    """
+    state = {"entity" : None, "generics" : {}, "quit" : False}
+
+    for index, line in enumerate(stream):
+        run_script(line, state)
+        print("VSIM %d> " % (index + 1), end = "")
+        sys.stdout.flush()
+
+        if (state["quit"]):
+            break
+
+    return 0
+
+def main(argv):
+    """
+    Stand-in for vsim in sweeps run without simulator:
+    fake_vsim.py -batch -do "<script>" | -c | -version | vcom [options] <source>
+    """
+    if (argv[:1] == ["vcom"]):
+        return run_script(" ".join(argv))
+
+    if ("-version" in argv):
+        print(VERSION)
+        return 0
+
+    if ("-c" in argv):
+        return interactive(sys.stdin)
+
+    if ("-do" not in argv[:-1]):
+        print("Usage: fake_vsim.py -batch -do \"<script>\"")
+        return 2
+
+    return run_script(argv[argv.index("-do") + 1])
+
+if (__name__ == "__main__"):
+    sys.exit(main(sys.argv[1:]))
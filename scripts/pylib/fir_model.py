@@ -0,0 +1,273 @@
+#############
+## Imports ##
+#############
+
+import re
+import numpy as np
+from   pylib import hdl_fixed
+from   pylib.sim_capture import sign_extend
+
+###############
+## Functions ##
+###############
+
+def read_fir_weights(pkg_file):
+    """
+    pkg_file : VHDL package in the format of hdl/src/gen_fir/fir_weights_pkg.vhd
+
+    Returns (weights, weight_int_part, weight_frac_part), the FIR_WEIGHTS as
+    signed raw integers of sfixed(WEIGHT_INT_PART downto WEIGHT_FRAC_PART).
+    """
+    with open(pkg_file, "r") as f:
+        text = re.sub(r"--.*", "", f.read())
+
+    constants = {}
+    for name in ("WEIGHT_WIDTH", "WEIGHT_INT_PART", "NB_TAPS"):
+        match = re.search(r"constant\s+%s\s*:\s*\w+\s*:=\s*(\d+)\s*;" % (name), text, re.IGNORECASE)
+        if (match is None):
+            raise ValueError("Constant %s not found in %s" % (name, pkg_file))
+        constants[name] = int(match.group(1))
+
+    match = re.search(r"constant\s+FIR_WEIGHTS\s*:[^;]*?:=\s*\((.*?)\)\s*;", text, re.IGNORECASE | re.DOTALL)
+    if (match is None):
+        raise ValueError("Constant FIR_WEIGHTS not found in %s" % (pkg_file))
+
+    words = [int(word, 16) for word in re.findall(r"x\"([0-9a-fA-F]+)\"", match.group(1))]
+
+    if (len(words) != constants["NB_TAPS"]):
+        raise ValueError("FIR_WEIGHTS has %d weights, NB_TAPS = %d" % (len(words), constants["NB_TAPS"]))
+
+    weight_width     = constants["WEIGHT_WIDTH"]
+    weight_int_part  = constants["WEIGHT_INT_PART"]
+    weight_frac_part = (weight_int_part + 1) - weight_width
+
+    return (sign_extend(words, weight_width), weight_int_part, weight_frac_part)
+
+def _resize_sum(a, a_right, b, b_right, left, right):
+    """
+    resize(a + b) of two sfixed with LSB indexes a_right and b_right
+    """
+    lsb = min(a_right, b_right)
+    total = (np.asarray(a, dtype = np.int64) << (a_right - lsb)) + (np.asarray(b, dtype = np.int64) << (b_right - lsb))
+
+    return hdl_fixed.resize(total, lsb, left, right)
+
+###########
+## Class ##
+###########
+
+class FirFilter:
+    """
+    Bit-true model of hdl/src/gen_fir (fir_direct_core / fir_transpose_core).
+
+    Both architectures round every partial sum back to the data word, so
+    the taps are accumulated one after the other (in the order of the
+    slices) while each tap is applied to the whole block of samples.
+    Samples are the raw integers of sfixed(WORD_INT_PART downto WORD_FRAC_PART).
+
+    filter() streams a contiguous run of valid samples: the last NB_TAPS - 1
+    samples are kept between calls, so a signal can be fed in blocks.
+    """
+
+    FIR_TYPES = ["DIREC", "TRANS"]
+
+    def __init__(self, weights, weight_int_part, weight_frac_part, word_int_part, word_frac_part, fir_type = "DIREC"):
+        """
+        weights  : raw weights, FIR_WEIGHTS(0) first
+        fir_type : FIR_TYPE generic, "DIREC" or "TRANS"
+        """
+        if (fir_type not in self.FIR_TYPES):
+            raise ValueError("Unknown FIR_TYPE %s, expected one of %s" % (fir_type, self.FIR_TYPES))
+
+        self.weights          = np.asarray(weights, dtype = np.int64)
+        self.weight_int_part  = weight_int_part
+        self.weight_frac_part = weight_frac_part
+        self.word_int_part    = word_int_part
+        self.word_frac_part   = word_frac_part
+        self.fir_type         = fir_type
+
+        self.reset()
+
+    @classmethod
+    def from_weights_pkg(cls, pkg_file, word_int_part, word_frac_part, fir_type = "DIREC"):
+        """
+        FirFilter with the FIR_WEIGHTS of <pkg_file>, see read_fir_weights()
+        """
+        [weights, weight_int_part, weight_frac_part] = read_fir_weights(pkg_file)
+
+        return cls(weights, weight_int_part, weight_frac_part, word_int_part, word_frac_part, fir_type)
+
+    @property
+    def nb_taps(self):
+        return len(self.weights)
+
+    @property
+    def latency(self):
+        """
+        Clock cycles between valid_i and the matching valid_o
+        """
+        return self.nb_taps
+
+    def reset(self):
+        """
+        State after areset_i: data registers at 0
+        """
+        self._history = np.zeros(self.nb_taps - 1, dtype = np.int64)
+
+    def to_raw(self, values):
+        """
+        Raw data words of real <values> (to_sfixed)
+        """
+        return hdl_fixed.to_sfixed(values, self.word_int_part, self.word_frac_part)
+
+    def to_real(self, raw):
+        return hdl_fixed.to_real(raw, self.word_frac_part)
+
+    def _tap(self, samples, weight, acc):
+        """
+        One slice: adds weight * samples to the partial sums <acc> (data word)
+        """
+        product_right = self.word_frac_part + self.weight_frac_part
+
+        if (self.fir_type == "DIREC"):
+            ## downside_mult / downside_add_mult : sfixed(WORD_INT_PART downto WEIGHT_FRAC_PART)
+            mult = hdl_fixed.resize(samples * weight, product_right, self.word_int_part, self.weight_frac_part)
+            acc  = _resize_sum(mult, self.weight_frac_part, acc, self.word_frac_part,
+                               self.word_int_part, self.weight_frac_part)
+
+            return hdl_fixed.resize(acc, self.weight_frac_part, self.word_int_part, self.word_frac_part)
+
+        ## pipeline_mult : sfixed(WEIGHT_INT_PART downto WEIGHT_FRAC_PART)
+        mult = hdl_fixed.resize(samples * weight, product_right, self.weight_int_part, self.weight_frac_part)
+
+        return _resize_sum(mult, self.weight_frac_part, acc, self.word_frac_part,
+                           self.word_int_part, self.word_frac_part)
+
+    def _stuffed(self, samples, factor, position):
+        """
+        Values at <position> of the history followed by <samples> with
+        factor - 1 zeros inserted after each sample (negative positions
+        read the history)
+        """
+        first  = self.nb_taps - 1
+        in_new = position >= 0
+        index  = np.where(in_new, position // factor, 0)
+        values = np.where(in_new & (position % factor == 0), samples[np.minimum(index, len(samples) - 1)], 0)
+
+        return np.where(in_new, values, self._history[np.clip(first + position, 0, max(first - 1, 0))] if first else 0)
+
+    def _taps(self):
+        """
+        Tap order of the partial-sum chain: fir_direct_core starts from
+        FIR_WEIGHTS(0) and the newest sample, fir_transpose_core from
+        FIR_WEIGHTS(NB_TAPS - 1) and the oldest one
+        """
+        if (self.fir_type == "DIREC"):
+            return range(self.nb_taps)
+
+        return range(self.nb_taps - 1, -1, -1)
+
+    def _filter_block(self, samples):
+        """
+        filter() of every sample of a block (no zero insertion)
+        """
+        nb_samples = len(samples)
+        first      = self.nb_taps - 1
+        extended   = np.concatenate((self._history, samples))
+
+        acc = np.zeros(nb_samples, dtype = np.int64)
+        for k in self._taps():
+            acc = self._tap(extended[first - k : first - k + nb_samples], int(self.weights[k]), acc)
+
+        self._history = extended[nb_samples:]
+
+        return acc
+
+    def filter(self, samples, factor = 1, index = None):
+        """
+        Filters a block of raw samples that follows the previous block
+        without gap: data_o for y(n) = sum(FIR_WEIGHTS(k) * x(n - k)).
+
+        factor : x is <samples> with factor - 1 zeros inserted after each
+                 sample (upsampler); the taps that only see zeros are skipped
+        index  : only return y at these (increasing) positions of x
+                 (downsampler), default all len(samples) * factor outputs
+        """
+        samples = np.asarray(samples, dtype = np.int64)
+        length  = len(samples) * factor
+        first   = self.nb_taps - 1
+
+        if (factor == 1 and index is None):
+            return self._filter_block(samples)
+
+        index   = np.arange(length, dtype = np.int64) if index is None else np.asarray(index, dtype = np.int64)
+        result  = np.zeros(len(index), dtype = np.int64)
+
+        if (length == 0):
+            return result
+
+        ## Adding a zero product leaves a partial sum unchanged, so each output
+        ## phase only needs the taps aligned with the inserted samples (plus
+        ## the history for the first outputs)
+        for phase in range(factor):
+            select = (index % factor) == phase
+            if (not np.any(select)):
+                continue
+
+            outputs = index[select]
+            acc     = np.zeros(len(outputs), dtype = np.int64)
+
+            for k in self._taps():
+                position = outputs - k
+
+                if ((phase - k) % factor == 0):
+                    count = len(outputs)
+                else:
+                    count = int(np.count_nonzero(position < 0))
+                    if (count == 0):
+                        continue
+
+                values     = self._stuffed(samples, factor, position[:count])
+                acc[:count] = self._tap(values, int(self.weights[k]), acc[:count])
+
+            result[select] = acc
+
+        self._history = self._stuffed(samples, factor, np.arange(length - first, length, dtype = np.int64))
+
+        return result
+
+    def burst(self, samples, hold = None, factor = 1, step = 1):
+        """
+        Raw data_o of the valid_o cycles for one burst of valid_i samples
+        followed by an idle gap (longer than the pipeline).
+
+        hold   : data_i seen the cycle after the burst (default: the last
+                 sample, 0 if <factor> > 1)
+        factor : see filter()
+        step   : only return one output every <step> (downsampler)
+
+        fir_direct_core outputs y(n) and ends with its data registers holding
+        the last sample. fir_transpose_core presents y(n + NB_TAPS - 1),
+        loads one more sample (valid_i or its register) and then holds.
+        """
+        samples = np.asarray(samples, dtype = np.int64)
+        length  = len(samples) * factor
+        outputs = np.arange(0, length, step, dtype = np.int64)
+
+        if (length == 0):
+            return np.zeros(0, dtype = np.int64)
+
+        last = samples[-1] if factor == 1 else 0
+
+        if (self.fir_type == "DIREC"):
+            result = self.filter(samples, factor, outputs)
+            self._history[:] = last
+
+            return result
+
+        hold    = last if hold is None else hold
+        outputs = np.minimum(outputs + self.nb_taps - 1, length)
+        result  = self.filter(samples, factor, outputs[outputs < length])
+        extra   = self.filter([hold], 1, [0] if outputs[-1] == length else [])
+
+        return np.concatenate((result, np.repeat(extra, np.count_nonzero(outputs == length))))
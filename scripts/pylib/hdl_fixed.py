@@ -0,0 +1,138 @@
+#############
+## Imports ##
+#############
+
+import numpy as np
+
+################
+## Functions  ##
+################
+##
+## NumPy versions of the ieee_proposed.fixed_pkg operations used by the HDL.
+## Fixed-point values are handled as their raw two's complement integers
+## (int64), where sfixed(LEFT downto RIGHT) has the value raw * 2**RIGHT,
+## following the VHDL index convention (RIGHT is negative for fractions).
+
+def sfixed_bounds(left, right):
+    """
+    Range [min, max] of the raw value of sfixed(left downto right)
+    """
+    width = left - right + 1
+    return (-(1 << (width - 1)), (1 << (width - 1)) - 1)
+
+def ufixed_bounds(left, right):
+    """
+    Range [min, max] of the raw value of ufixed(left downto right)
+    """
+    width = left - right + 1
+    return (0, (1 << width) - 1)
+
+def wrap(raw, width, signed = True):
+    """
+    Keep the <width> LSBs of <raw> (two's complement if <signed>)
+    """
+    raw  = np.asarray(raw, dtype = np.int64)
+    mask = (1 << width) - 1
+
+    if (signed):
+        sign = 1 << (width - 1)
+        return ((raw + sign) & mask) - sign
+
+    return raw & mask
+
+def round_shift(raw, shift, rounding = "round"):
+    """
+    raw >> shift, with fixed_pkg rounding:
+        "round"    : round to nearest, ties to even (fixed_round)
+        "truncate" : towards minus infinity (fixed_truncate)
+    """
+    raw = np.asarray(raw, dtype = np.int64)
+
+    if (shift <= 0):
+        return raw << (-shift)
+
+    quotient = raw >> shift
+
+    if (rounding == "truncate"):
+        return quotient
+
+    remainder = raw & ((1 << shift) - 1)
+    half      = 1 << (shift - 1)
+    rounds    = (remainder > half) | ((remainder == half) & ((quotient & 1) == 1))
+
+    return quotient + rounds
+
+def resize(raw, arg_right, left, right, signed = True, overflow = "saturate", rounding = "round"):
+    """
+    fixed_pkg resize() of a raw value with LSB index <arg_right> into
+    (s|u)fixed(left downto right).
+
+    overflow : "saturate" (fixed_saturate) or "wrap" (fixed_wrap)
+    rounding : "round" (fixed_round) or "truncate" (fixed_truncate)
+    """
+    value = round_shift(raw, right - arg_right, rounding)
+
+    if (overflow == "wrap"):
+        return wrap(value, left - right + 1, signed)
+
+    if (signed):
+        low, high = sfixed_bounds(left, right)
+    else:
+        low, high = ufixed_bounds(left, right)
+
+    return np.clip(value, low, high)
+
+def sra(raw, count):
+    """
+    fixed_pkg "sra": arithmetic shift right keeping the same range
+    """
+    raw = np.asarray(raw, dtype = np.int64)
+
+    if (count >= 0):
+        return raw >> count
+
+    return raw << (-count)
+
+def to_sfixed(value, left, right, overflow = "saturate", rounding = "round", guard_bits = 3):
+    """
+    fixed_pkg to_sfixed(REAL, left, right) for a scalar or array of reals.
+
+    The magnitude is truncated to <guard_bits> extra fractional bits,
+    negated if needed and only then rounded, as in fixed_pkg.
+    """
+    value  = np.asarray(value, dtype = np.float64)
+    bound  = 2.0 ** left
+    low, high = sfixed_bounds(left, right)
+
+    magnitude = np.floor(np.ldexp(np.abs(value), guard_bits - right)).astype(np.int64)
+    extended  = np.where(value < 0.0, -magnitude, magnitude)
+
+    if (overflow == "wrap"):
+        extended = wrap(extended, left - right + 2 + guard_bits)
+        result   = wrap(round_shift(extended, guard_bits, rounding), left - right + 1)
+    else:
+        result = np.clip(round_shift(extended, guard_bits, rounding), low, high)
+        result = np.where(value >= bound, high, np.where(value < -bound, low, result))
+
+    return result
+
+def to_ufixed(value, left, right, overflow = "saturate", rounding = "round", guard_bits = 3):
+    """
+    fixed_pkg to_ufixed(REAL, left, right) for a scalar or array of reals
+    """
+    value = np.asarray(value, dtype = np.float64)
+    low, high = ufixed_bounds(left, right)
+
+    extended = np.floor(np.ldexp(np.maximum(value, 0.0), guard_bits - right)).astype(np.int64)
+    result   = round_shift(extended, guard_bits, rounding)
+
+    if (overflow == "wrap"):
+        return wrap(result, left - right + 1, signed = False)
+
+    return np.where(value >= 2.0 ** (left + 1), high, np.clip(result, low, high))
+
+def to_real(raw, right):
+    """
+    Value of raw fixed-point integers with LSB index <right>
+    """
+    return np.ldexp(np.asarray(raw, dtype = np.float64), right)
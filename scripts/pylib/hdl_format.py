@@ -0,0 +1,39 @@
+###############
+## Functions ##
+###############
+
+def ram_init_text(samples, word_width = None):
+    """
+    samples    : FXarray with the RAM contents (one word per address)
+    word_width : RAM word width (bits), default is the family total width
+
+    Returns the text read by initramfromfile (hdl/src/lookup_wave/sync_ram.vhd):
+    one binary word per line.
+    """
+    return samples.toWordStrings(logBase = 1, n_digits = word_width, sep = "\n") + "\n"
+
+def write_ram_init(init_file, samples, word_width = None):
+    """
+    init_file : INIT_FILE of lookup_wave/sync_ram (e.g. "RAM_INIT.dat")
+    """
+    with open(init_file, "w") as f:
+        f.write(ram_init_text(samples, word_width))
+
+def vhdl_hex_aggregate(samples, word_width = None, indent = ""):
+    """
+    samples : FXarray with the constants (e.g. FIR_WEIGHTS)
+
+    Returns the body of a VHDL aggregate of std_logic_vector literals,
+    x"..." one per line, as used in hdl/src/gen_fir/fir_weights_pkg.vhd.
+    The words are rendered in hexadecimal, so <word_width> (default the
+    family total width) must be a multiple of 4.
+    """
+    if (word_width is None):
+        word_width = samples.family.fraction_bits + samples.family.integer_bits
+
+    if (word_width % 4 != 0):
+        raise ValueError("Hexadecimal literal needs a multiple of 4 bits, got %d" % (word_width))
+
+    words = samples.toWordStrings(logBase = 4, n_digits = word_width // 4, sep = "\n").upper()
+
+    return "%sx\"%s\"" % (indent, words.replace("\n", "\",\n%sx\"" % (indent)))
@@ -0,0 +1,141 @@
+#############
+## Imports ##
+#############
+
+import os
+import stat
+import shutil
+import hashlib
+import tempfile
+import subprocess as sb
+
+###############
+## Constants ##
+###############
+
+## Sources of the ieee_proposed library, in compilation order, with their vcom options (see scripts/comp_lib.do)
+IEEE_PROPOSED_SOURCES = [("hdl/pkg/ieee_proposed/standard_additions_c.vhdl"       , ""),
+                         ("hdl/pkg/ieee_proposed/standard_textio_additions_c.vhdl", ""),
+                         ("hdl/pkg/ieee_proposed/env_c.vhdl"                      , ""),
+                         ("hdl/pkg/ieee_proposed/std_logic_1164_additions.vhdl"   , ""),
+                         ("hdl/pkg/ieee_proposed/numeric_std_additions.vhdl"      , ""),
+                         ("hdl/pkg/ieee_proposed/numeric_std_unsigned_c.vhdl"     , ""),
+                         ("hdl/pkg/ieee_proposed/fixed_float_types_c.vhdl"        , ""),
+                         ("hdl/pkg/ieee_proposed/fixed_pkg_c.vhdl"                , "-suppress 1246"),
+                         ("hdl/pkg/ieee_proposed/float_pkg_c.vhdl"                , "-suppress 1246")]
+
+LIBRARY_NAME          = "ieee_proposed"
+CACHE_ENV             = "TCC_SIM_CACHE" # overrides the default cache root
+COMPLETE_FILE         = "complete"      # written once the library is built
+
+## Simulator versions already queried by this process
+_versions             = {}
+
+###############
+## Functions ##
+###############
+
+def cache_root():
+    """
+    Root of the library cache: $TCC_SIM_CACHE, default ~/.cache/tcc_sim
+    """
+    return os.environ.get(CACHE_ENV, os.path.join(os.path.expanduser("~"), ".cache", "tcc_sim"))
+
+def simulator_version(simulator):
+    """
+    Output of "<simulator> -version" (cached per process)
+    """
+    key = tuple(simulator)
+
+    if (key not in _versions):
+        _versions[key] = sb.run(list(simulator) + ["-version"], stdout = sb.PIPE, stderr = sb.STDOUT,
+                                universal_newlines = True).stdout.strip()
+
+    return _versions[key]
+
+def library_key(src_root, simulator, sources = IEEE_PROPOSED_SOURCES):
+    """
+    Hash of the sources (names, contents, vcom options) and of the simulator version
+    """
+    digest = hashlib.sha256()
+
+    for path, options in sources:
+        digest.update(("%s %s\n" % (path, options)).encode())
+
+        with open(os.path.join(src_root, path), "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+
+    digest.update(simulator_version(simulator).encode())
+
+    return digest.hexdigest()[:16]
+
+def _compile_script(src_root, sources):
+    commands = ["vlib %s.lib" % (LIBRARY_NAME), "vmap %s %s.lib" % (LIBRARY_NAME, LIBRARY_NAME)]
+
+    for path, options in sources:
+        source = os.path.abspath(os.path.join(src_root, path)).replace("\\", "/")
+        commands.append(" ".join(word for word in ("vcom", options, "-work", LIBRARY_NAME, source) if word))
+
+    return " ; ".join(commands + ["quit -f"])
+
+def _set_read_only(root):
+    for base, dirs, files in os.walk(root):
+        for name in files:
+            path = os.path.join(base, name)
+            os.chmod(path, os.stat(path).st_mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+def library_path(src_root = ".", simulator = ("vsim",), cache = None, sources = IEEE_PROPOSED_SOURCES):
+    """
+    Path that ieee_proposed_library() returns, without building the library
+    """
+    cache = cache_root() if cache is None else cache
+
+    return os.path.join(cache, LIBRARY_NAME, library_key(src_root, simulator, sources), "%s.lib" % (LIBRARY_NAME))
+
+def ieee_proposed_library(src_root = ".", simulator = ("vsim",), cache = None, sources = IEEE_PROPOSED_SOURCES):
+    """
+    Path of the compiled ieee_proposed library for the sources of
+    <src_root> and the version of <simulator>, built in the cache the
+    first time (<cache>/ieee_proposed/<key>/ieee_proposed.lib).
+
+    The library is built in a private directory and renamed into place,
+    so concurrent callers (e.g. SweepExecutor workers) never see a partial
+    build; its files are made read-only. Map it with vmap_command().
+    """
+    path  = library_path(src_root, simulator, cache, sources)
+    entry = os.path.dirname(path)
+
+    if (os.path.isfile(os.path.join(entry, COMPLETE_FILE))):
+        return path
+
+    os.makedirs(os.path.dirname(entry), exist_ok = True)
+    build = tempfile.mkdtemp(prefix = "build_", dir = os.path.dirname(entry))
+    os.chmod(build, 0o755) # mkdtemp is private to the user
+
+    print("Compiling %s ...." % (LIBRARY_NAME))
+    code = sb.call(list(simulator) + ["-batch", "-do", _compile_script(src_root, sources)], stdout = sb.DEVNULL, cwd = build)
+
+    if (code != 0):
+        raise RuntimeError("Compilation of %s failed (exit code %d), see %s" % (LIBRARY_NAME, code, build))
+
+    with open(os.path.join(build, COMPLETE_FILE), "w") as f:
+        f.write(simulator_version(simulator) + "\n")
+
+    _set_read_only(build)
+
+    try:
+        os.rename(build, entry)
+    except OSError:
+        ## Built meanwhile by another process
+        shutil.rmtree(build, ignore_errors = True)
+
+        if (not os.path.isfile(os.path.join(entry, COMPLETE_FILE))):
+            raise
+
+    return path
+
+def vmap_command(library_path, name = LIBRARY_NAME):
+    """
+    vsim command mapping <name> on a cached library
+    """
+    return "vmap %s %s" % (name, os.path.abspath(library_path).replace("\\", "/"))
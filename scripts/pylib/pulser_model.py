@@ -0,0 +1,143 @@
+#############
+## Imports ##
+#############
+
+import numpy as np
+
+###########
+## Class ##
+###########
+
+class Pulser:
+    """
+    Run-length model of hdl/src/pulser/pulser.vhd.
+
+    The FSM spends a whole number of cycles in each state, so a wave is a
+    list of (level, length) segments expanded with np.repeat:
+
+        T1 (-1) T2 (0) T3 (+1) T4 (0)  x nb_repetitions,  then TDAMP
+
+    Quirks of the next-state logic that the model reproduces:
+        - a state is chained over when its timer is 0, and also when it is
+          1 and reached through the chain (its counter already equals 1);
+          only the first non-zero state, when the FSM loops back to it
+          after T4, runs for a timer of 1
+        - when all the non-zero timers t1 .. t4 are 1, the repetitions
+          counter also counts in ST_WAIT_BANG, so the number of pulses
+          depends on the idle time before the bang (see idle_edges)
+        - nb_repetitions = 0 gives 2**NB_REPETITIONS_WIDTH repetitions, and
+          nothing starts when t1 .. t4 or tdamp are all 0
+
+    Levels are the pulser_data_o words read as signed integers (-1, 0, +1).
+    The parameters are assumed registered (valid_i) before the bang.
+    """
+
+    ## pulser_data_o words
+    PULSER_AMP1 = -1 # "11"
+    PULSER_ZERO = 0  # "00"
+    PULSER_AMP2 = 1  # "01"
+
+    NB_TIMERS   = 4
+
+    def __init__(self, nb_repetitions_width, timer_width):
+        """
+        nb_repetitions_width : NB_REPETITIONS_WIDTH generic
+        timer_width          : TIMER_WIDTH generic
+        """
+        self.nb_repetitions_width = nb_repetitions_width
+        self.timer_width          = timer_width
+
+    @property
+    def first_edge(self):
+        """
+        Clock edge of the first valid_o, counting from the edge that samples bang_i
+        """
+        return 2
+
+    def _segments(self, t1, t2, t3, t4, tdamp, nb_repetitions, invert, triple, idle_edges):
+        """
+        Segment table of a batch of configurations (1-D arrays of the same length):
+        (first, loop, nb_loops, damp, damp_level, active)
+
+        first    : (4, B) lengths of T1 .. T4 for the pass started by the bang
+        loop     : (4, B) lengths of T1 .. T4 for the passes looping back
+        nb_loops : number of passes looping back
+        active   : False when all_zero_lock ignores the bang
+        """
+        timer_mask = (1 << self.timer_width) - 1
+        rept_mask  = (1 << self.nb_repetitions_width) - 1
+
+        timers = np.stack([np.asarray(t, dtype = np.int64) & timer_mask for t in (t1, t2, t3, t4)])
+        damp   = np.asarray(tdamp, dtype = np.int64) & timer_mask
+
+        nonzero = timers != 0
+        active  = nonzero.any(axis = 0) & (damp != 0)
+        first_non_zero = np.argmax(nonzero, axis = 0)
+
+        ## Chained states only run when their counter (at 1) does not match the timer
+        first = np.where(timers >= 2, timers, 0)
+        loop  = first.copy()
+        np.put_along_axis(loop, first_non_zero[None, :], np.take_along_axis(timers, first_non_zero[None, :], axis = 0), axis = 0)
+
+        ## nb_repetitions_done : repetitions_counter = nb_repetitions_reg - 1
+        target = (np.asarray(nb_repetitions, dtype = np.int64) - 1) & rept_mask
+        if (np.any(active & (target > timer_mask))):
+            raise ValueError("repetitions_counter (%d bits) never reaches nb_repetitions - 1, the pulser never ends" % (self.timer_width))
+
+        ## The counter counts while waiting the bang when the whole pass can be chained
+        idle_count = (~first.any(axis = 0)) & active
+        start      = target if idle_edges is None else np.minimum(idle_edges, target)
+        nb_loops   = target - np.where(idle_count, start, 0)
+
+        damp_level = np.where(np.asarray(triple, dtype = bool), self.PULSER_AMP1, self.PULSER_ZERO)
+        damp_level = np.where(np.asarray(invert, dtype = bool), -damp_level, damp_level)
+
+        return (first, loop, nb_loops, damp, damp_level, active)
+
+    def run_batch(self, t1, t2, t3, t4, tdamp, nb_repetitions, invert = False, triple = False, idle_edges = None):
+        """
+        Waves of a batch of configurations, every parameter being a scalar or
+        a 1-D array (port values as integers, truncated to the port widths).
+
+        idle_edges : ST_WAIT_BANG edges between the repetitions counter reset
+                     (areset_i or the previous pulser_done) and the bang,
+                     default long enough for the counter to settle. Only
+                     used when every non-zero timer of t1 .. t4 is 1.
+
+        Returns a list of raw (pulser_data_o, pulser_done_o) of the valid_o
+        cycles, one per configuration (empty if the bang is ignored).
+        """
+        params = np.broadcast_arrays(*[np.atleast_1d(p) for p in (t1, t2, t3, t4, tdamp, nb_repetitions, invert, triple)])
+        [first, loop, nb_loops, damp, damp_level, active] = self._segments(*params, idle_edges = idle_edges)
+
+        nb_configs  = first.shape[1]
+        nb_segments = np.where(active, self.NB_TIMERS * (nb_loops + 1) + 1, 0)
+        config      = np.repeat(np.arange(nb_configs), nb_segments)
+        position    = np.arange(len(config)) - np.repeat(np.cumsum(nb_segments) - nb_segments, nb_segments)
+
+        in_damp  = position == self.NB_TIMERS * (nb_loops[config] + 1)
+        state    = position % self.NB_TIMERS
+        lengths  = np.where(position < self.NB_TIMERS, first[state, config], loop[state, config])
+        lengths  = np.where(in_damp, damp[config], lengths)
+
+        ## T1 / T3 levels, swapped by invert_pulser
+        levels   = np.array([self.PULSER_AMP1, self.PULSER_ZERO, self.PULSER_AMP2, self.PULSER_ZERO], dtype = np.int64)
+        invert   = params[6].astype(bool)[config]
+        levels   = np.where(invert, -levels[state], levels[state])
+        levels   = np.where(in_damp, damp_level[config], levels)
+
+        data     = np.repeat(levels, lengths)
+        done     = np.zeros(len(data), dtype = bool)
+
+        totals   = np.bincount(config, weights = lengths, minlength = nb_configs).astype(np.int64)
+        ends     = np.cumsum(totals)
+        done[ends[totals > 0] - 1] = True
+
+        return list(zip(np.split(data, ends[:-1]), np.split(done, ends[:-1])))
+
+    def run(self, t1, t2, t3, t4, tdamp, nb_repetitions, invert = False, triple = False, idle_edges = None):
+        """
+        Raw (pulser_data_o, pulser_done_o) of the valid_o cycles for one
+        configuration, see run_batch()
+        """
+        return self.run_batch(t1, t2, t3, t4, tdamp, nb_repetitions, invert, triple, idle_edges)[0]
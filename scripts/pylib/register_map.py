@@ -0,0 +1,67 @@
+#############
+## Imports ##
+#############
+
+import re
+
+###############
+## Functions ##
+###############
+
+def read_register_map(pkg_file):
+    """
+    pkg_file : register bank package in the format of hdl/src/register_bank/*_regs_pkg.vhd
+
+    Returns {register : (offset, {field : (bit_offset, bit_width, reset)})}
+    with the byte offsets and reset values as integers.
+    """
+    with open(pkg_file, "r") as f:
+        text = f.read()
+
+    registers = {}
+    for match in re.finditer(r"constant\s+\w+_OFFSET\s*:\s*unsigned\s*\([^)]*\)\s*:=\s*unsigned'\(x\"([0-9a-fA-F]+)\"\)\s*;"
+                             r"\s*--\s*address offset of the '(\w+)' register", text):
+        registers[match.group(2)] = (int(match.group(1), 16), {})
+
+    for match in re.finditer(r"--\s*Field '(\w+)\.(\w+)'\s*"
+                             r"constant\s+\w+_BIT_OFFSET\s*:\s*natural\s*:=\s*(\d+)\s*;[^\n]*\s*"
+                             r"constant\s+\w+_BIT_WIDTH\s*:\s*natural\s*:=\s*(\d+)\s*;[^\n]*\s*"
+                             r"constant\s+\w+_RESET\s*:[^:]*:=\s*std_logic_vector'\(\"([01]+)\"\)", text):
+        [register, field] = [match.group(1), match.group(2)]
+
+        if (register not in registers):
+            raise ValueError("Field %s of unknown register %s in %s" % (field, register, pkg_file))
+
+        registers[register][1][field] = (int(match.group(3)), int(match.group(4)), int(match.group(5), 2))
+
+    if (not registers):
+        raise ValueError("No register found in %s" % (pkg_file))
+
+    return registers
+
+def decode_registers(writes, register_map):
+    """
+    writes       : {register name or byte offset : 32-bit word written on the AXI bus}
+    register_map : see read_register_map()
+
+    Returns the field values {<register>_<field> : value} (the names of the
+    *_value / *_<field> ports of the register bank), fields of the
+    registers that are not written keep their reset value.
+    """
+    names = {offset : name for name, (offset, _) in register_map.items()}
+
+    fields = {}
+    for name, (_, register_fields) in register_map.items():
+        for field, (_, _, reset) in register_fields.items():
+            fields["%s_%s" % (name, field)] = reset
+
+    for key, word in writes.items():
+        name = names.get(key, key) if isinstance(key, int) else key
+
+        if (name not in register_map):
+            raise ValueError("Unknown register %s, expected one of %s" % (key, list(register_map)))
+
+        for field, (bit_offset, bit_width, _) in register_map[name][1].items():
+            fields["%s_%s" % (name, field)] = (int(word) >> bit_offset) & ((1 << bit_width) - 1)
+
+    return fields
@@ -0,0 +1,133 @@
+#############
+## Imports ##
+#############
+
+import os
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+from   concurrent.futures import ProcessPoolExecutor
+
+###############
+## Functions ##
+###############
+
+def figure_pixels(figsize):
+    """
+    Width in pixels of a figure of <figsize> inches, the upper bound of
+    the width of its axes
+    """
+    return int(np.ceil(figsize[0] * matplotlib.rcParams["figure.dpi"]))
+
+def decimate(x, y, nb_bins, log = False):
+    """
+    [x, y] of a trace (x increasing) reduced for a plot <nb_bins> pixels
+    wide: the first and last samples, and the min and max samples of
+    <nb_bins> equal ranges of x (of log(x) with <log>, the samples at
+    x <= 0 being kept). A line through them draws as through every sample.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+
+    if (len(y) <= 4 * nb_bins):
+        return [x, y]
+
+    first = np.searchsorted(x, 0.0, side = "right") if log else 0
+
+    if (log and first < len(x) - 1):
+        starts = np.concatenate((np.arange(first), np.searchsorted(x, np.geomspace(x[first], x[-1], nb_bins + 1)[:-1])))
+    else:
+        starts = np.searchsorted(x, np.linspace(x[0], x[-1], nb_bins + 1)[:-1])
+
+    starts = np.unique(starts)
+    bins   = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(y))))
+    keep   = [[0, len(y) - 1]]
+
+    ## First sample reaching the extremum of its bin
+    for extremum in (np.minimum, np.maximum):
+        hits = np.flatnonzero(y == extremum.reduceat(y, starts)[bins])
+        keep.append(hits[np.unique(bins[hits], return_index = True)[1]])
+
+    index = np.unique(np.concatenate(keep))
+
+    return [x[index], y[index]]
+
+def envelope(x, low, high):
+    """
+    [x, y] of a line drawing the min/max envelope <low>, <high> at <x>
+    (see block_analysis.MinMaxDecimator)
+    """
+    return [np.repeat(x, 2), np.column_stack((low, high)).ravel()]
+
+def _init_worker():
+    plt.switch_backend("Agg")
+
+def _render(plot, fig_name, args):
+    fig = plot(*args)
+
+    try:
+        fig.savefig(fig_name)
+    finally:
+        plt.close(fig)
+
+    return fig_name
+
+###########
+## Class ##
+###########
+
+class FigureRenderer:
+    """
+    Headless rendering of report figures in a process pool on the Agg
+    backend: submit() returns at once, the PNGs of a sweep are drawn and
+    written by as many workers as cores. A figure is plot(*args), <plot>
+    being a module-level function or a static method (it is pickled to the
+    workers) that draws from plain arrays and returns the figure; the
+    traces should be decimated (see decimate()) before being sent.
+    """
+
+    def __init__(self, nb_workers = None):
+        """
+        nb_workers : processes of the pool, default is the number of cores
+        """
+        self.nb_workers = os.cpu_count() if nb_workers is None else nb_workers
+        self.pool       = None
+        self.futures    = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def submit(self, plot, fig_name, *args):
+        """
+        Renders plot(*args) to <fig_name> (relative to the current
+        directory), returns its future
+        """
+        if (self.pool is None):
+            self.pool = ProcessPoolExecutor(max_workers = max(1, self.nb_workers), initializer = _init_worker)
+
+        future = self.pool.submit(_render, plot, os.path.abspath(fig_name), args)
+        self.futures.append(future)
+
+        return future
+
+    def wait(self):
+        """
+        Waits for the submitted figures, returns their files and raises the
+        first rendering error
+        """
+        [futures, self.futures] = [self.futures, []]
+
+        return [future.result() for future in futures]
+
+    def close(self):
+        if (self.pool is None):
+            return
+
+        try:
+            self.wait()
+        finally:
+            self.pool.shutdown()
+            self.pool = None
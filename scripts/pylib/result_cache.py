@@ -0,0 +1,141 @@
+#############
+## Imports ##
+#############
+
+import os
+import hashlib
+import zipfile
+import tempfile
+from   pylib.lib_cache import cache_root
+
+###############
+## Constants ##
+###############
+
+RESULTS_DIR = "results"  # under lib_cache.cache_root()
+MAX_BYTES   = 1 << 30    # default size bound of the cache
+ENTRY_EXT   = ".zip"
+
+###############
+## Functions ##
+###############
+
+def result_key(*parts):
+    """
+    Hash of the string parts of a simulation (testbench, vsim command,
+    build key of its sources, ...)
+    """
+    digest = hashlib.sha256()
+
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+###########
+## Class ##
+###########
+
+class ResultCache:
+    """
+    Content-addressed store of simulation outputs: an entry is a zip
+    (deflated) of the output files of one run, named by its result_key().
+    Entries are written to a temporary file and renamed into place, so
+    concurrent sweep workers share the cache safely. The modification time
+    of an entry is its last use: once the cache exceeds <max_bytes>, the
+    least recently used entries are evicted.
+    """
+
+    def __init__(self, root = None, max_bytes = MAX_BYTES):
+        """
+        root      : directory of the entries, default <cache_root()>/results
+        max_bytes : size bound of the entries
+        """
+        self.root      = os.path.join(cache_root(), RESULTS_DIR) if root is None else root
+        self.max_bytes = max_bytes
+
+    def _entry(self, key):
+        return os.path.join(self.root, key + ENTRY_EXT)
+
+    def has(self, key):
+        return os.path.isfile(self._entry(key))
+
+    def get(self, key, files):
+        """
+        Restores the output <files> of the entry <key>, returns False when
+        there is no entry (the files are left untouched)
+        """
+        entry = self._entry(key)
+
+        try:
+            with zipfile.ZipFile(entry, "r") as archive:
+                contents = [archive.read(os.path.basename(path)) for path in files]
+
+            os.utime(entry)
+        except (OSError, KeyError, zipfile.BadZipFile):
+            return False
+
+        for path, content in zip(files, contents):
+            with open(path, "wb") as f:
+                f.write(content)
+
+        return True
+
+    def put(self, key, files):
+        """
+        Stores the output <files> as the entry <key>, then evicts
+        """
+        os.makedirs(self.root, exist_ok = True)
+        [handle, temp] = tempfile.mkstemp(prefix = ".put_", dir = self.root)
+        os.close(handle)
+
+        try:
+            with zipfile.ZipFile(temp, "w", zipfile.ZIP_DEFLATED) as archive:
+                for path in files:
+                    archive.write(path, os.path.basename(path))
+
+            os.replace(temp, self._entry(key))
+        finally:
+            if (os.path.isfile(temp)):
+                os.remove(temp)
+
+        self.evict()
+
+    def entries(self):
+        """
+        [(last use, size, path)] of the entries, least recently used first
+        """
+        entries = []
+
+        for name in os.listdir(self.root) if os.path.isdir(self.root) else []:
+            if (not name.endswith(ENTRY_EXT)):
+                continue
+
+            path = os.path.join(self.root, name)
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            entries.append((info.st_mtime, info.st_size, path))
+
+        return sorted(entries)
+
+    def evict(self, max_bytes = None):
+        """
+        Removes the least recently used entries until the cache holds at
+        most <max_bytes> (default self.max_bytes)
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries   = self.entries()
+        size      = sum(entry[1] for entry in entries)
+
+        for [_, entry_size, path] in entries:
+            if (size <= max_bytes):
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entry_size
@@ -0,0 +1,167 @@
+#############
+## Imports ##
+#############
+
+import numpy as np
+from   pylib import hdl_fixed
+from   pylib.averager_model import AveragerV2
+from   pylib.time_zones_model import FsmTimeZones
+
+###########
+## Class ##
+###########
+
+class RxChain:
+    """
+    Streaming model of the receive path of hdl/src/top/top_rx.vhd
+    (downsampler = None) and hdl/src/top/top_rx_down.vhd, as instantiated by
+    top.vhd / top_win.vhd:
+
+        rx_wave_data_i (enable_rx) -> [downsampler] -> averager_v2 -> s_axis_s2mm_0
+
+    The input are the rx_wave_data_i words of the enable_rx_o cycles
+    (rx_wave_valid_i assumed high), shot after shot, in chunks of any size:
+    a shot is <shot_points> samples, the last one with rx_last_word_o. Only
+    the incomplete shot and the averager frame are kept between chunks.
+
+    top_rx configures the ring_fifo with nb_points - 1, top_rx_down with
+    nb_points, so its frames have nb_points + 1 points.
+    """
+
+    ## Values of hdl/pkg/defs_pkg.vhd
+    OUTPUT_WIDTH      = 10
+    NB_SHOTS_WIDTH    = 6
+    AVG_MAX_NB_POINTS = 65536
+
+    ## s_axis_s2mm_0
+    S2MM_WIDTH        = 32
+
+    def __init__(self, nb_points, nb_repetitions, shot_points = None, downsampler = None):
+        """
+        nb_points      : control_nb_points_wave_i (wave_nb_points register)
+        nb_repetitions : control_nb_repetitions_wave_i (fsm_nb_repetitions register)
+        shot_points    : RX samples per shot, default fills exactly one frame
+        downsampler    : updown_model.Downsampler of top_rx_down
+        """
+        self.downsampler = downsampler
+        self.averager    = AveragerV2(-(self.OUTPUT_WIDTH - 2), self.AVG_MAX_NB_POINTS, self.NB_SHOTS_WIDTH)
+
+        addr_mask = (1 << (self.AVG_MAX_NB_POINTS.bit_length())) - 1
+        if (downsampler is None):
+            max_addr = (int(nb_points) - 1) & addr_mask
+        else:
+            max_addr = int(nb_points) & addr_mask
+
+        self.averager.configure(max_addr + 1, int(nb_repetitions) & ((1 << self.NB_SHOTS_WIDTH) - 1))
+
+        factor           = 1 if downsampler is None else downsampler.factor
+        self.shot_points = self.frame_points * factor if shot_points is None else shot_points
+
+        ## The downsampler outputs the first sample of every group, incomplete or not
+        down_points = -(-self.shot_points // factor)
+        if (down_points != self.frame_points):
+            raise ValueError("Shots of %d samples give %d averager points, the frame has %d"
+                             % (self.shot_points, down_points, self.frame_points))
+
+        self.reset()
+
+    @classmethod
+    def from_tx(cls, tx_chain, downsampler = None):
+        """
+        RX configured by the registers of a tx_model.TxChain, one shot
+        being the RX zone of fsm_time_zones_v2
+        """
+        fields = tx_chain.fields
+        fsm    = tx_chain.fsm
+
+        return cls(fields["wave_nb_points_value"], fields["fsm_nb_repetitions_value"],
+                   fsm._count(fields["fsm_rx_timer_value"], fsm.RX_TIME_WIDTH), downsampler)
+
+    @property
+    def frame_points(self):
+        return self.averager.nb_points
+
+    @property
+    def nb_repetitions(self):
+        return self.averager.nb_repetitions
+
+    def reset(self):
+        """
+        State after areset_i
+        """
+        self._pending = np.zeros(0, dtype = np.int64)
+        self.averager.reset()
+
+        if (self.downsampler is not None):
+            self.downsampler.reset()
+
+    def s2mm(self, data, last):
+        """
+        Raw (tdata, tkeep, tlast) of s_axis_s2mm_0 for averager words:
+        tdata is the zero-extended word, tkeep is all ones
+        """
+        tdata = hdl_fixed.wrap(data, self.OUTPUT_WIDTH, signed = False).astype(np.uint32)
+        tkeep = np.full(tdata.shape, (1 << (self.S2MM_WIDTH // 8)) - 1, dtype = np.uint8)
+
+        return (tdata, tkeep, np.asarray(last, dtype = bool))
+
+    def _average(self, shots):
+        """
+        Averaged frames of consecutive shots (rows of <shots>), the whole
+        frames that do not continue a pending one are averaged at once
+        """
+        frames = []
+        index  = 0
+
+        while (index < len(shots) and self.averager.pending_shots):
+            frame  = self.averager.push(shots[index])
+            index += 1
+
+            if (frame is not None):
+                frames.append(frame)
+
+        nb_frames = (len(shots) - index) // self.nb_repetitions
+        if (nb_frames):
+            block  = shots[index : index + nb_frames * self.nb_repetitions]
+            [data, last] = self.averager.average(block.reshape(nb_frames, self.nb_repetitions, self.frame_points))
+            frames.extend(zip(data, last))
+            index += nb_frames * self.nb_repetitions
+
+        for shot in shots[index:]:
+            frame = self.averager.push(shot)
+
+            if (frame is not None):
+                frames.append(frame)
+
+        return frames
+
+    def feed(self, samples):
+        """
+        samples : raw rx_wave_data_i words following the previous ones
+
+        Returns the raw (tdata, tlast) of s_axis_st of the averager for the
+        frames completed by these samples.
+        """
+        samples = hdl_fixed.wrap(np.ravel(samples), self.OUTPUT_WIDTH)
+        samples = np.concatenate((self._pending, samples))
+
+        nb_shots      = len(samples) // self.shot_points
+        self._pending = samples[nb_shots * self.shot_points:]
+        shots         = samples[:nb_shots * self.shot_points].reshape(nb_shots, self.shot_points)
+
+        if (self.downsampler is not None):
+            shots = np.array([self.downsampler.burst(shot)[0] for shot in shots],
+                             dtype = np.int64).reshape(nb_shots, self.frame_points)
+
+        return self._average(shots)
+
+    def stream(self, chunks):
+        """
+        Generator of (data, tdata, tkeep, tlast) for every averaged frame of
+        an iterable of sample chunks (e.g. np.memmap slices or a reader
+        generator): data are the signed raw averaged words, the others the
+        s_axis_s2mm_0 beats of the frame
+        """
+        for chunk in chunks:
+            for data, last in self.feed(chunk):
+                yield (data,) + self.s2mm(data, last)
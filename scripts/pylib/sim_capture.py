@@ -0,0 +1,312 @@
+#############
+## Imports ##
+#############
+
+import os
+import numpy as np
+
+###############
+## Constants ##
+###############
+
+## Nibble value of every byte, 0xFF flags a byte that is not a hex digit
+_HEX_LUT = np.full(256, 0xFF, dtype=np.uint8)
+for _i, _c in enumerate(b"0123456789abcdef"):
+    _HEX_LUT[_c] = _i
+    _HEX_LUT[ord(chr(_c).upper())] = _i
+
+_NEWLINE = ord("\n")
+_CR      = ord("\r")
+
+## Header of the binary captures of sim_write2file (BINARY_MODE), little-endian
+CAPTURE_MAGIC = b"SW2F"
+HEADER_DTYPE  = np.dtype([("magic", "S4"), ("version", "<u1"), ("flags", "<u1"), ("width", "<u2"),
+                          ("frac_bits", "<i2"), ("word_bytes", "<u2"), ("sample_rate", "<u4")])
+FLAG_SIGNED   = 0x01
+
+###############
+## Functions ##
+###############
+
+def decimal_precision(frac_width):
+    """
+    Number of decimal digits FXnum.toDecimalString() prints for a family
+    with <frac_width> fractional bits (the default precision of SPFPM).
+    """
+    return int((3 + frac_width) / 3.32)
+
+def _parse_lines(buf):
+    """
+    Fallback for captures whose lines do not share the same width
+    """
+    lines = bytes(buf).split()
+    return np.array([int(line, 16) for line in lines], dtype=np.int64)
+
+def parse_hex(data):
+    """
+    data : bytes-like contents of a sim_write2file capture (one hex word per line)
+
+    Returns the unsigned words as an int64 array. Lines written by
+    sim_write2file all have the same width, so the whole file is decoded
+    at once through a nibble lookup table.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+
+    if (buf.size == 0):
+        return np.zeros(0, dtype=np.int64)
+
+    if (buf[-1] != _NEWLINE):
+        buf = np.append(buf, np.uint8(_NEWLINE))
+
+    stride = int(np.argmax(buf == _NEWLINE)) + 1
+
+    if (buf.size % stride != 0):
+        return _parse_lines(buf)
+
+    rows = buf.reshape(-1, stride)
+
+    if (not np.all(rows[:, -1] == _NEWLINE)):
+        return _parse_lines(buf)
+
+    nb_digits = stride - 1
+    if (nb_digits > 0 and rows[0, nb_digits - 1] == _CR):
+        nb_digits -= 1
+
+    if (nb_digits == 0 or nb_digits > 15):
+        return _parse_lines(buf)
+
+    nibbles = _HEX_LUT[rows[:, :nb_digits]]
+
+    if (np.any(nibbles == 0xFF)):
+        raise ValueError("Capture contains non-hexadecimal characters")
+
+    weights = np.int64(16) ** np.arange(nb_digits - 1, -1, -1, dtype=np.int64)
+
+    return nibbles.astype(np.int64) @ weights
+
+def sign_extend(value, word_width):
+    """
+    Two's complement interpretation of the <word_width> LSBs of <value>
+    """
+    value = np.asarray(value, dtype=np.int64)
+    sign  = np.int64(1) << (word_width - 1)
+
+    return np.where(value & sign, value - (sign << 1), value)
+
+def scale_raw(raw, frac_width, exact=False):
+    """
+    raw        : signed integer samples
+    frac_width : number of fractional bits of the samples
+    exact      : if True, return raw * 2**-frac_width
+
+    By default the result is bit-identical to the historical conversion
+    through FXnum(...).toDecimalString() followed by a float parse, which
+    truncates the magnitude to decimal_precision(frac_width) digits.
+    """
+    raw = np.asarray(raw, dtype=np.int64)
+
+    if (exact):
+        return np.ldexp(raw.astype(np.float64), -frac_width)
+
+    decimal_scale = 10 ** decimal_precision(frac_width)
+    magnitude     = np.abs(raw)
+
+    if (magnitude.size and int(magnitude.max()) * decimal_scale >= 2**63):
+        digits = (magnitude.astype(object) * decimal_scale) >> frac_width
+        digits = digits.astype(np.float64)
+    else:
+        digits = ((magnitude * decimal_scale) >> frac_width).astype(np.float64)
+
+    value = digits / decimal_scale
+
+    return np.where(raw < 0, -value, value)
+
+def load_hex(source_file, word_width, frac_width, raw=False, exact=False):
+    """
+    source_file : capture written by hdl/sim/testbench_tools/sim_write2file.vhd
+    word_width  : width of the captured signal (bits, sign included)
+    frac_width  : fractional bits of the captured signal
+    raw         : if True, return the sign-extended integers instead of floats
+    exact       : see scale_raw()
+    """
+    with open(source_file, "rb") as f:
+        data = sign_extend(parse_hex(f.read()), word_width)
+
+    if (raw):
+        return data
+
+    return scale_raw(data, frac_width, exact)
+
+
+def read_header(source_file):
+    """
+    Header of a binary capture as a dict (version, signed, width,
+    frac_bits, word_bytes, sample_rate), None for a text capture
+    """
+    with open(source_file, "rb") as f:
+        data = f.read(HEADER_DTYPE.itemsize)
+
+    if (len(data) < HEADER_DTYPE.itemsize or not data.startswith(CAPTURE_MAGIC)):
+        return None
+
+    header = np.frombuffer(data, dtype=HEADER_DTYPE)[0]
+
+    return {"version"     : int(header["version"]),
+            "signed"      : bool(header["flags"] & FLAG_SIGNED),
+            "width"       : int(header["width"]),
+            "frac_bits"   : int(header["frac_bits"]),
+            "word_bytes"  : int(header["word_bytes"]),
+            "sample_rate" : int(header["sample_rate"])}
+
+def _word_dtype(header):
+    return np.dtype("<%s%d" % ("i" if header["signed"] else "u", header["word_bytes"]))
+
+def load_bin(source_file, raw=False, exact=False):
+    """
+    source_file : binary capture of sim_write2file (BINARY_MODE)
+    raw         : if True, return the integers as a read-only np.memmap of
+                  the file (no copy, no parsing)
+    exact       : see scale_raw()
+
+    Returns (data, header), the samples being scaled with the frac_bits of
+    the header unless <raw>.
+    """
+    header = read_header(source_file)
+
+    if (header is None):
+        raise ValueError("%s is not a binary capture" % (source_file))
+
+    dtype = _word_dtype(header)
+
+    if (os.path.getsize(source_file) <= HEADER_DTYPE.itemsize):
+        data = np.zeros(0, dtype=dtype)
+    else:
+        data = np.memmap(source_file, dtype=dtype, mode="r", offset=HEADER_DTYPE.itemsize)
+
+    if (raw):
+        return (data, header)
+
+    return (scale_raw(data, header["frac_bits"], exact), header)
+
+def write_bin(file_name, raw, width, frac_bits, sample_rate, signed=True):
+    """
+    Binary capture of the integers <raw>, as written by sim_write2file
+    (BINARY_MODE): words of the smallest integer size holding <width>
+    bits, sign-extended from width bits (zero-extended if not <signed>)
+    """
+    word_bytes = next(size for size in (1, 2, 4, 8) if width <= 8 * size)
+    header     = {"signed" : signed, "word_bytes" : word_bytes}
+    raw        = np.asarray(raw, dtype=np.int64) & ((1 << width) - 1)
+
+    if (signed):
+        raw = sign_extend(raw, width)
+
+    values = np.array([(CAPTURE_MAGIC, 1, FLAG_SIGNED if signed else 0, width, frac_bits, word_bytes, sample_rate)],
+                      dtype=HEADER_DTYPE)
+
+    with open(file_name, "wb") as f:
+        f.write(values.tobytes())
+        f.write(raw.astype(_word_dtype(header)).tobytes())
+
+def load_capture(source_file, word_width, frac_width, raw=False, exact=False):
+    """
+    load_hex() of a text capture, load_bin() of a binary one (detected by
+    its header, <word_width> and <frac_width> are then unused)
+    """
+    if (read_header(source_file) is not None):
+        return load_bin(source_file, raw, exact)[0]
+
+    return load_hex(source_file, word_width, frac_width, raw, exact)
+
+def _compact_dtype(word_width):
+    return next(np.dtype(dtype) for dtype in (np.int8, np.int16, np.int32, np.int64) if word_width <= 8 * np.dtype(dtype).itemsize)
+
+def capture_length(source_file):
+    """
+    Number of samples of a capture (binary from its size, text from the
+    width of its first line, exact when all lines share it)
+    """
+    header = read_header(source_file)
+    size   = os.path.getsize(source_file)
+
+    if (header is not None):
+        return (size - HEADER_DTYPE.itemsize) // header["word_bytes"]
+
+    with open(source_file, "rb") as f:
+        stride = len(f.readline())
+
+    return 0 if stride == 0 else -(-size // stride)
+
+def iter_capture(source_file, word_width, frac_width, block_size=1 << 20, sample_rate=1.0):
+    """
+    Generator of the CaptureBlock of <block_size> consecutive samples (the
+    last one shorter) of a text or binary capture, holding one block in
+    memory at a time. The raw samples are sign-extended integers of the
+    smallest dtype holding <word_width> bits. Binary captures give their
+    own width, frac bits and sample rate, and their blocks are views of a
+    np.memmap.
+    """
+    header = read_header(source_file)
+
+    if (header is not None):
+        data = load_bin(source_file, raw=True)[0]
+
+        for start in range(0, len(data), block_size):
+            yield CaptureBlock(data[start : start + block_size], start, header["frac_bits"], header["sample_rate"])
+        return
+
+    dtype = _compact_dtype(word_width)
+    start = 0
+    rest  = b""
+
+    with open(source_file, "rb") as f:
+        stride = len(f.readline())
+        f.seek(0)
+
+        while (True):
+            chunk = f.read(max(stride, 1) * block_size)
+            data  = rest + chunk
+
+            ## Blocks end on a line end, the partial line goes to the next one
+            end  = data.rfind(b"\n") + 1 if chunk else len(data)
+            rest = data[end:]
+
+            if (end):
+                raw = sign_extend(parse_hex(data[:end]), word_width).astype(dtype)
+                yield CaptureBlock(raw, start, frac_width, sample_rate)
+                start += len(raw)
+
+            if (not chunk):
+                return
+
+###########
+## Class ##
+###########
+
+class CaptureBlock:
+    """
+    Samples [start, start + len(raw)) of a capture (see iter_capture()):
+    compact raw integers and the metadata to scale them, the time axis
+    being computed from the sample index when asked for
+    """
+
+    def __init__(self, raw, start, frac_width, sample_rate):
+        self.raw         = raw
+        self.start       = start
+        self.frac_width  = frac_width
+        self.sample_rate = sample_rate
+
+    def __len__(self):
+        return len(self.raw)
+
+    def index(self):
+        return np.arange(self.start, self.start + len(self.raw))
+
+    def time(self):
+        return self.index() / self.sample_rate
+
+    def values(self, exact=False):
+        """
+        Samples as floats, see scale_raw()
+        """
+        return scale_raw(self.raw, self.frac_width, exact)
@@ -0,0 +1,147 @@
+#############
+## Imports ##
+#############
+
+import re
+import subprocess as sb
+
+###############
+## Constants ##
+###############
+
+MARKER       = "@@sim_session_%d@@"                 # echoed after every command
+RE_ERROR     = re.compile(r"\*\* (Error|Fatal)\b")  # vsim messages failing a command
+RE_PROMPT    = re.compile(r"^(VSIM\s*\d*>\s*)+")
+
+###########
+## Class ##
+###########
+
+class SimSession:
+    """
+    One vsim process in command line mode (vsim -c) driven over its stdin,
+    so a series of simulations pays the startup and the license checkout
+    once. Every command is followed by "echo <marker>": its output are the
+    lines printed before the marker, a "** Error" or "** Fatal" message
+    raises a RuntimeError.
+
+    The testbenches write their outputs through files closed at the end of
+    the simulation, so simulate() unloads the design after the run (quit
+    -sim). The next load elaborates the units as they are in the library,
+    recompiled ones included (vsim keeps restart for a design that stays
+    loaded).
+
+    The process starts at the first command, in <cwd> (the work/ directory
+    of a project tree, see SimDDS), and ends with close() or the with block.
+    It runs with -onfinish stop, so a testbench ending with std.env.finish
+    stops instead of quitting vsim; a process that dies anyway is started
+    again by the next command (the design it had loaded is lost).
+    """
+
+    def __init__(self, simulator = ("vsim",), cwd = "."):
+        """
+        simulator : command line of vsim (see fake_vsim.FAKE_VSIM)
+        cwd       : directory of the process, holding modelsim.ini
+        """
+        self.simulator = list(simulator)
+        self.cwd       = cwd
+        self.process   = None
+        self.loaded    = None
+        self._count    = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def start(self):
+        if (self.process is not None and self.process.poll() is not None):
+            print("WARNING: vsim exited (code %d), restarting" % (self.process.returncode))
+            self.process = None
+
+        if (self.process is None):
+            self.process = sb.Popen(self.simulator + ["-c", "-onfinish", "stop"], stdin = sb.PIPE, stdout = sb.PIPE,
+                                    stderr = sb.STDOUT, universal_newlines = True, bufsize = 1, cwd = self.cwd)
+            self.loaded  = None
+
+    def command(self, command):
+        """
+        Runs one vsim command, returns its output lines
+        """
+        self.start()
+
+        self._count += 1
+        marker       = MARKER % (self._count)
+
+        self.process.stdin.write("%s\necho %s\n" % (command, marker))
+        self.process.stdin.flush()
+
+        lines = []
+        for line in self.process.stdout:
+            line = RE_PROMPT.sub("", line.rstrip("\n"))
+
+            if (marker in line):
+                break
+            lines.append(line)
+        else:
+            ## Started again by the next command
+            code         = self.process.wait()
+            self.process = None
+            self.loaded  = None
+            print("WARNING: vsim exited (code %d) on \"%s\", restarting" % (code, command))
+
+        if (any(RE_ERROR.search(line) for line in lines)):
+            raise RuntimeError("vsim failed on \"%s\":\n%s" % (command, "\n".join(lines)))
+
+        return lines
+
+    def load(self, entity, generics = None, library = "work"):
+        """
+        Loads <library>.<entity> with the generics {name : value}, the
+        loaded design (if any) is unloaded first
+        """
+        generics = {} if generics is None else generics
+
+        self.unload()
+        self.command("vsim %s %s.%s" % (" ".join("-g%s=%s" % (name, generics[name]) for name in generics), library, entity))
+        self.loaded = entity
+
+    def restart(self):
+        self.command("restart -f")
+
+    def run(self, run_time):
+        """
+        run_time : "<time> <unit>" or "-all"
+        """
+        return self.command("run %s" % (run_time))
+
+    def unload(self):
+        if (self.loaded is not None):
+            self.command("quit -sim")
+            self.loaded = None
+
+    def simulate(self, entity, generics, run_time, library = "work"):
+        """
+        load(), run() and unload(): the output files of the testbench are
+        complete when it returns
+        """
+        self.load(entity, generics, library)
+        lines = self.run(run_time)
+        self.unload()
+
+        return lines
+
+    def close(self):
+        if (self.process is None):
+            return
+
+        try:
+            self.process.stdin.write("quit -f\n")
+            self.process.stdin.close()
+        except OSError:
+            pass
+
+        self.process.wait()
+        self.process = None
+        self.loaded  = None
@@ -0,0 +1,134 @@
+#############
+## Imports ##
+#############
+
+import os
+import shutil
+import tempfile
+import functools
+from   concurrent.futures import ProcessPoolExecutor
+
+###############
+## Constants ##
+###############
+
+## Files rewritten by the simulation scripts before compiling
+MUTABLE_FILES = ["hdl/sim/sim_input_pkg.vhd", "hdl/pkg/defs_pkg.vhd"]
+
+## Entries of the work/ directory of the project copied into every workspace
+## (vmap rewrites modelsim.ini; the work library is compiled per workspace
+## since defs_pkg.vhd differs between points, ieee_proposed is mapped from
+## the cache of lib_cache.py)
+SHARED_WORK   = ["modelsim.ini"]
+
+## Workspace of the current worker process (see SweepExecutor)
+_workspace    = None
+
+###############
+## Functions ##
+###############
+
+def _link(src, dest):
+    """
+    Symbolic link to <src>, copy if the platform refuses links
+    """
+    try:
+        os.symlink(os.path.abspath(src), dest)
+    except (OSError, NotImplementedError):
+        shutil.copy2(src, dest)
+
+def make_workspace(src_root, dest, mutable_files = MUTABLE_FILES, shared_work = SHARED_WORK):
+    """
+    Overlay of the project <src_root> in <dest>: hdl/ and the *.do scripts
+    are linked file by file, <mutable_files> (relative to the root) are
+    copied so they can be rewritten, and work/ is a new directory holding
+    copies of the <shared_work> entries of src_root/work.
+
+    The *.do scripts and the simulation scripts only use paths relative to
+    the root (or to work/), so a simulation run from <dest> compiles into
+    and reads from its own work/.
+
+    Returns <dest>.
+    """
+    mutable = set(os.path.normpath(path) for path in mutable_files)
+
+    for base, dirs, files in os.walk(os.path.join(src_root, "hdl")):
+        relative = os.path.relpath(base, src_root)
+        os.makedirs(os.path.join(dest, relative), exist_ok = True)
+
+        for name in files:
+            path = os.path.join(relative, name)
+
+            if (os.path.normpath(path) in mutable):
+                shutil.copy2(os.path.join(src_root, path), os.path.join(dest, path))
+            else:
+                _link(os.path.join(src_root, path), os.path.join(dest, path))
+
+    for name in os.listdir(src_root):
+        if (name.endswith(".do")):
+            _link(os.path.join(src_root, name), os.path.join(dest, name))
+
+    os.makedirs(os.path.join(dest, "work"), exist_ok = True)
+    for name in shared_work:
+        src = os.path.join(src_root, "work", name)
+
+        if (os.path.exists(src)):
+            shutil.copy2(src, os.path.join(dest, "work", name))
+
+    return dest
+
+def _init_worker(src_root, root, mutable_files, shared_work):
+    global _workspace
+
+    _workspace = make_workspace(src_root, os.path.join(root, "worker_%d" % (os.getpid())), mutable_files, shared_work)
+
+def _run_point(function, config):
+    return function(_workspace, config)
+
+###########
+## Class ##
+###########
+
+class SweepExecutor:
+    """
+    Runs the points of a parameter sweep over a process pool, every worker
+    owning a workspace (see make_workspace()) that lives as long as the
+    sweep. A point is function(workdir, config), <function> being a
+    module-level function (it is pickled to the workers) that configures,
+    compiles and simulates from <workdir> and returns its metrics.
+    """
+
+    def __init__(self, src_root = ".", nb_workers = None, mutable_files = MUTABLE_FILES, shared_work = SHARED_WORK,
+                 tmp_dir = None, keep = False):
+        """
+        src_root   : project root (holding hdl/, work/ and the *.do scripts)
+        nb_workers : processes of the pool, default is the number of cores
+        tmp_dir    : directory of the workspaces, default is the system one
+        keep       : keep the workspaces after the sweep (debug)
+        """
+        self.src_root      = src_root
+        self.nb_workers    = os.cpu_count() if nb_workers is None else nb_workers
+        self.mutable_files = list(mutable_files)
+        self.shared_work   = list(shared_work)
+        self.tmp_dir       = tmp_dir
+        self.keep          = keep
+
+    def map(self, function, configs):
+        """
+        Results of function(workdir, config) for every config, in order
+        """
+        configs = list(configs)
+        root    = tempfile.mkdtemp(prefix = "sweep_", dir = self.tmp_dir)
+        workers = max(1, min(self.nb_workers, len(configs)))
+
+        try:
+            if (workers == 1):
+                workdir = make_workspace(self.src_root, os.path.join(root, "worker_0"), self.mutable_files, self.shared_work)
+                return [function(workdir, config) for config in configs]
+
+            with ProcessPoolExecutor(max_workers = workers, initializer = _init_worker,
+                                     initargs = (self.src_root, root, self.mutable_files, self.shared_work)) as pool:
+                return list(pool.map(functools.partial(_run_point, function), configs))
+        finally:
+            if (not self.keep):
+                shutil.rmtree(root, ignore_errors = True)
@@ -0,0 +1,231 @@
+#############
+## Imports ##
+#############
+
+import functools
+import numpy as np
+from   scipy import fft as sp_fft
+from   scipy import signal
+
+###############
+## Constants ##
+###############
+
+## Analysis windows (scipy.signal windows), named as the WIN_MODE of
+## dds_cordic_win. Only BLKH has sidelobes (-92 dB) below the noise of the
+## captures: with the others (-13 dB for NONE to -58 dB for BLKM) a tone
+## between two bins leaks past its main lobe into the noise bins, and SNR,
+## SINAD and SFDR are understated unless the capture holds whole periods.
+WINDOWS       = {"NONE" : "boxcar",
+                 "HANN" : "hann",
+                 "HAMM" : "hamming",
+                 "BLKM" : "blackman",
+                 "BLKH" : "blackmanharris",
+                 "TKEY" : ("tukey", 0.5)}  # alpha of SimDDS.TUKEY_ALFA
+
+MAX_HARMONIC  = 5        # THD sums the harmonics 2 to MAX_HARMONIC
+CHUNK_SAMPLES = 1 << 22  # samples transformed at once by spectral_metrics()
+LOBE_LENGTH   = 256      # window length measured by main_lobe()
+LOBE_PADDING  = 32       # zero-padding factor of that measurement
+
+## One record per capture, powers in squared capture units (A**2 / 2 for a
+## sine of amplitude A), ratios in dB (dBc for thd and sfdr)
+METRICS_DTYPE = np.dtype([("fundamental_freq",  "<f8"),
+                          ("fundamental_power", "<f8"),
+                          ("noise_power",       "<f8"),
+                          ("snr",               "<f8"),
+                          ("sinad",             "<f8"),
+                          ("thd",               "<f8"),
+                          ("enob",              "<f8"),
+                          ("sfdr",              "<f8"),
+                          ("spur_freq",         "<f8")])
+
+###############
+## Functions ##
+###############
+
+@functools.lru_cache(maxsize = 64)
+def get_window(window, length):
+    """
+    Samples of the window <window> (name in WINDOWS) of <length>, read-only
+    since they are cached
+    """
+    if (window not in WINDOWS):
+        raise ValueError("Unknown window %s, expected one of %s" % (window, list(WINDOWS)))
+
+    samples = signal.get_window(WINDOWS[window], length)
+    samples.setflags(write = False)
+
+    return samples
+
+@functools.lru_cache(maxsize = None)
+def main_lobe(window):
+    """
+    Half width of the main lobe of <window> (name in WINDOWS) in bins of
+    its length: first minimum of its zero-padded spectrum
+    """
+    spectrum = np.abs(sp_fft.rfft(get_window(window, LOBE_LENGTH), n = LOBE_PADDING * LOBE_LENGTH))
+    rising   = np.flatnonzero(np.diff(spectrum) > 0)
+
+    return (rising[0] if len(rising) else len(spectrum) - 1) / LOBE_PADDING
+
+def lobe_bins(window, length, nfft):
+    """
+    Half width in bins of the main lobe of a tone in the <nfft>-point
+    spectrum of <length> samples weighted by <window>, the tone lying up
+    to half a bin away from its peak bin
+    """
+    return int(np.ceil(main_lobe(window) * nfft / length + 0.5))
+
+def onesided_scale(window, nfft):
+    """
+    Factors of the bins 0 to nfft // 2 of |X|**2 (X the <nfft>-point FFT
+    of a segment weighted by the samples <window>) giving a one-sided
+    power spectrum summing to the mean square of the segment: the window
+    noise bandwidth is corrected, a tone keeps its power over its lobe
+    """
+    scale = np.full(nfft // 2 + 1, 2.0)
+    scale[0] = 1.0
+    if (nfft % 2 == 0):
+        scale[-1] = 1.0
+
+    return scale / (nfft * np.sum(np.square(window)))
+
+def power_spectrum(batch, window = "BLKH", applied = False, nfft = None, segment = None, overlap = 0.5, workers = -1):
+    """
+    One-sided power spectra of the rows of <batch> (captures of equal
+    length) by real FFTs, see onesided_scale(). scipy.fft keeps the plans
+    of the lengths it has seen, so batches of one length share them.
+
+    window  : name in WINDOWS
+    applied : the rows are already weighted by <window> (outputs of
+              dds_cordic_win), the window only sets the normalization
+    nfft    : FFT length, default is the next fast length of a segment
+    segment : Welch averaging of segments of that many samples overlapping
+              by <overlap>, default is one segment per row
+    workers : threads of the FFTs, -1 for one per core
+
+    Returns [power (rows x nfft // 2 + 1), nfft].
+    """
+    batch   = np.atleast_2d(np.asarray(batch, dtype = float))
+    length  = batch.shape[1] if segment is None else segment
+    nfft    = sp_fft.next_fast_len(length, real = True) if nfft is None else nfft
+    samples = get_window(window, length)
+
+    if (segment is None):
+        batch = batch[:, None, :]
+    elif (applied):
+        raise ValueError("Welch segments need the window applied by the analysis, not by the capture")
+    else:
+        hop   = max(1, int(segment * (1.0 - overlap)))
+        batch = np.lib.stride_tricks.sliding_window_view(batch, segment, axis = -1)[:, ::hop]
+
+    if (not applied):
+        batch = batch * samples
+
+    spectrum = sp_fft.rfft(batch, n = nfft, axis = -1, workers = workers)
+    power    = np.mean(np.square(spectrum.real) + np.square(spectrum.imag), axis = 1)
+
+    return [power * onesided_scale(samples, nfft), nfft]
+
+def metrics_from_power(power, nfft, sample_rate = 1.0, lobe = 1, max_harmonic = MAX_HARMONIC, fundamental = None):
+    """
+    Metrics of one-sided power spectra (see power_spectrum()) as a
+    METRICS_DTYPE array, one record per row. The fundamental and its
+    harmonics (aliased into the first Nyquist zone) span the bins of their
+    lobe, the bins out of DC and of the tones are the noise, extrapolated
+    over the band. The spur is the largest bin out of DC and of the
+    fundamental.
+
+    lobe        : half width in bins of the lobe of a tone, see lobe_bins()
+    fundamental : frequency of the fundamental, default is the largest
+                  peak out of DC
+    """
+    power         = np.atleast_2d(power)
+    [rows, bins]  = power.shape
+    bin_width     = sample_rate / nfft
+    index         = np.arange(rows)[:, None]
+    offsets       = np.arange(-lobe, lobe + 1)
+
+    dc            = np.zeros(bins, dtype = bool)
+    dc[:lobe + 1] = True
+
+    def tone_mask(centers):
+        mask = np.zeros((rows, bins), dtype = bool)
+        mask[index, np.clip(centers[:, :, None] + offsets, 0, bins - 1).reshape(rows, -1)] = True
+        return mask & ~dc
+
+    if (fundamental is None):
+        peak = np.argmax(np.where(dc, -np.inf, power), axis = 1)
+    else:
+        around = np.clip(int(round(fundamental / bin_width)) + offsets, 0, bins - 1)
+        peak   = around[np.argmax(power[:, around], axis = 1)]
+
+    harmonics = (peak[:, None] * np.arange(2, max_harmonic + 1)) % nfft
+    harmonics = np.minimum(harmonics, nfft - harmonics)
+
+    fund  = tone_mask(peak[:, None])
+    harm  = tone_mask(harmonics) & ~fund
+    noise = ~(fund | harm | dc)
+
+    fund_power  = np.sum(power, axis = 1, where = fund)
+    harm_power  = np.sum(power, axis = 1, where = harm)
+    noise_power = np.sum(power, axis = 1, where = noise) / np.maximum(np.sum(noise, axis = 1), 1) * (bins - lobe - 1)
+    spur        = np.argmax(np.where(fund | dc, -np.inf, power), axis = 1)
+
+    metrics = np.zeros(rows, dtype = METRICS_DTYPE)
+    metrics["fundamental_freq"]  = peak * bin_width
+    metrics["fundamental_power"] = fund_power
+    metrics["noise_power"]       = noise_power
+    metrics["spur_freq"]         = spur * bin_width
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        metrics["snr"]   = 10.0 * np.log10(fund_power / noise_power)
+        metrics["sinad"] = 10.0 * np.log10(fund_power / (noise_power + harm_power))
+        metrics["thd"]   = 10.0 * np.log10(harm_power / fund_power)
+        metrics["sfdr"]  = 10.0 * np.log10(power[index[:, 0], peak] / power[index[:, 0], spur])
+
+    metrics["enob"] = (metrics["sinad"] - 1.76) / 6.02
+
+    return metrics
+
+def spectral_metrics(batch, sample_rate = 1.0, window = "BLKH", applied = False, nfft = None, segment = None, overlap = 0.5,
+                     max_harmonic = MAX_HARMONIC, fundamental = None, workers = -1):
+    """
+    SFDR, SNR, SINAD, THD and ENOB of every row of <batch> (captures of
+    equal length) as a METRICS_DTYPE array, see power_spectrum() and
+    metrics_from_power() for the arguments. The rows are transformed by
+    chunks of CHUNK_SAMPLES, bounding the memory of large sweeps. The tones
+    are masked over the main lobe of <window>, whose sidelobes bound the
+    measurable SNR and SFDR (see WINDOWS): keep BLKH for arbitrary tones.
+    """
+    batch = np.atleast_2d(batch)
+
+    if (len(batch) == 0):
+        return np.zeros(0, dtype = METRICS_DTYPE)
+
+    length = batch.shape[1] if segment is None else segment
+    nfft   = sp_fft.next_fast_len(length, real = True) if nfft is None else nfft
+    lobe   = lobe_bins(window, length, nfft)
+    rows   = max(1, CHUNK_SAMPLES // max(batch.shape[1], nfft))
+
+    return np.concatenate([metrics_from_power(power_spectrum(batch[start : start + rows], window, applied, nfft, segment, overlap,
+                                                             workers)[0], nfft, sample_rate, lobe, max_harmonic, fundamental)
+                           for start in range(0, len(batch), rows)])
+
+def batch_metrics(captures, **options):
+    """
+    spectral_metrics() of captures of any lengths, batched by length: one
+    record per capture, in order (NaN for empty captures)
+    """
+    captures = [np.asarray(capture) for capture in captures]
+    metrics  = np.zeros(len(captures), dtype = METRICS_DTYPE)
+
+    for name in METRICS_DTYPE.names:
+        metrics[name] = np.nan
+
+    for length in set(len(capture) for capture in captures) - {0}:
+        where          = [i for i, capture in enumerate(captures) if len(capture) == length]
+        metrics[where] = spectral_metrics(np.stack([captures[i] for i in where]), **options)
+
+    return metrics
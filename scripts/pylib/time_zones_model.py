@@ -0,0 +1,144 @@
+#############
+## Imports ##
+#############
+
+import numpy as np
+
+###########
+## Class ##
+###########
+
+class FsmTimeZones:
+    """
+    Timeline model of hdl/src/fsm_control/fsm_time_zones_v2.vhd.
+
+    A run starts on the edge that samples bang_i with system_busy_i low
+    (cycle 0 is the cycle after it) and goes through
+
+        SETUP, then nb_shots x (TX, DEADZONE, RX, IDLE)
+
+    Zones are half-open [start ; end) cycle intervals of time_state, so the
+    end of a zone is the start of the next one. Every timer counts from 0
+    to value - 1, a value of 0 wraps to 2**WIDTH cycles (same for nb_shots),
+    and the TX zone lasts tx_time - deadzone_time counted output_valid_i
+    cycles, the deadzone completing tx_time.
+
+    output_valid_i is assumed high from tx_latency cycles after bang_o
+    (restart_latency cycles after restart_cycles_o for the next shots)
+    until the end of the TX zone (the FSM stalls in TX otherwise).
+    """
+
+    SAMPLING_FREQ       = 100E6
+
+    ## Values of hdl/pkg/defs_pkg.vhd
+    NB_SHOTS_WIDTH      = 6
+    DELAY_TIME_WIDTH    = 18
+    TX_TIME_WIDTH       = 18
+    DEADZONE_TIME_WIDTH = 18
+    RX_TIME_WIDTH       = 18
+    IDLE_TIME_WIDTH     = 18
+
+    SHOT_ZONES          = ["TX", "DEADZONE", "RX", "IDLE"]
+
+    def __init__(self, nb_shots_width = None):
+        """
+        nb_shots_width : NB_SHOTS_WIDTH generic, default is defs_pkg.vhd
+        """
+        self.nb_shots_width = self.NB_SHOTS_WIDTH if nb_shots_width is None else nb_shots_width
+
+    def _count(self, value, width):
+        """
+        Cycles of a counter going from 0 to unsigned(value) - 1
+        """
+        return ((int(value) - 1) & ((1 << width) - 1)) + 1
+
+    def shot_durations(self, tx_time, deadzone_time, rx_time, idle_time, tx_latency = 0):
+        """
+        Cycles of the TX, DEADZONE, RX and IDLE zones of one shot
+        """
+        tx_count = self._count(int(tx_time) - int(deadzone_time), self.TX_TIME_WIDTH)
+
+        return [tx_latency + tx_count,
+                self._count(deadzone_time, self.DEADZONE_TIME_WIDTH),
+                self._count(rx_time, self.RX_TIME_WIDTH),
+                self._count(idle_time, self.IDLE_TIME_WIDTH)]
+
+    def shot_cycles(self, tx_time, deadzone_time, rx_time, idle_time, tx_latency = 0):
+        """
+        Cycles between two restart_cycles_o (pulse repetition interval)
+        """
+        return sum(self.shot_durations(tx_time, deadzone_time, rx_time, idle_time, tx_latency))
+
+    def prf(self, tx_time, deadzone_time, rx_time, idle_time, tx_latency = 0):
+        """
+        Pulse repetition frequency (Hz) of the shots of a run
+        """
+        return self.SAMPLING_FREQ / self.shot_cycles(tx_time, deadzone_time, rx_time, idle_time, tx_latency)
+
+    def timeline(self, nb_shots, delay_time, tx_time, deadzone_time, rx_time, idle_time, tx_latency = 0,
+                 restart_latency = None):
+        """
+        Cycle-exact schedule of one run (port values as integers).
+        restart_latency defaults to tx_latency.
+
+        Returns a dict of (start, end) arrays:
+            "SETUP"                          : one interval
+            "TX", "DEADZONE", "RX", "IDLE"   : one interval per shot
+            "ENABLE_RX"                      : enable_rx_o high, one per shot
+        and of cycle arrays:
+            "BANG"                           : bang_o / restart_cycles_o, one per shot
+            "RX_LAST_WORD"                   : rx_last_word_o, one per shot
+            "END_ZONES_CYCLE"                : end_zones_cycle_o, one cycle
+        """
+        restart_latency = tx_latency if restart_latency is None else restart_latency
+
+        shots     = self._count(nb_shots, self.nb_shots_width)
+        setup     = self._count(delay_time, self.DELAY_TIME_WIDTH)
+        durations = self.shot_durations(tx_time, deadzone_time, rx_time, idle_time, restart_latency)
+
+        ## Only the first TX zone waits the bang_o latency
+        shot_start     = setup + sum(durations) * np.arange(shots, dtype = np.int64)
+        shot_start[1:] = shot_start[1:] + tx_latency - restart_latency
+        bounds         = shot_start[:, None] + np.concatenate(([0], np.cumsum(durations)))[None, :]
+        bounds[0, 1:]  = bounds[0, 1:] + tx_latency - restart_latency
+
+        zones = {"SETUP" : (np.array([0], dtype = np.int64), np.array([setup], dtype = np.int64))}
+        for index, zone in enumerate(self.SHOT_ZONES):
+            zones[zone] = (bounds[:, index], bounds[:, index + 1])
+
+        ## Registered outputs of the RX and IDLE states
+        [rx_start, rx_end]       = zones["RX"]
+        zones["ENABLE_RX"]       = (rx_start + 1, rx_end + 1)
+        zones["BANG"]            = zones["TX"][0]
+        zones["RX_LAST_WORD"]    = rx_end
+        zones["END_ZONES_CYCLE"] = zones["IDLE"][1][-1:]
+
+        return zones
+
+    def run_cycles(self, nb_shots, delay_time, tx_time, deadzone_time, rx_time, idle_time, tx_latency = 0,
+                   restart_latency = None, busy_cycles = 0):
+        """
+        Cycles between the bang edges of two back-to-back runs with the
+        same parameters: bang_i is sampled again in the end_zones_cycle_o
+        cycle, or once system_busy_i (high for busy_cycles cycles after the
+        last rx_last_word_o, while the RX sends its data) falls.
+
+        A bang in the end_zones_cycle_o cycle keeps the registered
+        parameters (enable_input is still low), new ones need one more cycle.
+        """
+        zones     = self.timeline(nb_shots, delay_time, tx_time, deadzone_time, rx_time, idle_time, tx_latency,
+                                  restart_latency)
+        end_cycle = int(zones["END_ZONES_CYCLE"][0])
+        free      = int(zones["RX_LAST_WORD"][-1]) + busy_cycles + 1
+
+        return max(end_cycle, free) + 1
+
+    def run_rate(self, nb_shots, delay_time, tx_time, deadzone_time, rx_time, idle_time, tx_latency = 0,
+                 restart_latency = None, busy_cycles = 0):
+        """
+        Achievable pulse rate (shots per second) of back-to-back runs, see run_cycles()
+        """
+        cycles = self.run_cycles(nb_shots, delay_time, tx_time, deadzone_time, rx_time, idle_time, tx_latency,
+                                 restart_latency, busy_cycles)
+
+        return self.SAMPLING_FREQ * self._count(nb_shots, self.nb_shots_width) / cycles
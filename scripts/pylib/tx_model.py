@@ -0,0 +1,203 @@
+#############
+## Imports ##
+#############
+
+import numpy as np
+from   pylib.dds_model import DdsCordic
+from   pylib.win_model import DdsCordicWinV2
+from   pylib.pulser_model import Pulser
+from   pylib.time_zones_model import FsmTimeZones
+from   pylib.register_map import read_register_map, decode_registers
+
+###########
+## Class ##
+###########
+
+class TxChain:
+    """
+    Model of the transmit path of hdl/src/top/top_tx.vhd (windowed = False)
+    and hdl/src/top/top_tx_win.vhd (windowed = True):
+
+        register bank -> fsm_time_zones_v2 -> wave_generator(_win)
+                                              (dds_cordic(_win_v2) or pulser)
+
+    configure() takes the words written on the AXI bus, stream() yields the
+    wave_data_o / wave_done_o samples of the valid cycles shot by shot, so
+    only one shot is held in memory. Extra blocks after the wave generator
+    (e.g. an updown_model.Upsampler) are given as <stages>: objects with a
+    burst(samples) method returning (data, last), applied to every shot.
+
+    The model assumes:
+        - every shot ends before the next restart_cycles_o (a warning is
+          printed otherwise) and is long enough for the TX zone (the FSM
+          stalls otherwise, a ValueError is raised)
+        - the pulser registers already hold the configuration when the
+          bang reaches it (valid_i and bang_i rise together in
+          wave_generator, the first transition uses the previous values)
+        - the first run starts after areset_i: only its first DDS wave
+          has the mode_time warm-up
+    """
+
+    REGISTER_PKG  = {False : "hdl/src/register_bank/register_bank_v1_regs_pkg.vhd",
+                     True  : "hdl/src/register_bank/register_bank_win_regs_pkg.vhd"}
+
+    ## wave_config_i of wave_generator
+    TYPE_CORDIC   = 0
+    TYPE_PULSER   = 1
+
+    ## Values of hdl/pkg/defs_pkg.vhd
+    NB_REPT_WIDTH = 10
+    TIMER_WIDTH   = 10
+
+    def __init__(self, windowed = False, stages = None, register_map = None, tukey_alfa = 0.5):
+        """
+        windowed     : top_tx_win (dds_cordic_win_v2, register_bank_win) instead of top_tx
+        stages       : blocks applied to the wave of every shot, in order
+        register_map : see register_map.read_register_map(), default is the
+                       package of the register bank of the top
+        """
+        self.windowed     = windowed
+        self.dds          = DdsCordicWinV2(tukey_alfa = tukey_alfa) if windowed else DdsCordic(en_posproc = False)
+        self.pulser       = Pulser(self.NB_REPT_WIDTH, self.TIMER_WIDTH)
+        self.fsm          = FsmTimeZones()
+        self.stages       = [] if stages is None else list(stages)
+        self.register_map = read_register_map(self.REGISTER_PKG[windowed]) if register_map is None else register_map
+
+        self.configure({})
+
+    @property
+    def cordic(self):
+        return self.dds.dds.cordic if self.windowed else self.dds.cordic
+
+    @property
+    def wave_type(self):
+        return self.fields["wave_config_wave_type" if self.windowed else "wave_config_value"]
+
+    def configure(self, writes):
+        """
+        writes : {register name or byte offset : word}, see
+                 register_map.decode_registers(). Registers not written
+                 keep their reset value.
+        """
+        self.fields = decode_registers(writes, self.register_map)
+        self._waves = {}
+
+    def _fsm_parameters(self):
+        """
+        [nb_shots, delay_time, tx_time, deadzone_time, rx_time, idle_time] of fsm_time_zones_v2
+        """
+        return [self.fields["fsm_%s_value" % (name)]
+                for name in ("nb_repetitions", "setup_timer", "tx_timer", "deadzone_timer", "rx_timer", "idle_timer")]
+
+    def latency(self, restart = False):
+        """
+        Clock cycles between bang_o (restart_cycles_o if <restart>) of the
+        FSM and the first wave_valid_o: bang_o is registered by
+        wave_generator before reaching the blocks, restart_cycles_o is not,
+        and wave_generator_win registers its output
+        """
+        first_edge = self.pulser.first_edge if self.wave_type == self.TYPE_PULSER else self.dds.first_edge
+
+        return first_edge + (1 if restart else 2) + (1 if self.windowed else 0)
+
+    def wave(self, restart = False, first_wave = True):
+        """
+        Raw (wave_data_o, wave_done_o) of the valid cycles of one shot.
+
+        restart    : shot started by restart_cycles_o instead of bang_o
+        first_wave : first DDS wave after areset_i, see DdsCordic.phase_acc()
+
+        The data are words of sfixed(CORDIC_INTEGER_PART downto CORDIC_FRAC_PART),
+        the pulser levels being converted with to_sfixed. dds_cordic_win_v2
+        leaves its last_word_o open, so wave_done_o is never set by the
+        windowed DDS.
+        """
+        fields     = self.fields
+        nb_periods = fields["wave_nb_periods_value"]
+
+        if (self.wave_type == self.TYPE_PULSER):
+            [data, done] = self.pulser.run(fields["pulser_t1_value"], fields["pulser_t2_value"],
+                                           fields["pulser_t3_value"], fields["pulser_t4_value"],
+                                           fields["pulser_t5_value"], nb_periods,
+                                           fields["pulser_config_invert"], fields["pulser_config_triple"])
+
+            return (data * 2**(-self.cordic.cordic_frac_part), done)
+
+        if (self.windowed):
+            win_modes = {code : name for name, code in self.dds.WIN_MODES.items()}
+            win_mode  = fields["dds_win_mode_value"]
+
+            if (win_mode not in win_modes):
+                raise ValueError("Unknown dds_win_mode %d, expected one of %s" % (win_mode, list(win_modes)))
+
+            data = self.dds.run(win_modes[win_mode], fields["dds_win_phase_term_value"], fields["dds_win_window_term_value"],
+                                fields["dds_win_init_phase_value"], fields["dds_win_nb_points_value"], nb_periods,
+                                bool(fields["dds_win_mode_time_time"]), first_wave = first_wave, restart = restart)
+
+            return (data, np.zeros(len(data), dtype = bool))
+
+        data = self.dds.run(fields["dds_phase_term_value"], fields["dds_init_phase_value"], fields["dds_nb_points_value"],
+                            nb_periods, bool(fields["dds_mode_time"]), first_wave = first_wave)[0]
+        done = np.zeros(len(data), dtype = bool)
+        done[-1:] = True
+
+        return (data, done)
+
+    def _shot_wave(self, restart, first_wave):
+        """
+        wave() of one shot, the (at most three) different shots of a
+        transmission are computed once
+        """
+        key = (restart, first_wave)
+
+        if (key not in self._waves):
+            self._waves[key] = self.wave(restart, first_wave)
+
+        return self._waves[key]
+
+    def timeline(self):
+        """
+        FsmTimeZones.timeline() of one run, with the wave generator latencies
+        """
+        return self.fsm.timeline(*self._fsm_parameters(), tx_latency = self.latency(), restart_latency = self.latency(True))
+
+    def _check_shot(self, restart, nb_samples):
+        [_, _, tx_time, deadzone_time, rx_time, idle_time] = self._fsm_parameters()
+
+        tx_count = self.fsm.shot_durations(tx_time, deadzone_time, rx_time, idle_time)[0]
+        if (nb_samples < tx_count):
+            raise ValueError("The wave has %d samples, the TX zone waits %d: the FSM never leaves ST_TX" % (nb_samples, tx_count))
+
+        period = self.fsm.shot_cycles(tx_time, deadzone_time, rx_time, idle_time, self.latency(True))
+        if (self.latency(restart) + nb_samples > period):
+            print("WARNING: the wave (%d samples) is still running at the next restart_cycles_o, "
+                  "the model does not cut it" % (nb_samples))
+
+    def stream(self, nb_runs = 1, chunk_size = None):
+        """
+        Generator of (shot, data, last) for <nb_runs> back-to-back bangs
+        with the current configuration: the raw wave_data_o / wave_done_o of
+        the valid cycles of each shot (shot counts across the runs), after
+        the extra stages. With <chunk_size>, shots are split in chunks of at
+        most that many samples.
+        """
+        nb_shots = self.fsm._count(self._fsm_parameters()[0], self.fsm.nb_shots_width)
+
+        for run in range(nb_runs):
+            for index in range(nb_shots):
+                restart    = index > 0
+                [data, last] = self._shot_wave(restart, run == 0 and index == 0)
+
+                self._check_shot(restart, len(data))
+
+                for stage in self.stages:
+                    [data, last] = stage.burst(data)
+
+                shot = run * nb_shots + index
+
+                if (chunk_size is None):
+                    yield (shot, data, last)
+                    continue
+
+                for start in range(0, len(data), chunk_size):
+                    yield (shot, data[start : start + chunk_size], last[start : start + chunk_size])
@@ -0,0 +1,155 @@
+#############
+## Imports ##
+#############
+
+import numpy as np
+from   pylib.fir_model import FirFilter
+
+###############
+## Functions ##
+###############
+
+def sampler_fir(weights, weight_width, fir_width, fir_type = "DIREC"):
+    """
+    FirFilter as instantiated by upsampler.vhd / downsampler.vhd: weights
+    and data words are sfixed(1 downto -(WIDTH - 2))
+
+    weights      : raw weights, in the order of weights_data_i (tap 0 in the LSBs)
+    weight_width : WEIGHT_WIDTH generic
+    fir_width    : FIR_WIDTH generic
+    """
+    return FirFilter(weights, 1, -(weight_width - 2), 1, -(fir_width - 2), fir_type)
+
+#############
+## Classes ##
+#############
+
+class _Sampler:
+    """
+    Conversion factor handling shared by the upsampler and downsampler
+    models: the factor register is ceil_log2(MAX_FACTOR + 1) bits wide and
+    the counter compares against factor - 1, so a factor of 0 behaves as
+    2**width.
+    """
+
+    def __init__(self, fir, max_factor, factor = 1):
+        """
+        fir        : FirFilter of the block (see sampler_fir())
+        max_factor : MAX_FACTOR generic
+        factor     : up/downsample_factor_i
+        """
+        self.fir          = fir
+        self.max_factor   = max_factor
+        self.factor_width = max_factor.bit_length() # ceil_log2(MAX_FACTOR + 1)
+        self.factor       = factor
+
+        self.reset()
+
+    @property
+    def factor(self):
+        return self._factor
+
+    @factor.setter
+    def factor(self, value):
+        value = int(value) & ((1 << self.factor_width) - 1)
+        self._factor = value if value else (1 << self.factor_width)
+
+    def reset(self):
+        """
+        State after areset_i
+        """
+        self.fir.reset()
+
+class Upsampler(_Sampler):
+    """
+    Polyphase model of hdl/src/upsampler/upsampler.vhd.
+
+    The block inserts factor - 1 zeros after every sample and filters the
+    result; the FIR engine skips the products with the inserted zeros, so
+    each output costs NB_TAPS / factor taps.
+    """
+
+    def process(self, samples):
+        """
+        Raw outputs for a block of raw input samples that follows the
+        previous block without gap (filter state carried between calls)
+        """
+        return self.fir.filter(samples, self.factor)
+
+    def burst(self, samples):
+        """
+        Raw (wave_data_o, wave_last_o) for one wave (wave_last_i on its last
+        sample), as written on the valid cycles of wave_valid_o.
+
+        With a factor of 1 the block never raises wave_last (the flag is
+        only registered on inserted zeros) and keeps its output valid; the
+        model returns the filtered samples with no last flag.
+        """
+        data = self.fir.burst(samples, factor = self.factor)
+        last = np.zeros(len(data), dtype = bool)
+
+        if (len(data) and self.factor > 1):
+            last[-1] = True
+
+        return (data, last)
+
+class FifoUpsampler(Upsampler):
+    """
+    Model of hdl/src/upsampler/fifo_upsampler.vhd: wave_fifo in front of
+    upsampler. The FIFO delivers the samples in order, so the output is the
+    one of Upsampler as long as the wave fits in the FIFO.
+    """
+
+    def __init__(self, fir, max_factor, ram_depth, factor = 1):
+        """
+        ram_depth : RAM_DEPTH generic (power of 2)
+        """
+        Upsampler.__init__(self, fir, max_factor, factor)
+        self.ram_depth = ram_depth
+
+    def burst(self, samples):
+        if (len(samples) > self.ram_depth - 1):
+            print("WARNING: %d samples do not fit in the FIFO (RAM_DEPTH = %d), "
+                  "the model assumes none is overwritten" % (len(samples), self.ram_depth))
+
+        return Upsampler.burst(self, samples)
+
+class Downsampler(_Sampler):
+    """
+    Polyphase model of hdl/src/downsampler/downsampler.vhd.
+
+    The block filters every sample and keeps the first output of each group
+    of factor outputs; only the kept outputs are computed.
+    """
+
+    def reset(self):
+        _Sampler.reset(self)
+        self._count = 0
+
+    def process(self, samples):
+        """
+        Raw outputs for a block of raw input samples that follows the
+        previous block without gap (filter state and sample counter carried
+        between calls)
+        """
+        samples = np.asarray(samples, dtype = np.int64)
+        index   = np.arange((-self._count) % self.factor, len(samples), self.factor)
+
+        self._count = (self._count + len(samples)) % self.factor
+
+        return self.fir.filter(samples, index = index)
+
+    def burst(self, samples):
+        """
+        Raw (wave_data_o, wave_last_o) for one wave (wave_last_i on its last
+        sample). An incomplete last group is still output, with wave_last.
+        """
+        data = self.fir.burst(samples, step = self.factor)
+        last = np.zeros(len(data), dtype = bool)
+
+        if (len(data)):
+            last[-1] = True
+
+        self._count = 0
+
+        return (data, last)
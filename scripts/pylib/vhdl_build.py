@@ -0,0 +1,318 @@
+#############
+## Imports ##
+#############
+
+import os
+import re
+import sys
+import json
+import hashlib
+import subprocess as sb
+from   concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+if (__name__ == "__main__"):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from   pylib.lib_cache import ieee_proposed_library, library_path, vmap_command
+
+###############
+## Constants ##
+###############
+
+## Source directories (relative to the project root) and their vcom options (see comp.do)
+SOURCE_DIRS   = [("hdl/pkg", "-93"),
+                 ("hdl/src", "-93 -check_synthesis -novopt -O0"),
+                 ("hdl/sim", "-93 -novopt -O0")]
+
+## Compiled separately, see lib_cache.py
+EXCLUDED_DIRS = ["hdl/pkg/ieee_proposed"]
+
+STATE_FILE    = "work/vhdl_build.json" # build keys of the compiled files
+
+## Units referenced or declared by a file (comments removed, lower case) in one pass,
+## as (prefix, unit): a prefix in DECLARING declares the unit
+RE_UNITS      = re.compile(r"\b(use\s+work\.|(?:entity|configuration)\s+work\.|component\s|architecture\s+\w+\s+of\s"
+                           r"|package\s+body\s|configuration\s+\w+\s+of\s"
+                           r"|(?:entity|package|configuration)\s(?=\s*\w+\s+(?:is|of)\b))\s*(\w+)")
+DECLARING     = ["entity", "package", "configuration"]
+
+###########
+## Class ##
+###########
+
+class VhdlBuild:
+    """
+    Incremental compilation of the work library of a project tree.
+
+    The sources of SOURCE_DIRS are parsed into a graph of files: a file
+    depends on the files declaring the entities, packages and components
+    it references (use work.*, entity work.*, component, architecture of,
+    package body). A file is compiled when its build key changed since the
+    last build, the key hashing its content, its vcom options, the mapped
+    libraries and the keys of its dependencies: an edit recompiles the
+    file and everything downstream of it, nothing else. Files whose
+    dependencies are compiled are given to parallel vcom processes.
+    """
+
+    def __init__(self, root = ".", compiler = ("vcom",), simulator = ("vsim",), libraries = None, nb_jobs = None,
+                 source_dirs = SOURCE_DIRS):
+        """
+        root      : project root (holding hdl/ and work/)
+        compiler  : command line of vcom (see fake_vsim.FAKE_VCOM)
+        simulator : command line of vsim, creates and maps the libraries
+        libraries : {name : path} of precompiled libraries mapped in work/
+        nb_jobs   : parallel vcom processes, default is the number of cores
+        """
+        self.root        = root
+        self.compiler    = list(compiler)
+        self.simulator   = list(simulator)
+        self.libraries   = {} if libraries is None else dict(libraries)
+        self.nb_jobs     = os.cpu_count() if nb_jobs is None else nb_jobs
+        self.source_dirs = list(source_dirs)
+
+        self.scan()
+
+    def _path(self, path):
+        return os.path.join(self.root, path)
+
+    def scan(self):
+        """
+        Parses the sources: self.options {file : vcom options}, self.units
+        {unit : file declaring it}, self.depends {file : set of files}
+        """
+        self.options = {}
+        references   = {}
+        self.units   = {}
+
+        for directory, options in self.source_dirs:
+            for base, dirs, files in os.walk(self._path(directory)):
+                relative = os.path.relpath(base, self.root).replace("\\", "/")
+
+                if (any(relative == excluded or relative.startswith(excluded + "/") for excluded in EXCLUDED_DIRS)):
+                    dirs[:] = []
+                    continue
+
+                for name in sorted(files):
+                    if (not name.endswith((".vhd", ".vhdl"))):
+                        continue
+
+                    path = relative + "/" + name
+                    with open(self._path(path), "r", errors = "replace") as f:
+                        text = re.sub(r"--[^\n]*", "", f.read()).lower()
+
+                    matches            = RE_UNITS.findall(text)
+                    self.options[path] = options
+                    references[path]   = set(unit for prefix, unit in matches if prefix.strip() not in DECLARING)
+
+                    for unit in [unit for prefix, unit in matches if prefix.strip() in DECLARING]:
+                        if (self.units.get(unit, path) != path):
+                            raise ValueError("Unit %s declared by %s and %s" % (unit, self.units[unit], path))
+                        self.units[unit] = path
+
+        ## References to other libraries (ieee.*, ieee_proposed.*) are not in self.units
+        self.depends = {path : set(self.units[unit] for unit in units if unit in self.units) - {path}
+                        for path, units in references.items()}
+
+    def order(self, files = None):
+        """
+        <files> (default all) and their dependencies, dependencies first
+        """
+        ordered  = []
+        visiting = set()
+        visited  = set()
+
+        def visit(path):
+            if (path in visited):
+                return
+            if (path in visiting):
+                raise ValueError("Dependency cycle through %s" % (path))
+
+            visiting.add(path)
+            for dep in sorted(self.depends[path]):
+                visit(dep)
+            visiting.discard(path)
+
+            visited.add(path)
+            ordered.append(path)
+
+        for path in sorted(self.options if files is None else files):
+            visit(path)
+
+        return ordered
+
+    def files_of(self, targets):
+        """
+        Files declaring the units <targets> (e.g. testbench entities)
+        """
+        targets = [target.lower() for target in targets]
+        unknown = [target for target in targets if target not in self.units]
+
+        if (unknown):
+            raise ValueError("Unknown units %s, expected some of %s" % (unknown, sorted(self.units)))
+
+        return [self.units[target] for target in targets]
+
+    def keys(self, files = None):
+        """
+        {file : build key} of order(files)
+        """
+        libraries = "".join("%s %s\n" % (name, self.libraries[name]) for name in sorted(self.libraries))
+        keys      = {}
+
+        for path in self.order(files):
+            digest = hashlib.sha256()
+            digest.update(("%s\n%s\n%s" % (path, self.options[path], libraries)).encode())
+
+            with open(self._path(path), "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+
+            for dep in sorted(self.depends[path]):
+                digest.update(keys[dep].encode())
+
+            keys[path] = digest.hexdigest()
+
+        return keys
+
+    def _load_state(self):
+        state_file = self._path(STATE_FILE)
+
+        ## A deleted library invalidates the state
+        if (not os.path.isfile(state_file) or not os.path.isdir(self._path("work/work"))):
+            return {}
+
+        with open(state_file, "r") as f:
+            return json.load(f)
+
+    def _save_state(self, state):
+        with open(self._path(STATE_FILE), "w") as f:
+            json.dump(state, f, indent = 1, sort_keys = True)
+
+    def outdated(self, targets = None, force = False):
+        """
+        Files to compile for the units <targets> (default all), in order
+        """
+        keys  = self.keys(None if targets is None else self.files_of(targets))
+        state = {} if force else self._load_state()
+
+        return [path for path in keys if state.get(path) != keys[path]]
+
+    def _setup(self):
+        commands = ["vlib work", "vmap work work"] + [vmap_command(path, name) for name, path in sorted(self.libraries.items())]
+
+        os.makedirs(self._path("work"), exist_ok = True)
+        code = sb.call(self.simulator + ["-batch", "-do", " ; ".join(commands + ["quit -f"])],
+                       stdout = sb.DEVNULL, cwd = self._path("work"))
+
+        if (code != 0):
+            raise RuntimeError("Creation of the work library failed (exit code %d)" % (code))
+
+    def _compile(self, path):
+        return sb.run(self.compiler + self.options[path].split() + ["../" + path], stdout = sb.PIPE, stderr = sb.STDOUT,
+                      universal_newlines = True, cwd = self._path("work"))
+
+    def build(self, targets = None, force = False):
+        """
+        Compiles the outdated files for the units <targets> (default all),
+        everything if <force>. Returns the compiled files, raises a
+        RuntimeError listing the files that failed (their dependents are
+        not compiled, the others are kept).
+        """
+        keys     = self.keys(None if targets is None else self.files_of(targets))
+        state    = {} if force else self._load_state()
+        outdated = [path for path in keys if state.get(path) != keys[path]]
+
+        if (not outdated):
+            print("Library up to date!")
+            return []
+
+        print("Compiling %d of %d files ...." % (len(outdated), len(keys)))
+        self._setup()
+
+        pending  = {path : self.depends[path] & set(outdated) for path in outdated}
+        running  = {}
+        compiled = []
+        failed   = []
+
+        with ThreadPoolExecutor(max_workers = max(1, self.nb_jobs)) as pool:
+            while (pending or running):
+                for path in [path for path in outdated if path in pending and not pending[path]]:
+                    del pending[path]
+                    running[pool.submit(self._compile, path)] = path
+
+                ## Only dependents of failed files left
+                if (not running):
+                    break
+
+                finished = wait(running, return_when = FIRST_COMPLETED)[0]
+                for future in finished:
+                    path   = running.pop(future)
+                    result = future.result()
+
+                    if (result.returncode != 0):
+                        print(result.stdout)
+                        failed.append(path)
+                        state.pop(path, None)
+                        continue
+
+                    compiled.append(path)
+                    state[path] = keys[path]
+                    for deps in pending.values():
+                        deps.discard(path)
+
+        for path in pending:
+            state.pop(path, None)
+
+        self._save_state(state)
+
+        if (failed):
+            raise RuntimeError("Compilation of %s failed, %d dependent files not compiled" % (failed, len(pending)))
+
+        print("Compilation done!")
+
+        return compiled
+
+###############
+## Functions ##
+###############
+
+def main(argv):
+    """
+    Incremental build of the work library from the project root:
+    vhdl_build.py [-j<jobs>] [-n] [-f] [unit ...]
+
+    -n : list the files to compile, in order, without compiling
+    -f : compile everything
+    """
+    options = [arg for arg in argv if arg.startswith("-")]
+    targets = [arg for arg in argv if not arg.startswith("-")] or None
+    jobs    = [int(option[2:]) for option in options if option.startswith("-j")]
+    unknown = [option for option in options if not option.startswith("-j") and option not in ("-n", "-f")]
+
+    if (unknown):
+        print("Usage: vhdl_build.py [-j<jobs>] [-n] [-f] [unit ...]")
+        return 2
+
+    nb_jobs = jobs[-1] if jobs else None
+
+    if ("-n" in options):
+        try:
+            libraries = {"ieee_proposed" : library_path()}
+        except OSError:
+            ## No simulator: nothing was compiled, every file is listed
+            libraries = {}
+
+        for path in VhdlBuild(libraries = libraries, nb_jobs = nb_jobs).outdated(targets, force = "-f" in options):
+            print(path)
+        return 0
+
+    try:
+        builder = VhdlBuild(libraries = {"ieee_proposed" : ieee_proposed_library()}, nb_jobs = nb_jobs)
+        builder.build(targets, force = "-f" in options)
+    except (RuntimeError, ValueError) as error:
+        print("ERROR: %s" % (error))
+        return 1
+
+    return 0
+
+if (__name__ == "__main__"):
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,604 @@
+#############
+## Imports ##
+#############
+
+import abc
+import numpy as np
+from   pylib import hdl_fixed
+from   pylib.cordic_model import CordicCore
+from   pylib.dds_model import DdsCordic
+
+###############
+## Functions ##
+###############
+
+def held(samples, index):
+    """
+    Value seen at <index> samples after the first load of a register that
+    is loaded with <samples> and then holds the last one. Negative indexes
+    (register never loaded, 'U' in simulation) read as 0.
+    """
+    samples = np.asarray(samples, dtype = np.int64)
+    index   = np.asarray(index, dtype = np.int64)
+
+    if (samples.size == 0):
+        return np.zeros(index.shape, dtype = np.int64)
+
+    values = samples[np.clip(index, 0, samples.size - 1)]
+
+    return np.where(index < 0, 0, values)
+
+def _accumulate(set_phase, delta, phase_max):
+    """
+    Phase register reloaded with 0 where <set_phase>, else incremented by
+    <delta>, saturating to [0 ; phase_max] (ufixed resize of the sum or of
+    the wrapped difference)
+    """
+    steps = np.where(set_phase, 0, delta)
+    total = np.cumsum(steps)
+    start = np.maximum.accumulate(np.where(set_phase, np.arange(len(steps)), 0))
+    phase = total - total[start]
+
+    if (phase.size == 0 or (phase.min() >= 0 and phase.max() <= phase_max)):
+        return phase
+
+    phase = np.zeros(len(steps), dtype = np.int64)
+    acc   = 0
+    for i, (reload, step) in enumerate(zip(set_phase.tolist(), steps.tolist())):
+        if (reload):
+            acc = 0
+        else:
+            acc = acc + step
+            acc = phase_max if (acc < 0 or acc > phase_max) else acc
+        phase[i] = acc
+
+    return phase
+
+#############
+## Classes ##
+#############
+
+class WindowBlock(abc.ABC):
+    """
+    Common part of the bit-true models of hdl/src/dds_windows, each window
+    giving its own first_edge.
+
+    Windows are the raw integers of sfixed(WIN_INTEGER_PART downto
+    WIN_FRAC_PART), phase terms the raw integers of
+    ufixed(WIN_PHASE_INTEGER_PART downto WIN_PHASE_FRAC_PART). Each
+    cosine is produced by an internal dds_cordic (EN_POSPROC = TRUE, one
+    repetition, REPT_WIDTH bits) of the window word.
+    """
+
+    ## Values of hdl/pkg/defs_pkg.vhd
+    WIN_INTEGER_PART        = 1
+    WIN_NB_ITERATIONS       = 10
+    WIN_FRAC_PART           = -(WIN_NB_ITERATIONS - (WIN_INTEGER_PART + 1))
+    WIN_PHASE_INTEGER_PART  = 4
+    WIN_PHASE_FRAC_PART     = -27
+    NB_POINTS_WIDTH         = 10
+
+    REPT_WIDTH              = 4
+    PHASE_ADJUST_LATENCY    = 2 ## phase_adjust.vhd
+    DDS_SHIFT_LATENCY       = 2 ## LATENCY of the 2pi generic_shift_reg
+
+    def __init__(self, win_integer_part = None, win_frac_part = None, win_nb_iterations = None,
+                 win_phase_integer_part = None, win_phase_frac_part = None, nb_points_width = None):
+        """
+        Generics default to the constants of defs_pkg.vhd
+        """
+        self.win_integer_part       = self.WIN_INTEGER_PART       if win_integer_part is None else win_integer_part
+        self.win_frac_part          = self.WIN_FRAC_PART          if win_frac_part is None else win_frac_part
+        self.win_nb_iterations      = self.WIN_NB_ITERATIONS      if win_nb_iterations is None else win_nb_iterations
+        self.win_phase_integer_part = self.WIN_PHASE_INTEGER_PART if win_phase_integer_part is None else win_phase_integer_part
+        self.win_phase_frac_part    = self.WIN_PHASE_FRAC_PART    if win_phase_frac_part is None else win_phase_frac_part
+        self.nb_points_width        = self.NB_POINTS_WIDTH        if nb_points_width is None else nb_points_width
+
+        self.dds = DdsCordic(CordicCore(self.win_integer_part, self.win_frac_part, self.win_nb_iterations),
+                             phase_integer_part   = self.win_phase_integer_part,
+                             phase_frac_part      = self.win_phase_frac_part,
+                             nb_points_width      = self.nb_points_width,
+                             nb_repetitions_width = self.REPT_WIDTH)
+
+    @property
+    @abc.abstractmethod
+    def first_edge(self):
+        """
+        Clock edge of the first valid_o, counting from the edge that samples valid_i
+        """
+
+    def _to_word(self, value):
+        return int(hdl_fixed.to_sfixed(value, self.win_integer_part, self.win_frac_part))
+
+    def _resize(self, raw, arg_right = None):
+        arg_right = self.win_frac_part if arg_right is None else arg_right
+        return hdl_fixed.resize(raw, arg_right, self.win_integer_part, self.win_frac_part)
+
+    def _mult(self, coef, data):
+        """
+        resize(coef * data) back to the window word
+        """
+        return self._resize(coef * np.asarray(data, dtype = np.int64), 2 * self.win_frac_part)
+
+    def _add(self, *terms):
+        """
+        resize(a + b [+ c]) back to the window word
+        """
+        return self._resize(sum(np.asarray(term, dtype = np.int64) for term in terms))
+
+    def _cos(self, phase_term, nb_points, nb_repetitions = 1):
+        """
+        cos_phase_o of the internal dds_cordic (initial phase 0, no mode_time)
+        """
+        phase = self.dds.phase_acc(phase_term, 0, nb_points, nb_repetitions)
+
+        return self.dds.sin_cos(phase)[1]
+
+    def _phase_adjust(self, phase_term, nb_points, factor):
+        """
+        Model of phase_adjust: returns (phase_term * factor, nb_points / factor, factor)
+        as seen by the dds_cordic driven by it
+        """
+        points_max = (1 << self.nb_points_width) - 1
+        phase_max  = (1 << self.dds.phase_width) - 1
+        one_factor = int(hdl_fixed.to_ufixed(1.0 / factor, 0, -10))
+
+        phase_term = min(phase_term * factor, phase_max)
+        nb_points  = min(int(hdl_fixed.round_shift((nb_points & points_max) * one_factor, 10)), points_max)
+
+        return (phase_term, nb_points, factor & ((1 << self.REPT_WIDTH) - 1))
+
+    def _harmonic_cos(self, phase_term, nb_points, factor, nb_samples):
+        """
+        cos_phase_o of the dds_cordic fed by phase_adjust(FACTOR = factor), as
+        held by the register read with the first <nb_samples> 2pi samples
+        """
+        cos   = self._cos(*self._phase_adjust(phase_term, nb_points, factor))
+        index = np.arange(nb_samples) + self.DDS_SHIFT_LATENCY - self.PHASE_ADJUST_LATENCY
+
+        return held(cos, index)
+
+    def hann_hamming_coefs(self, mode):
+        """
+        (A0, -A1) of hh_win_v2 / hh_blkm_blkh_win for "HANN" or "HAMM"
+        """
+        if (mode == "HANN"):
+            a0, a1 = self._to_word(0.5), self._to_word(0.5)
+        else:
+            a0, a1 = self._to_word(0.53836), self._to_word(0.46164)
+
+        return (a0, int(self._resize(-a1)))
+
+    def blackman_coefs(self):
+        """
+        (A0, -A1, A2) of blackman_win / hh_blkm_blkh_win, from ALFA = 0.16
+        """
+        alfa = self._to_word(0.16)
+        one  = self._to_word(1.0)
+
+        a0 = int(self._resize(hdl_fixed.round_shift(one - alfa, 1)))
+        a1 = self._to_word(0.5)
+        a2 = int(self._resize(hdl_fixed.round_shift(alfa, 1)))
+
+        return (a0, int(self._resize(-a1)), a2)
+
+    def blackman_harris_coefs(self):
+        """
+        (A0, -A1, A2, -A3) of blackman_harris_win / hh_blkm_blkh_win
+        """
+        a0 = self._to_word(0.35875)
+        a1 = self._to_word(0.48829)
+        a2 = self._to_word(0.14128)
+        a3 = self._to_word(0.01168)
+
+        return (a0, int(self._resize(-a1)), a2, int(self._resize(-a3)))
+
+class HannHammingWin(WindowBlock):
+    """
+    Bit-true model of hdl/src/dds_windows/hanning_hamming/hh_win_v2.vhd
+
+        A0 - A1 * cos(phase)
+    """
+
+    def __init__(self, hh_mode = "HANN", **generics):
+        """
+        hh_mode : HH_MODE generic, "HANN" or "HAMM"
+        """
+        WindowBlock.__init__(self, **generics)
+        self.hh_mode = hh_mode
+
+    @property
+    def first_edge(self):
+        return self.dds.first_edge + 2
+
+    def run(self, phase_term, nb_points):
+        """
+        Raw hh_result_o samples for one valid_i pulse
+        """
+        a0, minus_a1 = self.hann_hamming_coefs(self.hh_mode)
+        cos = self._cos(phase_term, nb_points)
+
+        return self._add(a0, self._mult(minus_a1, cos))
+
+class BlackmanWin(WindowBlock):
+    """
+    Bit-true model of hdl/src/dds_windows/blackman/blackman_win.vhd
+
+        A0 - A1 * cos(phase) + A2 * cos(2 * phase)
+    """
+
+    @property
+    def first_edge(self):
+        return self.dds.first_edge + self.DDS_SHIFT_LATENCY + 2
+
+    def run(self, phase_term, nb_points):
+        """
+        Raw blkm_result_o samples for one valid_i pulse
+        """
+        a0, minus_a1, a2 = self.blackman_coefs()
+
+        cos_2pi = self._cos(phase_term, nb_points)
+        cos_4pi = self._harmonic_cos(phase_term, nb_points, 2, len(cos_2pi))
+
+        return self._add(a0, self._mult(minus_a1, cos_2pi), self._mult(a2, cos_4pi))
+
+class BlackmanHarrisWin(WindowBlock):
+    """
+    Bit-true model of hdl/src/dds_windows/blackman_harris/blackman_harris_win.vhd
+
+        (-A1 * cos(phase) + A2 * cos(2 * phase)) + (A0 - A3 * cos(3 * phase))
+    """
+
+    @property
+    def first_edge(self):
+        return self.dds.first_edge + self.DDS_SHIFT_LATENCY + 3
+
+    def run(self, phase_term, nb_points):
+        """
+        Raw blkh_result_o samples for one valid_i pulse
+        """
+        a0, minus_a1, a2, minus_a3 = self.blackman_harris_coefs()
+
+        cos_2pi = self._cos(phase_term, nb_points)
+        cos_4pi = self._harmonic_cos(phase_term, nb_points, 2, len(cos_2pi))
+        cos_6pi = self._harmonic_cos(phase_term, nb_points, 3, len(cos_2pi))
+
+        minus_a1_plus_a2 = self._add(self._mult(minus_a1, cos_2pi), self._mult(a2, cos_4pi))
+        a0_minus_a3      = self._add(a0, self._mult(minus_a3, cos_6pi))
+
+        return self._add(minus_a1_plus_a2, a0_minus_a3)
+
+class HhBlkmBlkhWin(WindowBlock):
+    """
+    Bit-true model of hdl/src/dds_windows/hh_blkm_blkh_win.vhd, the window
+    of dds_cordic_win_v2 with the type selected at run time (win_type_i)
+    """
+
+    WIN_TYPES = {"HANN" : 1, "HAMM" : 2, "BLKM" : 3, "BLKH" : 0}
+
+    @property
+    def first_edge(self):
+        return self.dds.first_edge + self.DDS_SHIFT_LATENCY + 4
+
+    def run(self, win_type, phase_term, nb_points):
+        """
+        win_type : "HANN", "HAMM", "BLKM" or "BLKH"
+
+        Raw win_result_o samples for one valid_i pulse
+        """
+        if (win_type not in self.WIN_TYPES):
+            raise ValueError("Unknown window type %s, expected one of %s" % (win_type, list(self.WIN_TYPES)))
+
+        blkm_a0, blkm_minus_a1, blkm_a2              = self.blackman_coefs()
+        blkh_a0, blkh_minus_a1, blkh_a2, minus_a3    = self.blackman_harris_coefs()
+
+        if (win_type in ("HANN", "HAMM")):
+            a0, minus_a1 = self.hann_hamming_coefs(win_type)
+        elif (win_type == "BLKM"):
+            a0, minus_a1 = blkm_a0, blkm_minus_a1
+        else:
+            a0, minus_a1 = blkh_a0, blkh_minus_a1
+
+        a2 = blkm_a2 if (win_type == "BLKM") else blkh_a2
+
+        cos_2pi = self._cos(phase_term, nb_points)
+        cos_4pi = self._harmonic_cos(phase_term, nb_points, 2, len(cos_2pi))
+        cos_6pi = self._harmonic_cos(phase_term, nb_points, 3, len(cos_2pi))
+
+        ## eq_part_1 .. eq_part_3
+        minus_a1_cos2pi = self._mult(minus_a1, cos_2pi)
+        a2_cos4pi       = self._mult(a2, cos_4pi)
+        minus_a3_cos6pi = self._mult(minus_a3, cos_6pi)
+
+        a0_minus_a1     = self._add(a0, minus_a1_cos2pi)
+
+        if (win_type in ("HANN", "HAMM")):
+            return a0_minus_a1
+
+        if (win_type == "BLKM"):
+            return self._add(a0_minus_a1, a2_cos4pi)
+
+        return self._add(a0_minus_a1, self._add(a2_cos4pi, minus_a3_cos6pi))
+
+class TukeyWin(WindowBlock):
+    """
+    Bit-true model of hdl/src/dds_windows/tukey/tukey_win.vhd
+
+    tukey_phase_acc ramps the phase up to pi, holds it over the flat part
+    of the window and ramps it back down; the result is 0.5 - 0.5 * cos(phase)
+    (TK_INTEGER_PART / TK_FRAC_PART are the window word generics).
+    """
+
+    TUKEY_PHASE_ACC_LATENCY = 3 ## input_regs, half_alfa_l_proc, half_points_plus_half_l_alfa_proc
+
+    def __init__(self, alfa = 0.5, **generics):
+        """
+        alfa : WIN_ALFA generic of tukey_phase_acc (tukey_win uses 0.5)
+        """
+        WindowBlock.__init__(self, **generics)
+        self.alfa = alfa
+
+    @property
+    def first_edge(self):
+        return self.TUKEY_PHASE_ACC_LATENCY + self.dds.latency + 2
+
+    def phase_acc(self, phase_term, nb_points):
+        """
+        Model of tukey_phase_acc for one valid_i pulse (one repetition).
+        Returns the raw phase_o of the cycles with valid_o = '1'.
+        """
+        points_mask = (1 << self.nb_points_width) - 1
+        phase_max   = (1 << self.dds.phase_width) - 1
+        alfa_half   = int(hdl_fixed.to_ufixed(self.alfa / 2.0, self.win_phase_integer_part, self.win_phase_frac_part))
+
+        nb_points   = nb_points & points_mask
+        period      = ((nb_points - 1) & points_mask) + 1
+
+        nb_l_points                  = (nb_points + 1) & points_mask
+        nb_half_l_alfa               = min(int(hdl_fixed.round_shift(nb_l_points * alfa_half, -self.win_phase_frac_part)), points_mask)
+        nb_half_points               = nb_points >> 1
+        half_points_plus_half_l_alfa = (nb_half_points + nb_half_l_alfa - 1) & points_mask
+
+        count     = np.arange(period, dtype = np.int64)
+        hold      = (count > nb_half_l_alfa) & (count <= half_points_plus_half_l_alfa)
+        hold_reg  = np.concatenate(([False], hold[:-1]))
+        reverse   = np.logical_or.accumulate(hold_reg & ~hold)
+
+        set_phase = (count == 0) | (count == period - 1)
+        delta     = np.where(hold, 0, np.where(reverse, -phase_term, phase_term))
+
+        return _accumulate(set_phase, delta, phase_max)
+
+    def run(self, phase_term, nb_points):
+        """
+        Raw tk_result_o samples for one valid_i pulse
+        """
+        a0, minus_a1 = self.hann_hamming_coefs("HANN")
+        cos = self.dds.sin_cos(self.phase_acc(phase_term, nb_points))[1]
+
+        return self._add(a0, self._mult(minus_a1, cos))
+
+class NoneWin(WindowBlock):
+    """
+    Model of WIN_SELECT_NONE_GEN of hdl/src/dds_windows/dds_cordic_win.vhd:
+    the window is to_sfixed(1.0), valid with the sine dds_cordic
+    """
+
+    def __init__(self, sine_dds, **generics):
+        """
+        sine_dds : DdsCordic of the sine, whose valid_o is the window valid_o
+        """
+        WindowBlock.__init__(self, **generics)
+        self.sine_dds = sine_dds
+
+    @property
+    def first_edge(self):
+        return self.sine_dds.first_edge
+
+    def run(self, nb_samples):
+        """
+        Raw win_result samples along <nb_samples> sine samples
+        """
+        return np.full(nb_samples, self._to_word(1.0), dtype = np.int64)
+
+class DdsCordicWin:
+    """
+    Bit-true model of hdl/src/dds_windows/dds_cordic_win.vhd (window chosen
+    by the WIN_MODE generic), as instantiated by dds_cordic_win_tb.
+
+    The sine (dds_cordic, EN_POSPROC = FALSE) and the window are aligned by
+    the generic_shift_reg pair sized from the latencies declared in the
+    VHDL; each product sample uses the window register value seen on the
+    same clock edge.
+    """
+
+    WIN_MODES           = ["NONE", "HANN", "HAMM", "BLKM", "BLKH", "TKEY"]
+    WIN_NB_POINTS_WIDTH = 17
+
+    def __init__(self, win_mode = "NONE", cordic = None, win_integer_part = None, win_frac_part = None,
+                 win_nb_iterations = None, nb_points_width = None, nb_repetitions_width = None, tukey_alfa = 0.5):
+        """
+        win_mode   : WIN_MODE generic
+        cordic     : CordicCore of the sine, default is defs_pkg.vhd
+        tukey_alfa : WIN_ALFA of the Tukey phase accumulator (tukey_win uses 0.5)
+        Window generics default to defs_pkg.vhd
+        """
+        if (win_mode not in self.WIN_MODES):
+            raise ValueError("Unknown window mode %s, expected one of %s" % (win_mode, self.WIN_MODES))
+
+        self.win_mode = win_mode
+        self.dds      = DdsCordic(cordic, nb_points_width = nb_points_width,
+                                  nb_repetitions_width = nb_repetitions_width, en_posproc = False)
+
+        generics = dict(win_integer_part       = win_integer_part,
+                        win_frac_part          = win_frac_part,
+                        win_nb_iterations      = win_nb_iterations,
+                        win_phase_integer_part = self.dds.phase_integer_part,
+                        win_phase_frac_part    = self.dds.phase_frac_part,
+                        nb_points_width        = self.WIN_NB_POINTS_WIDTH)
+
+        if (win_mode in ("HANN", "HAMM")):
+            self.window = HannHammingWin(win_mode, **generics)
+        elif (win_mode == "BLKM"):
+            self.window = BlackmanWin(**generics)
+        elif (win_mode == "BLKH"):
+            self.window = BlackmanHarrisWin(**generics)
+        elif (win_mode == "TKEY"):
+            self.window = TukeyWin(tukey_alfa, **generics)
+        else:
+            self.window = NoneWin(self.dds, **generics)
+
+    @property
+    def first_edge(self):
+        """
+        Clock edge of the first valid_o, counting from the edge that samples valid_i
+        """
+        return self.dds.first_edge + max(self._win_to_dds_latency(), 0) + 1
+
+    @property
+    def win_first_edge(self):
+        """
+        Clock edge of the first win_result_valid_o
+        """
+        return self.window.first_edge
+
+    def _win_to_dds_latency(self):
+        """
+        WIN_TO_DDS_LATENCY of the VHDL (SHIFT_SIZE of the sine shift register)
+        """
+        return self._window_latency() - (2 + 2 + self.dds.cordic.n_cordic_iterations)
+
+    def _window_latency(self):
+        """
+        window_latency(WIN_MODE) of the VHDL
+        """
+        n = self.window.win_nb_iterations
+
+        return {"HANN" : 2 + 2 + n + 2 + 2,
+                "HAMM" : 2 + 2 + n + 2 + 2,
+                "BLKM" : 2 + 2 + 2 + n + 2 + 2,
+                "BLKH" : 2 + 2 + 2 + n + 2 + 3,
+                "TKEY" : 4 + 2 + n + 2 + 2,
+                "NONE" : 2 + 2 + self.dds.cordic.n_cordic_iterations}[self.win_mode]
+
+    def run(self, phase_term, window_term, initial_phase, nb_points, nb_repetitions, mode_time = False, max_samples = None):
+        """
+        Raw (sine_phase_o, win_result_o, sine_win_phase_o) samples, as
+        written by dds_cordic_win_tb to output_sine.txt, output_win.txt and
+        output_sine_win.txt. Arguments are the dds_cordic_win ports, see
+        DdsCordic.phase_acc().
+        """
+        sine = self.dds.run(phase_term, initial_phase, nb_points, nb_repetitions, mode_time, max_samples)[0]
+
+        if (self.win_mode == "NONE"):
+            window = self.window.run(len(sine))
+        else:
+            win_points = ((nb_points & ((1 << self.dds.nb_points_width) - 1)) *
+                          (nb_repetitions & ((1 << self.dds.nb_repetitions_width) - 1)))
+            window     = self.window.run(window_term, win_points)
+
+        sine_edge = self.first_edge - 1
+        win_edge  = self.win_first_edge + max(-self._win_to_dds_latency(), 0)
+
+        window_at_sine = held(window, np.arange(len(sine)) + sine_edge - win_edge)
+
+        cordic = self.dds.cordic
+        result = hdl_fixed.resize(sine * window_at_sine, cordic.cordic_frac_part + self.window.win_frac_part,
+                                  cordic.cordic_integer_part, cordic.cordic_frac_part)
+
+        return (sine, window, result)
+
+class DdsCordicWinV2:
+    """
+    Bit-true model of the product path of hdl/src/dds_windows/dds_cordic_win_v2.vhd
+    (window chosen at run time by win_mode_i, hh_blkm_blkh_win or tukey_win).
+
+    The VHDL aligns its shift registers on a window latency that does not
+    count the win_mode register, so the Hann/Hamming/Blackman(-Harris)
+    windows reach the multiplier one sample after the sine; the model
+    keeps that offset (the first product uses the never-loaded register, 0).
+    """
+
+    WIN_MODES     = {"NONE" : 0, "HANN" : 1, "HAMM" : 2, "BLKM" : 3, "BLKH" : 4, "TKEY" : 5}
+    EXTRA_LATENCY = 4
+
+    def __init__(self, cordic = None, win_integer_part = None, win_frac_part = None,
+                 win_nb_iterations = None, nb_points_width = None, nb_repetitions_width = None, tukey_alfa = 0.5):
+        """
+        cordic     : CordicCore of the sine, default is defs_pkg.vhd
+        tukey_alfa : WIN_ALFA of the Tukey phase accumulator (tukey_win uses 0.5)
+        Window generics default to defs_pkg.vhd
+        """
+        self.dds = DdsCordic(cordic, nb_points_width = nb_points_width,
+                             nb_repetitions_width = nb_repetitions_width, en_posproc = False)
+
+        generics = dict(win_integer_part       = win_integer_part,
+                        win_frac_part          = win_frac_part,
+                        win_nb_iterations      = win_nb_iterations,
+                        win_phase_integer_part = self.dds.phase_integer_part,
+                        win_phase_frac_part    = self.dds.phase_frac_part,
+                        nb_points_width        = self.dds.nb_points_width)
+
+        self.hh_blkm_blkh = HhBlkmBlkhWin(**generics)
+        self.tukey        = TukeyWin(tukey_alfa, **generics)
+
+    @property
+    def latency(self):
+        """
+        Clock cycles between the sine valid_o of dds_cordic and valid_o
+        """
+        return self._win_to_dds_latency() + 2
+
+    @property
+    def first_edge(self):
+        """
+        Clock edge of the first valid_o, counting from the edge that samples valid_i
+        """
+        return self.dds.first_edge + self.latency
+
+    def _win_to_dds_latency(self):
+        n_win          = self.hh_blkm_blkh.win_nb_iterations
+        hh_blkm_blkh   = 2 + 2 + 2 + n_win + 2 + 3
+        dds_cordic     = 2 + 2 + self.dds.cordic.n_cordic_iterations
+
+        return (hh_blkm_blkh + self.EXTRA_LATENCY) - dds_cordic + 1
+
+    def run(self, win_mode, phase_term, window_term, initial_phase, nb_points, nb_repetitions,
+            mode_time = False, max_samples = None, first_wave = True, restart = False):
+        """
+        win_mode   : "NONE", "HANN", "HAMM", "BLKM", "BLKH" or "TKEY"
+        first_wave : see DdsCordic.phase_acc()
+        restart    : wave started by restart_cycles_i, which reaches the
+                     windows without the valid_reg stage (the window is one
+                     sample earlier than after valid_i)
+
+        Raw sine_win_phase_o samples (valid_o = '1') for one valid_i pulse.
+        """
+        if (win_mode not in self.WIN_MODES):
+            raise ValueError("Unknown window mode %s, expected one of %s" % (win_mode, list(self.WIN_MODES)))
+
+        sine = self.dds.run(phase_term, initial_phase, nb_points, nb_repetitions, mode_time, max_samples, first_wave)[0]
+
+        if (win_mode == "NONE"):
+            return sine
+
+        win_points = ((nb_points & ((1 << self.dds.nb_points_width) - 1)) *
+                      (nb_repetitions & ((1 << self.dds.nb_repetitions_width) - 1))) & ((1 << self.dds.nb_points_width) - 1)
+
+        ## The windows see valid_i through valid_reg (one more edge)
+        if (win_mode == "TKEY"):
+            window   = self.tukey.run(window_term, win_points)
+            win_edge = 1 + self.tukey.first_edge + self.EXTRA_LATENCY + 1
+        else:
+            window   = self.hh_blkm_blkh.run(win_mode, window_term, win_points)
+            win_edge = 1 + self.hh_blkm_blkh.first_edge + self.EXTRA_LATENCY
+
+        sine_edge = self.dds.first_edge + self._win_to_dds_latency()
+        if (restart):
+            win_edge -= 1
+
+        window_at_sine = held(window, np.arange(len(sine)) + sine_edge - win_edge)
+
+        cordic = self.dds.cordic
+        return hdl_fixed.resize(sine * window_at_sine, cordic.cordic_frac_part + self.hh_blkm_blkh.win_frac_part,
+                                cordic.cordic_integer_part, cordic.cordic_frac_part)
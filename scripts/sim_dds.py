@@ -6,11 +6,25 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mtick
 import subprocess as sb
-from   pylib.FixedPoint import FXfamily, FXnum
+from   pylib.sim_capture import load_capture, scale_raw, iter_capture, capture_length
+from   pylib.block_analysis import SpectrumAccumulator, MinMaxDecimator
+from   pylib.spectral_metrics import batch_metrics
+from   pylib.report_render import figure_pixels, decimate, envelope
+from   pylib.cordic_model import CordicCore
+from   pylib.dds_model import DdsCordic
+from   pylib.win_model import DdsCordicWin
+from   pylib.sim_sweep import SweepExecutor
+from   pylib.lib_cache import ieee_proposed_library
+from   pylib.vhdl_build import VhdlBuild
+from   pylib.result_cache import ResultCache, result_key
+from   pylib.sim_session import SimSession
 import fileinput
 import sys
+import os
 import shutil
 import math
+import time
+import atexit
 from scipy import signal
 import csv
 
@@ -32,6 +46,17 @@ class SimDDS:
     SRC_FILE_DWR_PATH     = "work/output_sine_win.txt"
 
     TUKEY_ALFA            =  0.5
+
+    ## Generics of dds_cordic_win_tb
+    DWIN_CORDIC_INTEGER_PART    = 1
+    DWIN_CORDIC_FRAC_PART       = -19
+    DWIN_N_CORDIC_ITERATIONS    = 21
+    DWIN_WIN_INTEGER_PART       = 1
+    DWIN_WIN_FRAC_PART          = -10
+    DWIN_WIN_NB_ITERATIONS      = 10
+    ## Words of its outputs, all sfixed(CORDIC_INTEGER_PART downto CORDIC_FRAC_PART)
+    DWIN_OUTPUT_WIDTH           = DWIN_CORDIC_INTEGER_PART + 1 - DWIN_CORDIC_FRAC_PART
+    DWIN_OUTPUT_FRAC_WIDTH      = -DWIN_CORDIC_FRAC_PART
     
     NB_CYCLES_WIDTH       = 5 # bits
     TX_TIME_WIDTH         = 18 # bits
@@ -43,13 +68,48 @@ class SimDDS:
     PHASE_FRAC_PART       = PHASE_WIDTH - PHASE_INTEGER_PART - 1 # 1 for sign bit
 
     FIGSIZE               = (12,9)
+    PLOT_POINTS           = 4096 ## Envelope bins of the plots of the block analyses
 
     FIX_LATENCY           = 4  
     ACCEPTABLE_TIME_UNIT  = ['ns','us','ms']
+    ENGINES               = ['vsim','model']
+    SIMULATOR             = ["vsim"] ## Command line of the simulator (see pylib/fake_vsim.py)
+    COMPILER              = ["vcom"]
+    HDL_TARGETS           = ["dds_cordic_tb","dds_cordic_win_tb"] ## Units built by compile()
+
+    ## SIM_* generics of the testbenches, given to vsim -g by _sim_hdl()
+    TB_GENERICS           = {"dds_cordic_tb"     : ["SIM_PHASE_TERM","SIM_INIT_PHASE","SIM_NB_POINTS","SIM_NB_REPETITIONS",
+                                                    "SIM_MODE_TIME","SIM_BINARY_CAPTURE"],
+                             "dds_cordic_win_tb" : ["SIM_PHASE_TERM","SIM_WIN_TERM","SIM_INIT_PHASE","SIM_NB_POINTS",
+                                                    "SIM_NB_REPETITIONS","SIM_MODE_TIME","SIM_WIN_MODE","SIM_BINARY_CAPTURE"],
+                             "double_driver_tb"  : ["SIM_PHASE_TERM","SIM_INIT_PHASE","SIM_NB_POINTS","SIM_NB_REPETITIONS",
+                                                    "SIM_TX_TIME","SIM_TX_OFF_TIME","SIM_RX_TIME","SIM_OFF_TIME"]}
+
+    ## Output files of the testbenches, stored by the result cache
+    TB_OUTPUTS            = {"dds_cordic_tb"     : [SRC_FILE_DDS_PATH],
+                             "dds_cordic_win_tb" : [SRC_FILE_DWS_PATH,SRC_FILE_DWW_PATH,SRC_FILE_DWR_PATH],
+                             "double_driver_tb"  : [SRC_FILE_DDA_PATH,SRC_FILE_DDB_PATH]}
+
+    TB_START_CYCLES       = 5.5 ## Testbenches apply the parameters on the 6th rising edge (55 ns)
     
-    def __init__(self,target_freq = 500e3,  nb_cycles = 10, initial_phase = 0.0 ,mode_time = False):
-        """       
+    def __init__(self,target_freq = 500e3,  nb_cycles = 10, initial_phase = 0.0 ,mode_time = False, workdir = ".", simulator = None,
+                 compiler = None, cache_results = True, session = None, renderer = None):
+        """
+        workdir       : project tree holding hdl/ and work/ (see pylib/sim_sweep.py)
+        simulator     : command line replacing SIMULATOR
+        compiler      : command line replacing COMPILER
+        cache_results : reuse the outputs of runs already simulated (see pylib/result_cache.py)
+        session       : pylib/sim_session.SimSession started in workdir/work, runs the
+                        simulations instead of one vsim process each
+        renderer      : pylib/report_render.FigureRenderer drawing the saved figures of the
+                        do_* methods in parallel, nothing being shown
         """
+        self.workdir = workdir
+        self.simulator = list(self.SIMULATOR if simulator is None else simulator)
+        self.compiler = list(self.COMPILER if compiler is None else compiler)
+        self.result_cache = ResultCache() if cache_results else None
+        self.session = session
+        self.renderer = renderer
         self._target_freq = target_freq
         self._nb_cycles = nb_cycles
         self._initial_phase = initial_phase
@@ -64,6 +124,7 @@ class SimDDS:
         self._nb_cordic_stages = 10
         self._win_mode = "NONE"
         self.need_reconfig = False
+        self.binary_capture = False ## Testbench outputs in the binary format of sim_write2file
 
     @property
     def target_freq(self):
@@ -217,19 +278,31 @@ class SimDDS:
     def win_mode(self,value):
         self._win_mode = value
 
+    def _raw_phase(self,phase):
+        return int( phase * 2**(self.PHASE_FRAC_PART))
+
     def _format_phase(self,phase):
-        phase = int( phase * 2**(self.PHASE_FRAC_PART))
+        phase = self._raw_phase(phase)
         nb_digit = str(int(self.PHASE_WIDTH/4))
         phase_str = '%08x' %(phase) ## TODO: Pass it to generic f(PHASE_FRAC_PART)
         return phase_str
 
+    def _path(self,file):
+        return os.path.join(self.workdir,file)
+
+    def _run_simulator(self,commands):
+        """
+        Runs the simulator in batch mode from workdir, <commands> being its -do script
+        """
+        return sb.call(self.simulator + ["-batch","-do",commands],stdout=sb.DEVNULL,cwd=self.workdir)
+
     def _replace_all (self,file,replace_search,replace_term):
         """
         file : file to modify
         replace_search : LIST with elements to be search on one line
         replace_term : LIST with elements to be replaced on one line
         """
-        for line in fileinput.input(file, inplace=1):
+        for line in fileinput.input(self._path(file), inplace=1):
             for i, search_exp in enumerate(replace_search):
                 if search_exp in line:
                     line = replace_term[i]
@@ -252,13 +325,7 @@ class SimDDS:
         search_list             = [search_phase_term,search_win_term,search_nb_points,search_nb_cycles,search_initial_phase,
                                    search_tx_time,search_tx_off_time,search_rx_time,search_off_time,search_mode_time,search_win_mode]
         
-        nb_points  = self.SAMPLING_FREQ/self.target_freq
-        phase_term = ( 2.0 * np.pi  / nb_points)
-
-        if(self.win_mode == "TKEY"):
-            win_term = ( 2.0 * np.pi  / ( (nb_points * self.nb_cycles + 1)*self.TUKEY_ALFA ))
-        else:
-            win_term = ( 2.0 * np.pi  / (nb_points * self.nb_cycles))
+        [nb_points, phase_term, win_term] = self._sim_input_terms()
 
         term_phase_term       = "   constant SIM_INPUT_PHASE_TERM     : std_logic_vector((PHASE_WIDTH - 1) downto 0) := x\"%s\";\n" %(self._format_phase(phase_term))
         term_win_term         = "   constant SIM_INPUT_WIN_TERM       : std_logic_vector((PHASE_WIDTH - 1) downto 0) := x\"%s\";\n" %(self._format_phase(win_term))
@@ -277,6 +344,39 @@ class SimDDS:
 
         self._replace_all(self.SIM_INPUT_FILE,search_list,term_list)
 
+    def _sim_generics(self):
+        """
+        Values of the SIM_* testbench generics (same as _write_sim_input())
+        """
+        [nb_points, phase_term, win_term] = self._sim_input_terms()
+
+        return {"SIM_PHASE_TERM"     : "%d" % (self._raw_phase(phase_term)),
+                "SIM_WIN_TERM"       : "%d" % (self._raw_phase(win_term)),
+                "SIM_INIT_PHASE"     : "%d" % (self._raw_phase(self.initial_phase)),
+                "SIM_NB_POINTS"      : "%d" % (nb_points),
+                "SIM_NB_REPETITIONS" : "%d" % (self.nb_cycles),
+                "SIM_MODE_TIME"      : "'1'" if (self.mode_time in ('1', True)) else "'0'",
+                "SIM_WIN_MODE"       : self.win_mode,
+                "SIM_BINARY_CAPTURE" : "true" if self.binary_capture else "false",
+                "SIM_TX_TIME"        : "%d" % (self._format_time_zone(self.tx_time)),
+                "SIM_TX_OFF_TIME"    : "%d" % (self._format_time_zone(self.tx_off_time)),
+                "SIM_RX_TIME"        : "%d" % (self._format_time_zone(self.rx_time)),
+                "SIM_OFF_TIME"       : "%d" % (self._format_time_zone(self.off_time))}
+
+    def _sim_input_terms(self):
+        """
+        Returns [nb_points, phase_term, win_term] as written in SIM_INPUT_FILE
+        """
+        nb_points  = self.SAMPLING_FREQ/self.target_freq
+        phase_term = ( 2.0 * np.pi  / nb_points)
+
+        if(self.win_mode == "TKEY"):
+            win_term = ( 2.0 * np.pi  / ( (nb_points * self.nb_cycles + 1)*self.TUKEY_ALFA ))
+        else:
+            win_term = ( 2.0 * np.pi  / (nb_points * self.nb_cycles))
+
+        return [nb_points, phase_term, win_term]
+
     def _format_time_zone(self,time_zone):
 
         if(type(time_zone) is str):
@@ -319,20 +419,8 @@ class SimDDS:
         self._replace_all(self.CONFIG_FILE,search_list,term_list)
         self.need_reconfig = False      
 
-    def conv (self,shex):
-
-        value = int(shex,16)
-
-        cordic_word_width = self.cordic_word_int_width + self.cordic_word_frac_width
-
-        if value & (1 << (cordic_word_width-1)):
-            value -= 1 << cordic_word_width
-    
-        value /= (2**self.cordic_word_frac_width)
-        
-        return FXnum(value,FXfamily(self.cordic_word_frac_width)).toDecimalString()
-    
-    def _annot_max(self,x,y,ax=None,xlabel="",ylabel="",xytext = (0.9,0.92)):
+    @staticmethod
+    def _annot_max(x,y,ax=None,xlabel="",ylabel="",xytext = (0.9,0.92)):
 
         xmax = x[np.argmax(y)]
         ymax = y.max()
@@ -346,7 +434,8 @@ class SimDDS:
                 arrowprops=arrowprops, bbox=bbox_props, ha="right", va="top")
         ax.annotate(text, xy=annot_pos, xytext=xytext, **kw)
 
-    def _freq_stringformat (self,freq):
+    @staticmethod
+    def _freq_stringformat (freq):
         freq_mag = ["","K","M"]
 
         for i in range(len(freq_mag)):
@@ -362,37 +451,147 @@ class SimDDS:
                 return "%1.5f %s" %(time,time_cte[i])
             time *= 1000
 
-    def _sim_hdl(self,hdl_entity,run_all = False):
+    def _plot_pixels(self):
+        """
+        Bins of the decimated traces of the figures, see pylib/report_render.decimate()
+        """
+        return figure_pixels(self.FIGSIZE)
 
+    def _figure(self, plot, fig_name, save_plot, no_plot, *args):
+        """
+        Figure plot(*args) (a static _plot_* method), saved as <fig_name> if
+        <save_plot> and shown unless <no_plot>. With a renderer (see
+        pylib/report_render.FigureRenderer), the figure is only saved, by
+        the render pool.
+        """
+        if (self.renderer is not None):
+            if (save_plot):
+                self.renderer.submit(plot, fig_name, *args)
+            return
+
+        fig = plot(*args)
+
+        if (save_plot):
+            fig.savefig(fig_name)
+
+        if (not no_plot):
+            plt.show()
+
+        plt.close(fig)
+
+    def _sim_time(self):
         dds_latency_time = (self.nb_cordic_stages + self.FIX_LATENCY) * (1/self.SAMPLING_FREQ)
         time = (1.0/self.target_freq) * float(self.nb_cycles + 1000) + dds_latency_time
+
+        return self._time_stringformat(time)
+
+    def _sim_run(self,hdl_entity,run_all = False):
+        """
+        [generics, run time] of the simulation of <hdl_entity> with the current parameters
+        """
         sim_time = ""
 
         if (run_all):
             sim_time = "-all"
         else:
-            sim_time = self._time_stringformat(time)
+            sim_time = self._sim_time()
+
+        values   = self._sim_generics()
+        generics = {name : values[name] for name in self.TB_GENERICS.get(hdl_entity, [])}
+
+        return [generics, sim_time]
+
+    def _sim_command(self,hdl_entity,run_all = False):
+        """
+        vsim script simulating <hdl_entity> with the current parameters
+        """
+        [values, sim_time] = self._sim_run(hdl_entity, run_all)
+        generics           = " ".join("-g%s=%s" % (name, values[name]) for name in values)
+
+        return "cd work ; vsim %s work.%s ; run %s ; quit -f " % (generics,hdl_entity,sim_time)
+
+    def _sim_hdl(self,hdl_entity,run_all = False):
 
         print("Simulating ....")
 
-        vsim_cmd_sim = "vsim -batch -do \"cd work ; vsim work.%s ; run %s ; quit -f \" " % (hdl_entity,sim_time)
-        sb.call(vsim_cmd_sim,stdout=sb.DEVNULL) 
+        vsim_cmd_sim = self._sim_command(hdl_entity, run_all)
+
+        key     = self._result_key(hdl_entity, vsim_cmd_sim)
+        outputs = [self._path(output) for output in self.TB_OUTPUTS.get(hdl_entity, [])]
+
+        if (key is not None and self.result_cache.get(key, outputs)):
+            print("Simulation cached!")
+            return
+
+        ## vsim -batch exits with 0 even when the run fails: the outputs of the
+        ## testbench are removed, only those written by this run are kept
+        for output in outputs:
+            if (os.path.exists(output)):
+                os.remove(output)
+
+        run_start = math.floor(time.time()) ## mtime resolution of the file system
+
+        if (self.session is not None):
+            self.session.simulate(hdl_entity, *self._sim_run(hdl_entity, run_all))
+            code = 0
+        else:
+            code = self._run_simulator(vsim_cmd_sim)
+
+        missing = [output for output in outputs if not (os.path.isfile(output) and os.path.getmtime(output) >= run_start)]
+
+        if (missing):
+            raise RuntimeError("Simulation of %s failed (exit code %d), missing outputs %s" % (hdl_entity, code, missing))
+
+        if (key is not None):
+            self.result_cache.put(key, outputs)
 
         print("Simulation done!")
 
-    def compile(self):
-        self._write_sim_input()
+    def _result_key(self, hdl_entity, vsim_cmd_sim):
+        """
+        Key of a run in the result cache: the vsim command (generics, run
+        time) and the build key of the testbench, which covers every
+        upstream source (defs_pkg included) and the simulator version.
+        None when the run is not cached.
+        """
+        if (self.result_cache is None or hdl_entity not in self.TB_OUTPUTS):
+            return None
 
-        if(self.need_reconfig):
-            self._write_config() 
+        library = ieee_proposed_library(self.workdir, self.simulator)
+        builder = VhdlBuild(self.workdir, self.compiler, self.simulator, {"ieee_proposed" : library})
 
-        print("Compiling ....")
+        try:
+            [tb_file] = builder.files_of([hdl_entity])
+        except ValueError:
+            ## Testbench outside hdl/ (e.g. old/legacy)
+            return None
 
-        #vsim_cmd_compile = "vsim -batch -do \" cd work ; do ../comp.do ; quit -f \" "
-        vsim_cmd_compile = "vsim -batch -do \" cd work ; do ../comp_dds.do ; quit -f \" "
-        sb.call(vsim_cmd_compile,stdout=sb.DEVNULL) ## TODO: add support for compilation errors
+        return result_key(hdl_entity, vsim_cmd_sim, builder.keys([tb_file])[tb_file])
+
+    def is_cached(self, hdl_entity, run_all = False):
+        """
+        True when _sim_hdl() would restore the outputs from the result cache
+        (the sources must hold the configuration, see _write_config())
+        """
+        key = self._result_key(hdl_entity, self._sim_command(hdl_entity, run_all))
+
+        return key is not None and self.result_cache.has(key)
+
+    def compile(self, force = False):
+        """
+        Compiles HDL_TARGETS in the work library of workdir with the
+        configuration of _write_config(). The simulation inputs are
+        testbench generics given at each run, and pylib/vhdl_build.py only
+        recompiles the files changed since the last build (and their
+        dependents), everything if <force>. ieee_proposed is mapped from the
+        cache of pylib/lib_cache.py, built the first time.
+        """
+        self._write_config()
 
-        print("Compilation done!")
+        library = ieee_proposed_library(self.workdir, self.simulator)
+        builder = VhdlBuild(self.workdir, self.compiler, self.simulator, {"ieee_proposed" : library})
+
+        builder.build(self.HDL_TARGETS, force)
 
     def do_fft(self,data,nb_points):
         sample_spacing  = 1.0 / self.SAMPLING_FREQ 
@@ -401,21 +600,158 @@ class SimDDS:
 
         return [data_fft,fft_freqs]
 
-    def extract_data(self, source_file):
-        data            = np.loadtxt(source_file, converters={0 : self.conv})
+    def _time_axis(self, data):
         nb_samples      = len(data) 
         sample_spacing  = 1.0 / self.SAMPLING_FREQ 
         x_axis          = np.linspace(0.0, (nb_samples*sample_spacing), nb_samples)
 
         return [data, nb_samples, x_axis]
+
+    def _word_widths(self, word_width, frac_width):
+        """
+        [word_width, frac_width] of a text capture, default is the CORDIC word of the configuration
+        """
+        word_width = self.cordic_word_int_width + self.cordic_word_frac_width if word_width is None else word_width
+        frac_width = self.cordic_word_frac_width if frac_width is None else frac_width
+
+        return [word_width, frac_width]
+
+    def iter_data(self, source_file, block_size, word_width = None, frac_width = None):
+        """
+        extract_data() of <source_file> as blocks of <block_size> samples
+        (pylib/sim_capture.CaptureBlock), one in memory at a time
+        """
+        [word_width, frac_width] = self._word_widths(word_width, frac_width)
+
+        return iter_capture(self._path(source_file), word_width, frac_width, block_size, self.SAMPLING_FREQ)
+
+    def _axis_step(self, nb_samples):
+        """
+        Spacing of the x_axis of _time_axis() for <nb_samples>
+        """
+        return (nb_samples * (1.0 / self.SAMPLING_FREQ)) / max(nb_samples - 1, 1)
+
+    def extract_data(self, source_file, raw = False, word_width = None, frac_width = None):
+        """
+        word_width, frac_width : words of a text capture, default is the CORDIC
+                                 word of the configuration (a binary capture
+                                 gives its own)
+        """
+        [word_width, frac_width] = self._word_widths(word_width, frac_width)
+        data                     = load_capture(self._path(source_file), word_width, frac_width, raw = raw)
+
+        return self._time_axis(data)
+
+    def extract_win_data(self, source_file, raw = False):
+        """
+        extract_data() of an output of dds_cordic_win_tb
+        """
+        return self.extract_data(source_file, raw, self.DWIN_OUTPUT_WIDTH, self.DWIN_OUTPUT_FRAC_WIDTH)
+
+    def _dds_model(self):
+        """
+        DdsCordic with the CORDIC generics written by _write_config()
+        """
+        cordic = CordicCore(cordic_integer_part = self.cordic_word_int_width - 1,
+                            cordic_frac_part    = -self.cordic_word_frac_width,
+                            n_cordic_iterations = self.cordic_word_int_width + self.cordic_word_frac_width)
+
+        return DdsCordic(cordic)
+
+    def _model_nb_samples(self, latency):
+        """
+        Number of samples written before the end of the vsim run of _sim_hdl()
+        (the writer registers valid_o one cycle after the DUT)
+        """
+        [time, unit] = self._sim_time().split()
+        nb_cycles = float(time) * self.SAMPLING_FREQ / (1000 ** ["s","ms","us","ns"].index(unit))
+
+        return max(int(np.floor(nb_cycles - self.TB_START_CYCLES + 1e-6)) - (latency + 1), 0)
+
+    def model_data(self, raw = False):
+        """
+        Same as extract_data(SRC_FILE_DDS_PATH), computed by the bit-true
+        model of dds_cordic (pylib/dds_model.py) from the parameters
+        _write_sim_input() gives to dds_cordic_tb, without simulator.
+        """
+        dds = self._dds_model()
+        [nb_points, phase_term, win_term] = self._sim_input_terms()
+
+        [sine, cosine] = dds.run(phase_term     = dds.phase_to_raw(phase_term),
+                                 initial_phase  = dds.phase_to_raw(self.initial_phase),
+                                 nb_points      = int(nb_points),
+                                 nb_repetitions = self.nb_cycles,
+                                 mode_time      = (self.mode_time in ('1', True)),
+                                 max_samples    = self._model_nb_samples(dds.latency))
+
+        if (not raw):
+            sine = scale_raw(sine, self.cordic_word_frac_width)
+
+        return self._time_axis(sine)
  
-    def do_dds(self, simulate = True, save_plot = True, dB_fft = True, normalized_freq = False, no_plot = False):
+    def model_win_data(self, raw = False):
+        """
+        Same as extract_win_data() of SRC_FILE_DWS_PATH, SRC_FILE_DWW_PATH and
+        SRC_FILE_DWR_PATH, computed by the bit-true model of dds_cordic_win
+        (pylib/win_model.py) with the generics of dds_cordic_win_tb.
+        Returns [sine, window, result], each as [data, nb_samples, x_axis].
+        """
+        cordic = CordicCore(cordic_integer_part = self.DWIN_CORDIC_INTEGER_PART,
+                            cordic_frac_part    = self.DWIN_CORDIC_FRAC_PART,
+                            n_cordic_iterations = self.DWIN_N_CORDIC_ITERATIONS)
+
+        dds_win = DdsCordicWin(win_mode          = self.win_mode,
+                               cordic            = cordic,
+                               win_integer_part  = self.DWIN_WIN_INTEGER_PART,
+                               win_frac_part     = self.DWIN_WIN_FRAC_PART,
+                               win_nb_iterations = self.DWIN_WIN_NB_ITERATIONS,
+                               tukey_alfa        = self.TUKEY_ALFA)
+        dds = dds_win.dds
+
+        [nb_points, phase_term, win_term] = self._sim_input_terms()
+
+        [sine, window, result] = dds_win.run(phase_term     = dds.phase_to_raw(phase_term),
+                                             window_term    = dds.phase_to_raw(win_term),
+                                             initial_phase  = dds.phase_to_raw(self.initial_phase),
+                                             nb_points      = int(nb_points),
+                                             nb_repetitions = self.nb_cycles,
+                                             mode_time      = (self.mode_time in ('1', True)))
+
+        sine   = sine[:self._model_nb_samples(dds.latency)]
+        window = window[:self._model_nb_samples(dds_win.win_first_edge - 1)]
+        result = result[:self._model_nb_samples(dds_win.first_edge - 1)]
+
+        ## The testbench writes the window as a CORDIC word
+        window = window << (self.DWIN_OUTPUT_FRAC_WIDTH + self.DWIN_WIN_FRAC_PART)
+
+        if (not raw):
+            sine   = scale_raw(sine, self.DWIN_OUTPUT_FRAC_WIDTH)
+            window = scale_raw(window, self.DWIN_OUTPUT_FRAC_WIDTH)
+            result = scale_raw(result, self.DWIN_OUTPUT_FRAC_WIDTH)
+
+        return [self._time_axis(sine), self._time_axis(window), self._time_axis(result)]
+
+    def do_dds(self, simulate = True, save_plot = True, dB_fft = True, normalized_freq = False, no_plot = False, engine = "vsim",
+               block_size = None):
+        """
+        engine     : "vsim" simulates dds_cordic_tb (if <simulate>) and reads its output,
+                     "model" uses the bit-true Python model (no compile() needed)
+        block_size : read the vsim output by blocks of that many samples (see _do_dds_blocks())
+        """
+        if (engine not in self.ENGINES):
+            raise ValueError("Unknown engine %s, expected one of %s" % (engine, self.ENGINES))
 
-        if (simulate):
-            hdl_entity = "dds_cordic_tb"
-            self._sim_hdl(hdl_entity)
+        if (engine == "model"):
+            [cordic_data, nb_samplepoints, x_axis] = self.model_data()
+        else:
+            if (simulate):
+                hdl_entity = "dds_cordic_tb"
+                self._sim_hdl(hdl_entity)
+
+            if (block_size is not None):
+                return self._do_dds_blocks(block_size, save_plot, dB_fft, normalized_freq, no_plot)
 
-        [cordic_data, nb_samplepoints, x_axis] = self.extract_data(self.SRC_FILE_DDS_PATH)
+            [cordic_data, nb_samplepoints, x_axis] = self.extract_data(self.SRC_FILE_DDS_PATH)
 
         print("cordic data 0",cordic_data[0])
 
@@ -425,15 +761,9 @@ class SimDDS:
             zeros_array               = np.zeros(nb_samplepoints_mode_time)
             ref_sin_y_resized         = ref_sin_y[0:(nb_samplepoints-nb_samplepoints_mode_time)]
             ref_sin_y                 = np.concatenate((zeros_array,ref_sin_y_resized))
-            pi_char                   = "" 
-            axis_formater = mtick.FormatStrFormatter('%.2e')
-            text_xlabel   = " seconds"
         else:
             ref_sin_y                = np.sin(self.target_freq * 2.0 * np.pi * x_axis + self.initial_phase)
-            pi_char                  = str("\u03C0") ## Pi character 
-            axis_formater            = mtick.FormatStrFormatter('%.3f'+pi_char)
             x_axis       = self.target_freq * 2.0 * x_axis
-            text_xlabel  = " rads"
         
         mae = np.abs(cordic_data - ref_sin_y) / nb_samplepoints # Mean absolute error
         
@@ -454,46 +784,131 @@ class SimDDS:
         cordic_fft_plot = cordic_fft[:nb_samplepoints//2]
         cordic_fft_freq = cordic_freqs[:nb_samplepoints//2]
 
-        ## Plot
-        #if(not no_plot):
-        fig, ax = plt.subplots(2,2,figsize=self.FIGSIZE)
+        if (no_plot and not save_plot):
+            return max(mae)
+
+        pixels   = self._plot_pixels()
+        fig_name = "fig_dds_%s_%d.png" % (self._freq_stringformat(self.target_freq) , self.nb_cycles)
+
+        self._figure(self._plot_dds, fig_name, save_plot, no_plot,
+                     "DDS vs Python Sine %sHz" % (self._freq_stringformat(self.target_freq)), self.mode_time,
+                     decimate(x_axis, cordic_data, pixels), decimate(x_axis, ref_sin_y, pixels), decimate(x_axis, mae, pixels),
+                     decimate(cordic_fft_freq, cordic_fft_plot, pixels, log = True), y_fftlabel, self.FIGSIZE)
+
+        return max(mae)
+
+    @staticmethod
+    def _plot_dds(title, mode_time, dds_trace, ref_trace, mae_trace, fft_trace, y_fftlabel, figsize):
+        """
+        Figure of do_dds(), the traces being [x, y] (see pylib/report_render.decimate())
+        """
+        if (mode_time):
+            pi_char       = ""
+            axis_formater = mtick.FormatStrFormatter('%.2e')
+            text_xlabel   = " seconds"
+        else:
+            pi_char       = str("\u03C0") ## Pi character 
+            axis_formater = mtick.FormatStrFormatter('%.3f'+pi_char)
+            text_xlabel   = " rads"
+
+        [fft_freq, fft_plot] = [fft_trace[0], np.array(fft_trace[1])]
+
+        fig, ax = plt.subplots(2,2,figsize=figsize)
 
         ax[0][0].grid(True)
-        ax[0][0].set_title("DDS vs Python Sine %sHz" % (self._freq_stringformat(self.target_freq)))
-        ax[0][0].plot(x_axis,cordic_data,"-b", label="DDS")
-        ax[0][0].plot(x_axis,ref_sin_y,"-r", label="Python")
+        ax[0][0].set_title(title)
+        ax[0][0].plot(*dds_trace,"-b", label="DDS")
+        ax[0][0].plot(*ref_trace,"-r", label="Python")
         ax[0][0].set_xlabel(text_xlabel)
         ax[0][0].xaxis.set_major_formatter(axis_formater)
         ax[0][0].legend(loc='best')
         
         ax[0][1].grid(True)
         ax[0][1].set_title("Mean Absolute Error")
-        ax[0][1].plot(x_axis,mae)
+        ax[0][1].plot(*mae_trace)
         ax[0][1].set_xlabel(text_xlabel)
         ax[0][1].xaxis.set_major_formatter(axis_formater)
-        self._annot_max (x_axis,mae,ax[0][1],xlabel=(pi_char + text_xlabel))
+        SimDDS._annot_max (*mae_trace,ax[0][1],xlabel=(pi_char + text_xlabel))
 
         ax[1][0].grid(True)
         ax[1][0].set_title("Magnitude")
-        ax[1][0].semilogx(cordic_fft_freq,cordic_fft_plot) ## Only the real half
+        ax[1][0].semilogx(fft_freq,fft_plot) ## Only the real half
         ax[1][0].set_xlabel("Frequency")
-        self._annot_max (cordic_fft_freq , cordic_fft_plot, ax[1][0], xlabel=" Hz",ylabel=y_fftlabel)
-        cordic_fft_plot[np.argmax(cordic_fft_plot)] = -1000
-        self._annot_max (cordic_fft_freq , cordic_fft_plot, ax[1][0], xlabel=" Hz",ylabel=y_fftlabel,xytext=(0.7,0.72))
+        SimDDS._annot_max (fft_freq , fft_plot, ax[1][0], xlabel=" Hz",ylabel=y_fftlabel)
+        fft_plot[np.argmax(fft_plot)] = -1000
+        SimDDS._annot_max (fft_freq , fft_plot, ax[1][0], xlabel=" Hz",ylabel=y_fftlabel,xytext=(0.7,0.72))
 
         ax[1][1].set_visible(False)
 
-        if(save_plot):
-            fig_name = "fig_dds_%s_%d.png" % (self._freq_stringformat(self.target_freq) , self.nb_cycles)
-            plt.savefig(fig_name)
+        return fig
 
-    
-        #plt.tight_layout()
-        plt.show()    
+    def _do_dds_blocks(self, block_size, save_plot, dB_fft, normalized_freq, no_plot):
+        """
+        do_dds() of the vsim output read block by block, memory not growing
+        with the capture: same max MAE, the magnitude is the average of the
+        FFTs of <block_size>-sample segments and the plots show the min/max
+        envelope of PLOT_POINTS bins
+        """
+        nb_samplepoints = capture_length(self._path(self.SRC_FILE_DDS_PATH))
+        step            = self._axis_step(nb_samplepoints)
+        offset          = int( ((self.initial_phase/(2 * np.pi * self.target_freq)) * self.SAMPLING_FREQ) ) 
+
+        spectrum  = SpectrumAccumulator(max(1, min(block_size, nb_samplepoints)))
+        data_plot = MinMaxDecimator(nb_samplepoints, self.PLOT_POINTS)
+        ref_plot  = MinMaxDecimator(nb_samplepoints, self.PLOT_POINTS)
+        mae_plot  = MinMaxDecimator(nb_samplepoints, self.PLOT_POINTS)
+        mae_max   = 0.0
+
+        for block in self.iter_data(self.SRC_FILE_DDS_PATH, block_size):
+            index = block.index()
+            data  = block.values()
+
+            ## Same references as do_dds()
+            if (self.mode_time):
+                ref = np.where(index < offset, 0.0, np.sin(self.target_freq * 2.0 * np.pi * ((index - offset) * step)))
+            else:
+                ref = np.sin(self.target_freq * 2.0 * np.pi * (index * step) + self.initial_phase)
 
-        return max(mae)
-    
-    def do_double_driver(self, simulate = True,save_plot = True):
+            mae     = np.abs(data - ref) / nb_samplepoints
+            mae_max = max(mae_max, mae.max())
+
+            spectrum.update(data)
+            data_plot.update(block.start, data)
+            ref_plot.update(block.start, ref)
+            mae_plot.update(block.start, mae)
+
+        if (no_plot and not save_plot):
+            return mae_max
+
+        [cordic_fft, cordic_freqs] = spectrum.result(1.0 / self.SAMPLING_FREQ)
+        half = len(cordic_fft) // 2
+
+        if (normalized_freq):
+            cordic_freqs /= self.SAMPLING_FREQ
+
+        y_fftlabel = ""
+        if (dB_fft):
+            y_fftlabel = "dB"
+            cordic_fft = 20.0 * np.log10(2.0*cordic_fft)
+
+        [index, data_low, data_high] = data_plot.result()
+        x_axis = index * step
+
+        if (not self.mode_time):
+            x_axis = self.target_freq * 2.0 * x_axis
+
+        pixels   = self._plot_pixels()
+        fig_name = "fig_dds_%s_%d.png" % (self._freq_stringformat(self.target_freq) , self.nb_cycles)
+
+        self._figure(self._plot_dds, fig_name, save_plot, no_plot,
+                     "DDS vs Python Sine %sHz" % (self._freq_stringformat(self.target_freq)), self.mode_time,
+                     envelope(x_axis, data_low, data_high), envelope(x_axis, *ref_plot.result()[1:]),
+                     envelope(x_axis, *mae_plot.result()[1:]), decimate(cordic_freqs[:half], cordic_fft[:half], pixels, log = True),
+                     y_fftlabel, self.FIGSIZE)
+
+        return mae_max
+
+    def do_double_driver(self, simulate = True,save_plot = True, no_plot = False):
         
         if (simulate):
             hdl_entity = "double_driver_tb"
@@ -513,59 +928,80 @@ class SimDDS:
                           [rx_pos, "RX ZONE"] ,
                           [off_pos, "OFF ZONE" ]]
 
-        ## Plot
+        sample_spacing =  1.0 / self.SAMPLING_FREQ 
+        x_lines        = [annot[0] * sample_spacing for annot in x_line_annots]
 
-        fig, ax = plt.subplots(2,1,figsize=self.FIGSIZE)
+        pixels   = self._plot_pixels()
+        fig_name = "fig_double_driver_%s_%d.png" % (self._freq_stringformat(self.target_freq) , self.nb_cycles)
+
+        self._figure(self._plot_double_driver, fig_name, save_plot, no_plot,
+                     self._freq_stringformat(self.target_freq), decimate(x_axis, cordic_data_a, pixels),
+                     decimate(x_axis, cordic_data_b, pixels), x_lines, self.FIGSIZE)
+
+    @staticmethod
+    def _plot_double_driver(freq_string, trace_a, trace_b, x_lines, figsize):
+        """
+        Figure of do_double_driver(), the traces being [x, y]
+        """
+        fig, ax = plt.subplots(2,1,figsize=figsize)
 
         time_xlabel = "seconds"
 
         ax[0].grid(False)
-        ax[0].set_title("Driver A signal %sHz" % (self._freq_stringformat(self.target_freq)))
-        ax[0].plot(x_axis,cordic_data_a,"-b")
+        ax[0].set_title("Driver A signal %sHz" % (freq_string))
+        ax[0].plot(*trace_a,"-b")
         ax[0].set_xlabel(time_xlabel)
         ax[0].xaxis.set_major_formatter(mtick.FormatStrFormatter('%.2e'))
 
         ax[1].grid(False)
-        ax[1].set_title("Driver B signal %sHz" % (self._freq_stringformat(self.target_freq)))
-        ax[1].plot(x_axis,cordic_data_b,"-r")
+        ax[1].set_title("Driver B signal %sHz" % (freq_string))
+        ax[1].plot(*trace_b,"-r")
         ax[1].set_xlabel(time_xlabel)
         ax[1].xaxis.set_major_formatter(mtick.FormatStrFormatter('%.2e'))
 
-        sample_spacing =  1.0 / self.SAMPLING_FREQ 
-
         for axis in ax:
-            for annot in x_line_annots :
-                xline_point = annot[0] * sample_spacing
+            for xline_point in x_lines:
                 axis.axvline(x=xline_point, linestyle=':', color = 'black', alpha=0.7)
 
-        if(save_plot):
-            fig_name = "fig_double_driver_%s_%d.png" % (self._freq_stringformat(self.target_freq) , self.nb_cycles)
-            plt.savefig(fig_name)
-
         plt.tight_layout()
-        plt.show()    
 
-    def do_win(self ,simulate = True, no_plot = False, save_plot = True, normalized_freq = False):
+        return fig
 
-        if (simulate):
-            hdl_entity = "dds_cordic_win_tb"
-            self.mode_time = False
-            self._sim_hdl(hdl_entity)
+    def do_win(self ,simulate = True, no_plot = False, save_plot = True, normalized_freq = False, engine = "vsim",
+               block_size = None):
+        """
+        engine     : "vsim" simulates dds_cordic_win_tb (if <simulate>) and reads its output,
+                     "model" uses the bit-true Python model (no compile() needed)
+        block_size : read the vsim outputs by blocks of that many samples (see _do_win_blocks())
+        """
+        if (engine not in self.ENGINES):
+            raise ValueError("Unknown engine %s, expected one of %s" % (engine, self.ENGINES))
 
         win_dict = {"NONE":"None" , "HANN" : "Hanning" , "HAMM" : "Hamming" , 
                     "BLKM" : "Blackman", "BLKH" : "Blackman-Harris", "TKEY" : "Tukey"}
-        
-        [sine_data, nb_samplepoints, x_axis] = self.extract_data(self.SRC_FILE_DWS_PATH)
-        win_data = self.extract_data(self.SRC_FILE_DWW_PATH)[0]
-        result_data = self.extract_data(self.SRC_FILE_DWR_PATH)[0]
+
+        if (engine == "model"):
+            self.mode_time = False
+            [sine, win, result] = self.model_win_data()
+            [sine_data, nb_samplepoints, x_axis] = sine
+            win_data = win[0]
+            result_data = result[0]
+        else:
+            if (simulate):
+                hdl_entity = "dds_cordic_win_tb"
+                self.mode_time = False
+                self._sim_hdl(hdl_entity)
+
+            if (block_size is not None):
+                return self._do_win_blocks(block_size, no_plot, save_plot, normalized_freq, win_dict)
+
+            [sine_data, nb_samplepoints, x_axis] = self.extract_win_data(self.SRC_FILE_DWS_PATH)
+            win_data = self.extract_win_data(self.SRC_FILE_DWW_PATH)[0]
+            result_data = self.extract_win_data(self.SRC_FILE_DWR_PATH)[0]
 
         x_axis = self.target_freq * 2.0 * x_axis
         win_axis = np.linspace(0.0, nb_samplepoints, nb_samplepoints)
 
-        pi_char = str("\u03C0") ## Pi character 
-        axis_formater = mtick.FormatStrFormatter('%.3f'+pi_char)
-        text_xlabel = " rads"
-    
         [cordic_fft , cordic_freqs] = self.do_fft(sine_data,nb_samplepoints)
         [result_fft , result_freqs] = self.do_fft(result_data,nb_samplepoints)
 
@@ -576,7 +1012,6 @@ class SimDDS:
         cordic_fft = np.abs(cordic_fft)  / nb_samplepoints
         result_fft = np.abs(result_fft)  / nb_samplepoints
 
-        y_fftlabel = "dB"
         cordic_fft = 20.0 * np.log10(2*cordic_fft)
         result_fft = 20.0 * np.log10(2*result_fft)
 
@@ -588,45 +1023,220 @@ class SimDDS:
         result_fft_plot = result_fft[:nb_samplepoints//2]
         result_fft_freq = result_freqs[:nb_samplepoints//2]
 
-        ## Plot
-        fig, ax = plt.subplots(2,2,figsize=self.FIGSIZE)
+        pixels = self._plot_pixels()
+
+        self._win_figure(win_dict, save_plot, no_plot, decimate(x_axis, sine_data, pixels),
+                         decimate(win_axis, result_data, pixels), decimate(cordic_fft_freq, cordic_fft_plot, pixels, log = True),
+                         decimate(result_fft_freq, result_fft_plot, pixels, log = True))
+
+    def _win_figure(self, win_dict, save_plot, no_plot, sine_trace, result_trace, sine_fft_trace, result_fft_trace):
+        """
+        _figure() of _plot_win() for do_win() and _do_win_blocks()
+        """
+        fig_name = "figures/fig_dds_win_%s_%d_%s.png" % (self._freq_stringformat(self.target_freq) , self.nb_cycles, win_dict[self.win_mode])
+
+        self._figure(self._plot_win, fig_name, save_plot, no_plot, self._freq_stringformat(self.target_freq),
+                     win_dict[self.win_mode], sine_trace, result_trace, sine_fft_trace, result_fft_trace, self.FIGSIZE)
+
+    @staticmethod
+    def _plot_win(freq_string, win_name, sine_trace, result_trace, sine_fft_trace, result_fft_trace, figsize):
+        """
+        Figure of do_win(), the traces being [x, y] (magnitudes in dB)
+        """
+        pi_char = str("\u03C0") ## Pi character 
+        axis_formater = mtick.FormatStrFormatter('%.3f'+pi_char)
+        text_xlabel = " rads"
+        y_fftlabel = "dB"
+
+        [cordic_fft_freq, cordic_fft_plot] = [sine_fft_trace[0], np.array(sine_fft_trace[1])]
+        [result_fft_freq, result_fft_plot] = [result_fft_trace[0], np.array(result_fft_trace[1])]
+
+        fig, ax = plt.subplots(2,2,figsize=figsize)
 
         ax[0][0].grid(True)
-        ax[0][0].set_title("Sine %sHz" % (self._freq_stringformat(self.target_freq)))
-        ax[0][0].plot(x_axis,sine_data)
+        ax[0][0].set_title("Sine %sHz" % (freq_string))
+        ax[0][0].plot(*sine_trace)
         ax[0][0].set_xlabel(text_xlabel)
         ax[0][0].xaxis.set_major_formatter(axis_formater)
         
         ax[0][1].grid(True)
-        ax[0][1].set_title( "Windowed Sine (%s)" %(win_dict[self.win_mode]))
-        ax[0][1].plot(win_axis,result_data)
+        ax[0][1].set_title( "Windowed Sine (%s)" %(win_name))
+        ax[0][1].plot(*result_trace)
         ax[0][1].set_xlabel("Nb Points")
 
         ax[1][0].grid(True)
         ax[1][0].set_title("Magnitude Pure sine wave")
         ax[1][0].semilogx(cordic_fft_freq,cordic_fft_plot) ## Only the real half
         ax[1][0].set_xlabel("Frequency")
-        self._annot_max (cordic_fft_freq,cordic_fft_plot,ax[1][0],xlabel=" Hz",ylabel=y_fftlabel)
+        SimDDS._annot_max (cordic_fft_freq,cordic_fft_plot,ax[1][0],xlabel=" Hz",ylabel=y_fftlabel)
         cordic_fft_plot[np.argmax(cordic_fft_plot)] = -1000
-        self._annot_max (cordic_fft_freq , cordic_fft_plot, ax[1][0], xlabel=" Hz",ylabel=y_fftlabel,xytext=(0.8,0.82))
+        SimDDS._annot_max (cordic_fft_freq , cordic_fft_plot, ax[1][0], xlabel=" Hz",ylabel=y_fftlabel,xytext=(0.8,0.82))
 
         ax[1][1].grid(True)
-        ax[1][1].set_title("Magnitude Windowed sine (%s)" %( win_dict[self.win_mode]))
+        ax[1][1].set_title("Magnitude Windowed sine (%s)" %(win_name))
         ax[1][1].semilogx(result_fft_freq,result_fft_plot) ## Only the real half
         ax[1][1].set_xlabel("Frequency")
-        self._annot_max (result_fft_freq,result_fft_plot,ax[1][1],xlabel=" Hz",ylabel=y_fftlabel)
+        SimDDS._annot_max (result_fft_freq,result_fft_plot,ax[1][1],xlabel=" Hz",ylabel=y_fftlabel)
         result_fft_plot[np.argmax(result_fft_plot)] = -1000
-        self._annot_max (result_fft_freq , result_fft_plot, ax[1][1], xlabel=" Hz",ylabel=y_fftlabel,xytext=(0.8,0.82))
+        SimDDS._annot_max (result_fft_freq , result_fft_plot, ax[1][1], xlabel=" Hz",ylabel=y_fftlabel,xytext=(0.8,0.82))
 
         plt.tight_layout()
-        
-        if(save_plot):
-            fig_name = "figures/fig_dds_win_%s_%d_%s.png" % (self._freq_stringformat(self.target_freq) , self.nb_cycles, win_dict[self.win_mode])
-            plt.savefig(fig_name)
-        
-        if (not no_plot):
-            plt.show()       
 
+        return fig
+
+    def _block_spectrum(self, source_file, block_size, word_width = None, frac_width = None):
+        """
+        [nb_samples, [magnitude, freqs], [index, low, high]] of <source_file>
+        read block by block: averaged FFT of <block_size>-sample segments
+        (see do_fft()) and envelope of PLOT_POINTS bins
+        """
+        nb_samples = capture_length(self._path(source_file))
+        spectrum   = SpectrumAccumulator(max(1, min(block_size, nb_samples)))
+        envelope   = MinMaxDecimator(nb_samples, self.PLOT_POINTS)
+
+        for block in self.iter_data(source_file, block_size, word_width, frac_width):
+            data = block.values()
+            spectrum.update(data)
+            envelope.update(block.start, data)
+
+        return [nb_samples, spectrum.result(1.0 / self.SAMPLING_FREQ), envelope.result()]
+
+    def _do_win_blocks(self, block_size, no_plot, save_plot, normalized_freq, win_dict):
+        """
+        do_win() of the vsim outputs read block by block (see _do_dds_blocks()),
+        the window output is not read since it is not plotted
+        """
+        widths = [self.DWIN_OUTPUT_WIDTH, self.DWIN_OUTPUT_FRAC_WIDTH]
+
+        [nb_samplepoints, [cordic_fft, cordic_freqs], sine_plot] = self._block_spectrum(self.SRC_FILE_DWS_PATH, block_size, *widths)
+        [nb_result, [result_fft, result_freqs], result_plot]     = self._block_spectrum(self.SRC_FILE_DWR_PATH, block_size, *widths)
+
+        x_axis   = self.target_freq * 2.0 * sine_plot[0] * self._axis_step(nb_samplepoints)
+        win_axis = result_plot[0] * (nb_result / max(nb_result - 1, 1))
+
+        if (normalized_freq):
+            cordic_freqs /= self.SAMPLING_FREQ
+            result_freqs /= self.SAMPLING_FREQ
+
+        cordic_fft = 20.0 * np.log10(2*cordic_fft)
+        result_fft = 20.0 * np.log10(2*result_fft)
+
+        pixels       = self._plot_pixels()
+        cordic_half  = len(cordic_fft) // 2
+        result_half  = len(result_fft) // 2
+
+        self._win_figure(win_dict, save_plot, no_plot, envelope(x_axis, *sine_plot[1:]), envelope(win_axis, *result_plot[1:]),
+                         decimate(cordic_freqs[:cordic_half], cordic_fft[:cordic_half], pixels, log = True),
+                         decimate(result_freqs[:result_half], result_fft[:result_half], pixels, log = True))
+
+
+###############
+## Functions ##
+###############
+
+## SimSession of every workspace of the process, kept for the whole sweep (see sweep_point()).
+## Pool workers exit without atexit handlers: their vsim ends on the end of its stdin.
+_sessions = {}
+
+def _close_sessions():
+    for session in _sessions.values():
+        session.close()
+    _sessions.clear()
+
+atexit.register(_close_sessions)
+
+def _sweep_sim(workdir, config):
+    """
+    SimDDS of <workdir> with the attributes of <config> = [attributes,
+    engine, simulator, compiler, persistent], compiled if needed. With
+    <persistent>, the worker simulates all its points in one SimSession.
+    """
+    [attributes, engine, simulator, compiler, persistent] = config
+
+    session = None
+    if (persistent):
+        if (workdir not in _sessions):
+            _sessions[workdir] = SimSession(SimDDS.SIMULATOR if simulator is None else simulator, os.path.join(workdir, "work"))
+        session = _sessions[workdir]
+
+    sim = SimDDS(workdir = workdir, simulator = simulator, compiler = compiler, session = session)
+    for name, value in attributes.items():
+        setattr(sim, name, value)
+
+    ## A rerun (e.g. of an interrupted sweep) finds the point in the result cache, no compilation needed
+    if (engine == "vsim"):
+        sim._write_config()
+
+        if (not sim.is_cached("dds_cordic_tb")):
+            sim.compile()
+
+    return sim
+
+def sweep_point(workdir, config):
+    """
+    One point of sweep_mae(), see _sweep_sim(): the max MAE of do_dds()
+    """
+    return _sweep_sim(workdir, config).do_dds(save_plot = False, no_plot = True, engine = config[1])
+
+def capture_point(workdir, config):
+    """
+    One point of sweep_metrics(), see _sweep_sim(): the output of dds_cordic_tb
+    """
+    sim = _sweep_sim(workdir, config)
+
+    if (config[1] == "model"):
+        return sim.model_data()[0]
+
+    sim._sim_hdl("dds_cordic_tb")
+
+    return sim.extract_data(sim.SRC_FILE_DDS_PATH)[0]
+
+def _sweep_map(function, word_fracs, target_freqs, engine, nb_workers, simulator, compiler, persistent, attributes):
+    """
+    function(workdir, config) of every CORDIC word frac width x target
+    frequency, frequencies varying fastest
+    """
+    configs = [[dict(attributes, cordic_word_frac_width = frac, target_freq = freq), engine, simulator, compiler, persistent]
+               for frac in word_fracs for freq in target_freqs]
+
+    ## Built once here rather than concurrently by the first point of every worker
+    if (engine == "vsim"):
+        ieee_proposed_library(".", SimDDS.SIMULATOR if simulator is None else simulator)
+
+    results = SweepExecutor(nb_workers = nb_workers).map(function, configs)
+    _close_sessions() # serial sweeps run in this process
+
+    return results
+
+def sweep_mae(word_fracs, target_freqs, engine = "vsim", nb_workers = None, simulator = None, compiler = None, persistent = False,
+              **attributes):
+    """
+    Max MAE of do_dds() for every CORDIC word frac width x target frequency,
+    as results[frac][freq]. Points are simulated in parallel, each worker
+    compiling in its own workspace (see pylib/sim_sweep.py).
+
+    persistent : one vsim process per worker (see pylib/sim_session.py)
+    attributes : other SimDDS attributes shared by every point
+    """
+    results = _sweep_map(sweep_point, word_fracs, target_freqs, engine, nb_workers, simulator, compiler, persistent, attributes)
+
+    return [results[i * len(target_freqs) : (i + 1) * len(target_freqs)] for i in range(len(word_fracs))]
+
+def sweep_metrics(word_fracs, target_freqs, engine = "vsim", nb_workers = None, simulator = None, compiler = None, persistent = False,
+                  window = "BLKH", **attributes):
+    """
+    Spectral metrics of the dds_cordic_tb output for every CORDIC word frac
+    width x target frequency, as a pylib/spectral_metrics.METRICS_DTYPE
+    array of shape (len(word_fracs), len(target_freqs)), e.g.
+    results["sfdr"]. The points are simulated as in sweep_mae(), then their
+    captures are analyzed in batches of equal length.
+
+    window : analysis window, name in spectral_metrics.WINDOWS
+    """
+    captures = _sweep_map(capture_point, word_fracs, target_freqs, engine, nb_workers, simulator, compiler, persistent, attributes)
+    metrics  = batch_metrics(captures, sample_rate = SimDDS.SAMPLING_FREQ, window = window)
+
+    return metrics.reshape(len(word_fracs), len(target_freqs))
 
 ##########
 ## MAIN ##
@@ -646,17 +1256,8 @@ def main():
     # target_freqs = np.linspace(20e3,500e3,240)
     # #target_freqs = [100e3]
     
-    # results = [ [] for _ in range(len(word_fracs)) ]
-    
-    # for i,frac in enumerate(word_fracs):
-    #     sim.cordic_word_frac_width = frac
-    #     print("############### Executing %d bits ###############" %(frac + 2))
-    #     for j,freq in enumerate(target_freqs):
-    #         print("#### Doing %d of %d freqs ####" %(j+1,len(target_freqs)))
-    #         sim.target_freq = freq
-    #         sim.compile()
-    #         mae_max = sim.do_dds(save_plot=False, no_plot=True)
-    #         results[i].append(mae_max)
+    # results = sweep_mae(word_fracs, target_freqs, engine="model", nb_cycles=sim.nb_cycles,
+    #                     initial_phase=sim.initial_phase, win_mode=sim.win_mode)
 
     # with open("out.csv","w") as f:
     #     wr = csv.writer(f)
@@ -674,4 +1275,4 @@ def main():
 
  
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
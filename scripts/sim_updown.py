@@ -5,7 +5,9 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mtick
-from   pylib.FixedPoint import FXfamily, FXnum
+from   pylib.sim_capture import load_capture
+from   pylib.fir_model import FirFilter
+from   pylib.updown_model import Upsampler, Downsampler
 import fileinput
 import sys
 import shutil
@@ -24,30 +26,18 @@ SRC_FILE_DOWN_PATH      = "work/output_cordic_down_weights.txt"
 SINE_FREQ               = 500e3
 NB_PERIODS              = 2
 CONV_RATE               = 4
+MAX_FACTOR              = 10 # UP_MAX_FACTOR / DOWN_MAX_FACTOR of hdl/pkg/defs_pkg.vhd
 
-NB_TAPS                 = 10
-FIR_COEF = [0.00726318359375,0.032623291015625,0.081573486328125,0.141357421875,0.183502197265625,
-            0.183502197265625,0.141357421875,0.081573486328125,0.032623291015625,0.00726318359375]
+WORD_INT_WIDTH          = 2
+WORD_FRAC_WIDTH         = 8
+
+FIR_WEIGHTS_PKG         = "hdl/src/gen_fir/fir_weights_pkg.vhd"
+FIR_TYPE                = "DIREC" # UP_FIR_TYPE / DOWN_FIR_TYPE of hdl/pkg/defs_pkg.vhd
 
 ##############
 ## Functios ##
 ##############
 
-def conv (shex):
-
-    value = int(shex,16)
-    word_int_width = 2
-    word_frac_width = 8
-
-    cordic_word_width = word_int_width + word_frac_width
-
-    if value & (1 << (cordic_word_width-1)):
-        value -= 1 << cordic_word_width
-
-    value /= (2**word_frac_width)
-    
-    return FXnum(value,FXfamily(word_frac_width)).toDecimalString()
-
 def extract_data(mode):
 
     if(mode=="up"):
@@ -55,7 +45,7 @@ def extract_data(mode):
     elif(mode=="down"):
         source_file = SRC_FILE_DOWN_PATH
 
-    data            = np.loadtxt(source_file, converters={0 : conv})
+    data            = load_capture(source_file, WORD_INT_WIDTH + WORD_FRAC_WIDTH, WORD_FRAC_WIDTH)
     nb_samples      = len(data) 
     
     if(mode=="up"):
@@ -67,37 +57,21 @@ def extract_data(mode):
 
     return [data, nb_samples, x_axis]
 
-def do_fir(data):
-    
-    fir_data = np.zeros(len(data))
-
-    for i in range(len(data)):
-        acc = 0
-        for k in range(NB_TAPS):
-            if (i>=k):
-                acc+= FIR_COEF[k]*data[i-k]
-        
-        fir_data[i] = acc
-  
-    return fir_data
-
-def pad_signal(data):
-
-    padded_data = np.zeros(len(data)*CONV_RATE)
-    
-    for i in range(len(data)):
-        padded_data[i*CONV_RATE] = data[i]
+def make_fir():
+    """
+    FIR_TYPE filter with the FIR_WEIGHTS of FIR_WEIGHTS_PKG
+    """
+    return FirFilter.from_weights_pkg(FIR_WEIGHTS_PKG, WORD_INT_WIDTH - 1, -WORD_FRAC_WIDTH, FIR_TYPE)
 
-    return padded_data
+def do_fir(data):
+    """
+    Bit-true FIR_TYPE filter of one burst of <data> (quantized to the FIR
+    word), with the FIR_WEIGHTS of FIR_WEIGHTS_PKG
+    """
+    fir = make_fir()
 
-def discart_signal(data):
-    discarted_data = np.zeros(math.ceil(len(data)/CONV_RATE))
+    return fir.to_real(fir.burst(fir.to_raw(data)))
 
-    for i in range(len(discarted_data)):
-        discarted_data[i] = data[i*CONV_RATE]
-    
-    return discarted_data
-                
 def make_ref(mode):
 
     nb_samples          = int( (100e6/SINE_FREQ) * NB_PERIODS)
@@ -106,14 +80,18 @@ def make_ref(mode):
 
     ref_sine = np.sin(SINE_FREQ * 2.0 * np.pi * x_axis)
 
+    fir = make_fir()
+
     if(mode=="up"):
-        data = pad_signal(ref_sine)
-        return do_fir(data)
+        sampler = Upsampler(fir, MAX_FACTOR, CONV_RATE)
     elif (mode=="down"):
-        data = do_fir(ref_sine)
-        return discart_signal(data)
+        sampler = Downsampler(fir, MAX_FACTOR, CONV_RATE)
+    else:
+        return 0
+
+    [data, last] = sampler.burst(fir.to_raw(ref_sine))
 
-    return 0
+    return fir.to_real(data)
 
 def do_fft(data,nb_points):
     sample_spacing  = 1.0 / (100e6*CONV_RATE) 